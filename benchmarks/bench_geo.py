@@ -0,0 +1,39 @@
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import miyako_geo
+
+# 미야코 섬 범위에 임의 POI를 뿌려 지도 1회 빌드 / 인덱스 빌드 / 반경 질의 시간 측정
+SIZES = [10, 1000, 10000, 50000]
+QUERIES = 200
+
+
+def synthetic_pois(n):
+    rng = random.Random(n)
+    return {f"poi {i}": [24.70 + rng.random() * 0.25, 125.12 + rng.random() * 0.35] for i in range(n)}
+
+
+if __name__ == "__main__":
+    miyako_geo.STATIC_DIR = tempfile.mkdtemp(prefix="miyako_map_")
+    print(f"{'POIs':>6} | {'map build (ms)':>14} | {'html (KB)':>9} | {'index (ms)':>10} | {'5km query (ms)':>14}")
+    for n in SIZES:
+        pois = synthetic_pois(n)
+        start = time.perf_counter()
+        url = miyako_geo.build_map(pois)
+        build_ms = (time.perf_counter() - start) * 1000
+        size_kb = os.path.getsize(os.path.join(miyako_geo.STATIC_DIR, os.path.basename(url))) / 1024
+        start = time.perf_counter()
+        index = miyako_geo.GridIndex(pois)
+        index_ms = (time.perf_counter() - start) * 1000
+        rng = random.Random(0)
+        start = time.perf_counter()
+        for _ in range(QUERIES):
+            index.nearby(24.70 + rng.random() * 0.25, 125.12 + rng.random() * 0.35, 5)
+        query_ms = (time.perf_counter() - start) * 1000 / QUERIES
+        print(f"{n:>6} | {build_ms:>14.1f} | {size_kb:>9.0f} | {index_ms:>10.1f} | {query_ms:>14.3f}")
+    shutil.rmtree(miyako_geo.STATIC_DIR)
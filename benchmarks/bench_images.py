@@ -0,0 +1,89 @@
+import io
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import miyako_images
+
+# 폰 사진 크기(4000x3000 JPEG) 한 장: 변형 생성(처음 한 번) / 캐시 적중 / 파일 stat 경로 시간과 변형별 바이트.
+# 다른 사진을 만드는 동안(다른 세션의 업로드) 캐시 적중이 기다리는 최대 시간.
+# 갤러리: 사진 N장의 썸네일 HTML 한 페이지를 만드는 시간과 크기 (예전처럼 st.image로 원본을 보내면 원본 바이트 전부)
+GALLERY_SIZES = [10, 100, 500]
+REPEAT = 1000
+
+
+def photo(seed, size=(4000, 3000)):
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    h, w = size[1], size[0]
+    y, x = np.mgrid[0:h, 0:w]
+    arr = np.stack([(x / 16 + seed * 7) % 256, (y / 12) % 256, ((x + y) / 20) % 256], -1) + rng.normal(0, 8, (h, w, 3))
+    buf = io.BytesIO()
+    Image.fromarray(arr.clip(0, 255).astype("uint8")).save(buf, "JPEG", quality=92)
+    return buf.getvalue()
+
+
+def us_per_call(fn):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - start) / REPEAT * 1e6
+
+
+if __name__ == "__main__":
+    tmp = tempfile.mkdtemp(prefix="miyako_images_")
+    cache = miyako_images.ImageCache(cache_dir=os.path.join(tmp, "img"), photo_dir=os.path.join(tmp, "photos"))
+    data = photo(0)
+    start = time.perf_counter()
+    name = cache.save_photo(data, "photo.jpg")
+    generate_ms = (time.perf_counter() - start) * 1000
+    image = cache.photo(name)
+    path = os.path.join(cache.photo_dir, name)
+    print(f"4000x3000 JPEG ({len(data) / 1024:,.0f} KB): generate {generate_ms:.0f} ms, "
+          f"cached lookup {us_per_call(lambda: cache.photo(name)):.1f} us, from_file {us_per_call(lambda: cache.from_file(path)):.1f} us")
+
+    other = photo(99)
+    upload = threading.Thread(target=cache.save_photo, args=(other, "other.jpg"))
+    waits = []
+    upload.start()
+    while upload.is_alive():
+        start = time.perf_counter()
+        cache.from_file(path)
+        waits.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.005)
+    upload.join()
+    print(f"during another upload: {len(waits)} cached lookups, max {max(waits):.2f} ms")
+
+    print(f"\n{'variant':>8} | {'webp (KB)':>9} | {'jpeg (KB)':>9}")
+    for w in (*image.widths, "t"):
+        sizes = [os.path.getsize(os.path.join(cache.cache_dir, os.path.basename(image.url(fmt, w)))) / 1024 for fmt in ("webp", "jpeg")]
+        print(f"{w:>8} | {sizes[0]:>9.1f} | {sizes[1]:>9.1f}")
+
+    # 갤러리는 같은 사진 여러 장 대신 작은 사진을 N장 만들어 씀 (키가 달라야 함)
+    # 앱은 한 페이지(PAGE_SIZE=50)의 썸네일 HTML만 보냄. 이미지 바이트는 보일 때 브라우저가 정적 서빙에서 받음
+    print(f"\n{'photos':>6} | {'generate (ms/photo)':>19} | {'page html (ms)':>14} | {'page html (KB)':>14} | {'thumbs (KB)':>11} | {'originals (MB)':>14}")
+    names = []
+    originals = 0
+    for n in GALLERY_SIZES:
+        samples = []
+        while len(names) < n:
+            raw = photo(len(names) + 1, (1600, 1200))
+            start = time.perf_counter()
+            names.append(cache.save_photo(raw, "p.jpg"))
+            samples.append((time.perf_counter() - start) * 1000)
+            originals += len(raw)
+        shown = [cache.photo(x) for x in names[-50:]]
+        start = time.perf_counter()
+        page = miyako_images.gallery_html([(image, f"photo {i}") for i, image in enumerate(shown)])
+        html_ms = (time.perf_counter() - start) * 1000
+        thumbs = sum(os.path.getsize(os.path.join(cache.cache_dir, os.path.basename(image.thumb_url("webp")))) for image in shown)
+        print(f"{n:>6} | {statistics.median(samples):>19.0f} | {html_ms:>14.2f} | {len(page.encode()) / 1024:>14.1f} | "
+              f"{thumbs / 1024:>11.0f} | {originals / 1024 / 1024:>14.1f}")
+    shutil.rmtree(tmp)
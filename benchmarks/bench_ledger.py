@@ -0,0 +1,52 @@
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pandas as pd
+
+import miyako_ledger
+
+# 지출 N건에서: 기존 방식(rerun마다 리스트 합계 2번) vs 장부의 누적 합계, 일별/카테고리별 집계
+SIZES = [1000, 10000, 100000]
+RATE = 900.0
+REPEAT = 20
+DAYS = ["2/16 (월)", "2/17 (화)", "2/18 (수)", "2/19 (목)", "2/20 (금)"]
+
+
+def synthetic_expenses(n):
+    rng = random.Random(n)
+    return [miyako_ledger.new_expense(f"item {i}", rng.randrange(100, 20000), rng.choice(miyako_ledger.CATEGORIES),
+                                      rng.choice(miyako_ledger.CURRENCIES), rng.choice(DAYS)) for i in range(n)]
+
+
+def ms(fn):
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+# 장부 없이 같은 일을 하는 경우: 매번 DataFrame을 만들어 groupby
+def pandas_groupby(expenses):
+    df = pd.DataFrame(expenses)
+    jpy = df["amount"].where(df["currency"] == "JPY", df["amount"] * 100 / RATE)
+    return jpy.groupby(df["day"]).sum(), jpy.groupby(df["category"]).sum()
+
+
+if __name__ == "__main__":
+    print(f"{'expenses':>8} | {'list sum x2':>11} | {'ledger total':>12} | {'append+delete':>13} | {'groupby (DataFrame)':>19} | {'groupby (ledger)':>16}")
+    for n in SIZES:
+        expenses = synthetic_expenses(n)
+        ledger = miyako_ledger.Ledger()
+        ledger.load(expenses)
+        list_ms = ms(lambda: (sum([x['amount'] for x in expenses]), sum([x['amount'] for x in expenses])))
+        total_ms = ms(lambda: ledger.total(RATE))
+        mutate_ms = ms(lambda: (ledger.append(expenses[0]), ledger.delete(n // 2)))
+        pandas_ms = ms(lambda: pandas_groupby(expenses))
+        ledger_ms = ms(lambda: (ledger.by_day(RATE), ledger.by_category(RATE)))
+        print(f"{n:>8} | {list_ms:>11.3f} | {total_ms:>12.4f} | {mutate_ms:>13.3f} | {pandas_ms:>19.2f} | {ledger_ms:>16.3f}")
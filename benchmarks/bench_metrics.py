@@ -0,0 +1,84 @@
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+# 저장소/API 캐시 경로는 import 시점에 정해지므로 먼저 임시 폴더로 (API 주소는 바로 실패하는 로컬 포트)
+DATA_DIR = tempfile.mkdtemp(prefix="miyako_metrics_")
+os.environ["MIYAKO_DATA_DIR"] = DATA_DIR
+os.environ["MIYAKO_RATE_URL"] = "http://127.0.0.1:9/rate"
+os.environ["MIYAKO_WEATHER_URL"] = "http://127.0.0.1:9/weather"
+
+import miyako_metrics
+
+# 1) 계측 자체의 비용: 꺼졌을 때/켜졌을 때 section(), timed, cached 호출 한 번당 ns
+# 2) 지표를 켜고 AppTest로 탭마다 앱을 돌려 구간별 백분위와 캐시 적중률을 출력 (지출/다이어리 N건)
+CALLS = 200000
+SIZE = 1000
+RUNS = 10
+TABS = ["🏛️ Overview", "🗺️ Map", "📅 Itinerary", "🎒 Travel Kit", "💰 Wallet"]
+
+
+def ns_per_call(fn):
+    samples = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            fn()
+        samples.append((time.perf_counter() - start) / CALLS * 1e9)
+    return statistics.median(samples)
+
+
+def overhead():
+    import functools
+
+    m = miyako_metrics.Metrics(enabled=False)
+
+    def section():
+        with m.section("x"):
+            pass
+
+    timed = m.timed("y")(lambda: None)
+    cached = m.cached("z", functools.lru_cache())(lambda: None)
+    print(f"{'':<16} | {'disabled (ns)':>13} | {'enabled (ns)':>12}")
+    base = ns_per_call(lambda: None)
+    print(f"{'bare call':<16} | {base:>13.0f} | {base:>12.0f}")
+    for name, fn in [("section()", section), ("@timed", timed), ("cached()", cached)]:
+        m.enable(False)
+        off = ns_per_call(fn)
+        m.enable(True)
+        on = ns_per_call(fn)
+        print(f"{name:<16} | {off:>13.0f} | {on:>12.0f}")
+
+
+def app_breakdown():
+    import harness
+
+    harness.seed(DATA_DIR, SIZE)
+    harness.seed_api_cache(DATA_DIR)
+
+    metrics = miyako_metrics.metrics
+    metrics.enable()
+    at = harness.app_test(600)
+    for _ in range(RUNS):
+        for tab in TABS:
+            harness.run(at, tab)
+    snap = metrics.snapshot()
+    metrics.enable(False)
+
+    print(f"\n{SIZE} expenses/diary entries, {RUNS} runs per tab")
+    print(f"{'section':<24} | {'count':>5} | {'p50 (ms)':>8} | {'p90 (ms)':>8} | {'p99 (ms)':>8} | {'max (ms)':>8}")
+    for name, s in snap["sections"].items():
+        print(f"{name:<24} | {s['count']:>5} | {s['p50_ms']:>8.2f} | {s['p90_ms']:>8.2f} | {s['p99_ms']:>8.2f} | {s['max_ms']:>8.2f}")
+    print(f"\n{'cache':<24} | {'hit':>5} | {'stale':>5} | {'miss':>5} | {'hit ratio':>9}")
+    for name, c in snap["caches"].items():
+        print(f"{name:<24} | {c.get('hit', 0):>5} | {c.get('stale', 0):>5} | {c.get('miss', 0):>5} | {c['hit_ratio']:>9}")
+
+
+if __name__ == "__main__":
+    overhead()
+    app_breakdown()
@@ -0,0 +1,55 @@
+import os
+import statistics
+import sys
+import tempfile
+
+# 저장소/API 경로는 import 시점에 읽으므로 먼저 설정 (API는 바로 실패하는 로컬 포트로)
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = tempfile.mkdtemp(prefix="miyako_bench_")
+os.environ["MIYAKO_DATA_DIR"] = DATA_DIR
+os.environ.setdefault("MIYAKO_RATE_URL", "http://127.0.0.1:9/rate")
+os.environ.setdefault("MIYAKO_WEATHER_URL", "http://127.0.0.1:9/weather")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import harness
+from harness import OVERVIEW, MAP, ITINERARY, WALLET
+
+# 이전 구조: 모든 상호작용이 앱 전체 rerun. 현재 구조: 해당 fragment만 rerun.
+# 탭은 선택된 것만 실행되므로 상호작용마다 해당 탭을 열어 두고 잼 (AppTest 도우미는 harness.py)
+EXPENSES = 300
+DIARY = 50
+REPEAT = 5
+
+# (이름, 상호작용, 브라우저가 다시 실행하는 fragment, 열려 있는 탭). 콜백에서 st.rerun(keys)를 부르는 경우는 None
+INTERACTIONS = [
+    ("add expense", harness.add_expense, None, WALLET),
+    ("delete expense", harness.delete_expense, None, WALLET),
+    ("change budget", harness.change_budget, None, WALLET),
+    ("add diary", harness.add_diary, ["diary"], OVERVIEW),
+    ("select day", harness.select_day, ["itinerary"], ITINERARY),
+    ("JPY calc", harness.jpy_calc, ["jpy_calc"], OVERVIEW),
+    ("MapCode pick", harness.pick_spot, ["mapcode"], MAP),
+    ("nearby radius", harness.nearby_radius, ["nearby"], MAP),
+]
+
+
+def main():
+    harness.seed(DATA_DIR, EXPENSES, diary=DIARY)
+    at = harness.app_test(60)
+    at.run()
+    print("before = full app rerun with the tab open (every interaction before fragments)")
+    print(f"{'interaction':<16} | {'tab':<12} | {'before (ms)':>11} | {'after (ms)':>10} | {'speedup':>7}")
+    for name, action, fragments, tab in INTERACTIONS:
+        harness.run(at, tab)
+        full_ms = statistics.median(harness.run(at, tab) for _ in range(REPEAT))
+        samples = []
+        for _ in range(REPEAT):
+            action(at)
+            samples.append(harness.run(at, tab, fragments))
+            harness.run(at, tab)
+        after_ms = statistics.median(samples)
+        print(f"{name:<16} | {tab:<12} | {full_ms:>11.1f} | {after_ms:>10.1f} | {full_ms / after_ms:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
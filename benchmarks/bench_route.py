@@ -0,0 +1,38 @@
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import miyako_route
+
+# 하루 후보 장소 N개 (처음=공항 도착, 중간=체크인, 끝=숙소 앵커)로 행렬 + 최적화 시간 측정. 목표: 100 ms 미만
+SIZES = [10, 50, 100, 200]
+REPEAT = 5
+
+
+def synthetic_day(n, seed):
+    rng = random.Random(seed)
+    pois = {f"poi {i}": [24.70 + rng.random() * 0.25, 125.12 + rng.random() * 0.35] for i in range(n)}
+    stops = [(name, "관광") for name in pois]
+    stops[0] = (stops[0][0], "도착")
+    stops[n // 2] = (stops[n // 2][0], "숙소")
+    stops[-1] = (stops[-1][0], "숙소")
+    return pois, stops
+
+
+if __name__ == "__main__":
+    print(f"{'stops':>5} | {'matrix (ms)':>11} | {'optimize (ms)':>13} | {'before km':>9} | {'after km':>8}")
+    for n in SIZES:
+        matrix_ms, plan_ms = [], []
+        for seed in range(REPEAT):
+            pois, stops = synthetic_day(n, seed)
+            miyako_route._build_matrix.cache_clear()
+            start = time.perf_counter()
+            matrix = miyako_route.distance_matrix(pois)
+            matrix_ms.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            plan = miyako_route.plan_day(stops, matrix)
+            plan_ms.append((time.perf_counter() - start) * 1000)
+        print(f"{n:>5} | {statistics.median(matrix_ms):>11.2f} | {statistics.median(plan_ms):>13.2f} | {plan.km_before:>9.1f} | {plan.km_after:>8.1f}")
@@ -0,0 +1,40 @@
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import miyako_search
+
+# 임의 한글 이름 + 맵코드 N개로 인덱스 빌드 시간과 질의 지연 측정 (목표: 10k에서 1 ms 미만)
+SIZES = [100, 10000, 50000]
+QUERIES = ["ㅇㄹㅂ", "이라", "irabu", "310 481", "대교", "ㅂ", "해변", "ㅎㄹㅅ ㅅㄹ"]
+SUFFIXES = ["대교", "비치", "해변", "소바", "카페", "식당", "전망대", "시장"]
+
+
+def synthetic_places(n):
+    rng = random.Random(n)
+    places, aliases = {}, {}
+    for i in range(n):
+        name = "".join(chr(0xAC00 + rng.randrange(11172)) for _ in range(rng.randint(2, 4))) + " " + rng.choice(SUFFIXES) + f" {i}"
+        places[name] = f"{rng.choice(['310', '721'])} {rng.randrange(1000):03d} {rng.randrange(1000):03d}*{rng.randrange(100):02d}"
+        aliases[name] = [f"place {i}"]
+    places["이라부 대교"] = "310 481 211*17"
+    aliases["이라부 대교"] = ["Irabu Bridge"]
+    return places, aliases
+
+
+if __name__ == "__main__":
+    print(f"{'POIs':>6} | {'build (ms)':>10} | {'median query (ms)':>17} | {'max query (ms)':>14}")
+    for n in SIZES:
+        places, aliases = synthetic_places(n)
+        start = time.perf_counter()
+        index = miyako_search.PlaceIndex(places, aliases)
+        build_ms = (time.perf_counter() - start) * 1000
+        times = []
+        for q in QUERIES * 20:
+            start = time.perf_counter()
+            index.search(q)
+            times.append((time.perf_counter() - start) * 1000)
+        print(f"{n:>6} | {build_ms:>10.1f} | {statistics.median(times):>17.3f} | {max(times):>14.3f}")
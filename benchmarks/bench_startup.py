@@ -0,0 +1,78 @@
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+# 콜드 스타트 측정: 탭마다 새 프로세스에서 앱을 한 번 실행
+#  - 첫 화면: 스크립트 시작 → 첫 요소(헤더)가 전송될 때까지 (괄호 안은 프로세스 시작부터)
+#  - 전체 실행 시간, 그때까지 로드된 무거운 패키지, -X importtime 기준 import 시간
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "miyakojima_web.py")
+TABS = ["🏛️ Overview", "🗺️ Map", "📅 Itinerary", "🎒 Travel Kit", "💰 Wallet"]
+HEAVY = ["pandas", "numpy", "plotly.express", "folium", "requests", "pyarrow"]
+IMPORT_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def child(tab):
+    start = time.perf_counter()
+    from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+    from streamlit.testing.v1 import AppTest
+
+    first = []
+    enqueue = ScriptRunContext.enqueue
+
+    def timed_enqueue(self, msg):
+        if not first and msg.HasField("delta"):
+            first.append(time.perf_counter())
+        enqueue(self, msg)
+
+    ScriptRunContext.enqueue = timed_enqueue
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.session_state["main_tab"] = tab
+    run_start = time.perf_counter()
+    at.run()
+    end = time.perf_counter()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    loaded = [name for name in HEAVY if name in sys.modules]
+    print(f"RESULT {(first[0] - run_start) * 1000:.0f} {(first[0] - start) * 1000:.0f} {(end - run_start) * 1000:.0f} {(end - start) * 1000:.0f} {','.join(loaded) or '-'}")
+
+
+# 최상위 패키지별 누적 import 시간 (ms)
+def import_times(stderr):
+    totals = {}
+    for line in stderr.splitlines():
+        m = IMPORT_RE.match(line)
+        if m and not m.group(3):
+            name = m.group(4).split(".")[0]
+            totals[name] = totals.get(name, 0) + int(m.group(2)) / 1000
+    return totals
+
+
+def main():
+    env = dict(os.environ, MIYAKO_DATA_DIR=tempfile.mkdtemp(prefix="miyako_startup_"),
+               MIYAKO_RATE_URL="http://127.0.0.1:9/rate", MIYAKO_WEATHER_URL="http://127.0.0.1:9/weather")
+    print(f"{'tab':<14} | {'first element (ms)':>18} | {'script run (ms)':>15} | {'process total (ms)':>18} | heavy modules loaded")
+    breakdown = {}
+    for tab in TABS:
+        proc = subprocess.run([sys.executable, "-X", "importtime", __file__, "--child", tab], env=env, cwd=ROOT,
+                              capture_output=True, text=True, check=True)
+        line = next(l for l in proc.stdout.splitlines() if l.startswith("RESULT "))
+        first_ms, first_abs_ms, run_ms, total_ms, loaded = line.split()[1:]
+        print(f"{tab:<14} | {f'{first_ms} ({first_abs_ms})':>18} | {run_ms:>15} | {total_ms:>18} | {loaded}")
+        breakdown[tab] = import_times(proc.stderr)
+    print("\nimport time by top-level package (ms, cumulative)")
+    watch = {name.split(".")[0] for name in HEAVY}
+    names = sorted({n for t in breakdown.values() for n, ms in t.items() if ms >= 20 and (n in watch or n.startswith(("miyako", "streamlit")))})
+    print(f"{'package':<16} | " + " | ".join(f"{tab[-8:]:>8}" for tab in TABS))
+    for name in names:
+        print(f"{name:<16} | " + " | ".join(f"{breakdown[tab].get(name, 0):>8.0f}" for tab in TABS))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        child(sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,44 @@
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import miyako_storage
+
+# 기록 크기별 변경 1건의 비용: json 전체 재작성 vs 연산 로그. 앱과 같은 경로(SharedStore.update)로 재며,
+# 평균만으로는 압축 때 한 번 튀는 지연이 가려지므로 p50/p99/최댓값을 같이 봄
+SIZES = [100, 1000, 10000, 100000]
+# journal은 압축이 여러 번 일어나도록 COMPACT_THRESHOLD보다 많이 돌림
+OPS = {"json": 20, "journal": 1000}
+
+
+def seed(data_dir, n):
+    state = miyako_storage.default_state()
+    state["expenses"] = [{"item": f"item {i}", "amount": 100 + i % 5000} for i in range(n)]
+    miyako_storage.write_json_atomic(os.path.join(data_dir, miyako_storage.DATA_FILE), state)
+
+
+def bench(kind, n):
+    with tempfile.TemporaryDirectory() as data_dir:
+        seed(data_dir, n)
+        store = miyako_storage.open_store(kind, data_dir)
+        samples = []
+        for i in range(OPS[kind]):
+            for op in ({"op": "add_expense", "expense": {"item": "bench", "amount": i}}, None):
+                op = op or {"op": "delete_expense", "index": len(store.view()["expenses"]) - 1}
+                start = time.perf_counter()
+                store.update(op)
+                samples.append((time.perf_counter() - start) * 1000)
+        store.close()
+    samples.sort()
+    return statistics.mean(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.99)], samples[-1]
+
+
+if __name__ == "__main__":
+    print(f"{'history':>8} | {'backend':<7} | {'mean (ms)':>9} | {'p50 (ms)':>8} | {'p99 (ms)':>8} | {'max (ms)':>8}")
+    for n in SIZES:
+        for kind in ("json", "journal"):
+            mean, p50, p99, worst = bench(kind, n)
+            print(f"{n:>8} | {kind:<7} | {mean:>9.3f} | {p50:>8.3f} | {p99:>8.3f} | {worst:>8.3f}")
@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+# AppTest로 실제 앱 스크립트를 돌려 데이터 크기별 상호작용 지연을 측정하고 기준값과 비교
+#   python benchmarks/bench_suite.py                      # 측정 + benchmarks/baseline.json과 비교 (느려지면 exit 1)
+#   python benchmarks/bench_suite.py --update-baseline    # 현재 결과를 기준값으로 저장
+#   python benchmarks/bench_suite.py --sizes 10 1000      # 일부 크기만
+# 크기마다 새 프로세스(콜드 스타트)에서 지출/다이어리 N건을 채운 저장소로 실행. API는 디스크 캐시로 대신하고
+# 주소는 바로 실패하는 로컬 포트로 돌려 오프라인에서도 같은 결과가 나오게 함 (AppTest 도우미는 harness.py)
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+SIZES = [10, 1000, 10000, 100000]
+RESULTS_FILE = os.path.join(BENCH_DIR, "results.json")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+# 기준값보다 50% 이상 그리고 50 ms 이상 느려지면 회귀로 봄 (공유 머신에서 수십 ms는 흔들림)
+TOLERANCE = 0.5
+MIN_DELTA_MS = 50.0
+
+
+def repeat_for(n):
+    return 9 if n <= 100 else 5 if n <= 1000 else 3 if n <= 10000 else 1
+
+
+# ---- 자식 프로세스: 크기 하나를 측정 ----
+
+def child(n):
+    data_dir = tempfile.mkdtemp(prefix=f"miyako_suite_{n}_")
+    os.environ["MIYAKO_DATA_DIR"] = data_dir
+    os.environ["MIYAKO_RATE_URL"] = "http://127.0.0.1:9/rate"
+    os.environ["MIYAKO_WEATHER_URL"] = "http://127.0.0.1:9/weather"
+    sys.path.insert(0, ROOT)
+    import harness
+    from harness import OVERVIEW, MAP, ITINERARY, WALLET
+
+    harness.seed(data_dir, n)
+    harness.seed_api_cache(data_dir)
+    at = harness.app_test(1800)
+
+    # (이름, 탭, 상호작용, 브라우저가 다시 실행하는 fragment). 콜백에서 st.rerun(keys)를 부르면 None
+    interactions = [
+        ("add expense", WALLET, harness.add_expense, None),
+        ("delete expense", WALLET, harness.delete_expense, None),
+        ("add diary", OVERVIEW, harness.add_diary, ["diary"]),
+        ("select day", ITINERARY, harness.select_day, ["itinerary"]),
+        ("mapcode lookup", MAP, harness.mapcode_lookup, ["mapcode"]),
+    ]
+
+    repeat = repeat_for(n)
+    results = {"cold start": harness.run(at, OVERVIEW)}
+    # 탭 전환: Overview에서 가장 무거운 Wallet 탭으로
+    samples = []
+    for _ in range(repeat):
+        harness.run(at, OVERVIEW)
+        samples.append(harness.run(at, WALLET))
+    results["tab switch"] = statistics.median(samples)
+    for name, tab, action, fragments in interactions:
+        harness.run(at, tab)
+        samples = []
+        for _ in range(repeat):
+            action(at)
+            samples.append(harness.run(at, tab, fragments))
+        results[name] = statistics.median(samples)
+    print("RESULT " + json.dumps({k: round(v, 1) for k, v in results.items()}))
+
+
+# ---- 부모 프로세스: 크기별 실행, 저장, 비교 ----
+
+def measure(sizes):
+    results = {}
+    for n in sizes:
+        print(f"  {n} expenses/diary entries ...", flush=True)
+        proc = subprocess.run([sys.executable, __file__, "--child", str(n)], cwd=ROOT, capture_output=True, text=True)
+        line = next((l for l in proc.stdout.splitlines() if l.startswith("RESULT ")), None)
+        if proc.returncode != 0 or line is None:
+            sys.stderr.write(proc.stderr[-4000:])
+            raise SystemExit(f"benchmark for size {n} failed (exit {proc.returncode})")
+        results[str(n)] = json.loads(line[len("RESULT "):])
+    return results
+
+
+def environment():
+    import streamlit
+    return {"python": platform.python_version(), "streamlit": streamlit.__version__, "platform": platform.platform(),
+            "machine": platform.machine(), "date": datetime.now().isoformat(timespec="seconds")}
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    regressions = []
+    print(f"\n{'size':>6} | {'interaction':<15} | {'baseline (ms)':>13} | {'now (ms)':>9} | {'change':>7}")
+    for size, timings in results.items():
+        for name, now in timings.items():
+            base = baseline.get(size, {}).get(name)
+            if base is None:
+                print(f"{size:>6} | {name:<15} | {'-':>13} | {now:>9.1f} | {'new':>7}")
+                continue
+            change = (now - base) / base if base else 0.0
+            flag = ""
+            if now > base * (1 + tolerance) and now - base > min_delta_ms:
+                regressions.append((size, name, base, now))
+                flag = "  << REGRESSION"
+            print(f"{size:>6} | {name:<15} | {base:>13.1f} | {now:>9.1f} | {change:>+7.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AppTest rerun latency suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--update-baseline", action="store_true", help="save this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--min-delta-ms", type=float, default=MIN_DELTA_MS)
+    parser.add_argument("--output", default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    print("measuring (each size runs in a fresh process):")
+    results = measure(args.sizes)
+    report = {"environment": environment(), "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_FILE):
+            with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.setdefault("results", {}).update(results)
+        baseline["environment"] = report["environment"]
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"baseline updated: {BASELINE_FILE}")
+        return
+
+    if not os.path.exists(BASELINE_FILE):
+        raise SystemExit(f"no baseline at {BASELINE_FILE}; run with --update-baseline on a reference machine first")
+    with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline["results"], args.tolerance, args.min_delta_ms)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%} / {args.min_delta_ms:.0f} ms:")
+        for size, name, base, now in regressions:
+            print(f"  size {size}: {name} {base:.1f} -> {now:.1f} ms")
+        raise SystemExit(1)
+    print("\nno regressions")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        child(int(sys.argv[2]))
+    else:
+        main()
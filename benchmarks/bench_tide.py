@@ -0,0 +1,61 @@
+import math
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import miyako_tide
+
+# 분 단위 조위표: 벡터화 합성 vs 분조/분마다 math.cos 루프, 캐시된 조회, 간조 구간/극값 탐색. 목표: 한 달 수 ms
+SPANS = [1, 5, 30]
+REPEAT = 5
+
+
+def ms(fn, repeat=REPEAT):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+# 같은 식을 스칼라로: 분마다 천문 인수/보정을 다시 계산하지 않고 cos만 (루프 비용의 하한)
+def scalar(station, start, n):
+    names = list(station.constituents)
+    h0 = miyako_tide._hours_j2000(start)
+    args0, n_mid = miyako_tide._astronomical_arguments(h0)
+    nodal = miyako_tide._nodal(n_mid)
+    terms = []
+    for c in names:
+        d, offset = miyako_tide.DOODSON[c]
+        amp, lag = station.constituents[c]
+        f, u = nodal[c]
+        phase = math.radians(sum(k * a for k, a in zip(d, args0)) + offset + u - lag)
+        speed = math.radians(sum(k * v for k, v in zip(d, miyako_tide.ARGUMENT_SPEEDS))) / 60.0
+        terms.append((f * amp, phase, speed))
+    return [station.z0 + sum(a * math.cos(p + s * i) for a, p, s in terms) for i in range(n)]
+
+
+if __name__ == "__main__":
+    station = miyako_tide.HIRARA
+    start = datetime(2026, 2, 16)
+    print(f"{'days':>4} | {'minutes':>7} | {'scalar loop (ms)':>16} | {'vectorized (ms)':>15} | {'cached (ms)':>11} | {'extremes+windows (ms)':>21}")
+    for days in SPANS:
+        n = days * 24 * 60
+        scalar_ms = ms(lambda: scalar(station, start, n), repeat=1)
+        vector_ms = ms(lambda: miyako_tide.TideTable(station, start, days))
+        miyako_tide.tide_table(date(2026, 2, 16), days)
+        cached_ms = ms(lambda: miyako_tide.tide_table(date(2026, 2, 16), days))
+        table = miyako_tide.tide_table(date(2026, 2, 16), days)
+        scan_ms = ms(lambda: (table.extremes(), table.low_windows(0.8)))
+        print(f"{days:>4} | {n:>7} | {scalar_ms:>16.1f} | {vector_ms:>15.2f} | {cached_ms:>11.4f} | {scan_ms:>21.2f}")
+
+    # 스칼라 합성과 결과가 같은지
+    diff = max(abs(a - b) for a, b in zip(scalar(station, start, 1440), miyako_tide.TideTable(station, start, 1).heights))
+    print(f"\nmax |scalar - vectorized| over one day: {diff:.2e} m")
+    table = miyako_tide.tide_table(date(2026, 2, 16), 5)
+    lows = [(t, h) for t, h, kind in table.extremes() if kind == "low"]
+    print("low tides:", ", ".join(f"{t:%m/%d %H:%M} {h:.2f} m" for t, h in lows[:4]), "...")
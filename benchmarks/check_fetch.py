@@ -0,0 +1,188 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+import miyako_fetch
+
+# 조회 계층(miyako_fetch.Fetcher)을 로컬 스텁 HTTP 서버에 붙여 점검. 하나라도 어긋나면 exit 1
+#   python benchmarks/check_fetch.py                   # 콜드 스타트 500번 + 나머지 시나리오
+#   python benchmarks/check_fetch.py --cold-starts 2000
+# 콜드 스타트: 두 응답이 거의 동시에 끝나 디스크 캐시를 동시에 씀 (임시 파일 경합, 늦게 쓴 쪽이 앞 결과를 덮는지)
+# 그 밖에: 느린 응답(타임아웃), 5xx/깨진 JSON, 만료 캐시(stale-while-revalidate), 지난 날 받은 날씨의 날짜 이름,
+# 캐시 파일을 쓸 수 없는 경우
+COLD_STARTS = 500
+TIMEOUT = (0.5, 0.5)
+RATE = {"rates": {"KRW": 9.0}}
+WEATHER = {"daily": {"time": [], "weathercode": [0, 2, 61], "temperature_2m_max": [24, 23, 21], "temperature_2m_min": [18, 18, 17]}}
+
+
+# 경로별 동작: ok / slow (타임아웃보다 늦게) / error (500) / garbage (JSON 아님)
+class Stub(BaseHTTPRequestHandler):
+    modes = {}
+    hits = {}
+    payloads = {"/rate": RATE, "/weather": WEATHER}
+
+    def do_GET(self):
+        Stub.hits[self.path] = Stub.hits.get(self.path, 0) + 1
+        mode = Stub.modes.get(self.path, "ok")
+        if mode == "slow":
+            time.sleep(sum(TIMEOUT) + 1)
+        if mode == "error":
+            self.send_response(500)
+            self.end_headers()
+            return
+        body = b"<html>oops" if mode == "garbage" else json.dumps(Stub.payloads[self.path]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def fetcher(base, cache_path, **kwargs):
+    sources = {"rate": (f"{base}/rate", miyako_fetch.parse_rate), "weather": (f"{base}/weather", miyako_fetch.parse_weather)}
+    return miyako_fetch.Fetcher(sources, cache_path=cache_path, timeout=TIMEOUT, **kwargs)
+
+
+def cold_starts(base, tmp, n):
+    failures = []
+    for i in range(n):
+        path = os.path.join(tmp, f"cold_{i}.json")
+        f = fetcher(base, path)
+        try:
+            values = f.get_many(["rate", "weather"])
+            if values["rate"] != 900.0 or not values["weather"]:
+                failures.append(f"run {i}: {values}")
+            with open(path, "r", encoding="utf-8") as fp:
+                saved = json.load(fp)
+            if set(saved) != {"rate", "weather"}:
+                failures.append(f"run {i}: disk cache has {sorted(saved)}")
+        except Exception as e:
+            failures.append(f"run {i}: {type(e).__name__}: {e}")
+        finally:
+            f.close()
+    return failures
+
+
+def degraded(base, tmp, mode):
+    Stub.modes = {"/weather": mode}
+    f = fetcher(base, os.path.join(tmp, f"{mode}.json"))
+    try:
+        start = time.perf_counter()
+        values = f.get_many(["rate", "weather"])
+        elapsed = time.perf_counter() - start
+    finally:
+        f.close()
+        Stub.modes = {}
+    problems = []
+    if values["rate"] != 900.0 or values["weather"] is not None:
+        problems.append(f"{mode}: {values}")
+    if elapsed > sum(TIMEOUT) + 0.5:
+        problems.append(f"{mode}: waited {elapsed:.2f} s")
+    return problems
+
+
+# 만료된 값을 바로 돌려주고 갱신은 백그라운드에서
+def stale_while_revalidate(base, tmp):
+    f = fetcher(base, os.path.join(tmp, "stale.json"), ttl=0)
+    try:
+        f.get_many(["rate"])
+        before = Stub.hits.get("/rate", 0)
+        Stub.modes = {"/rate": "slow"}
+        start = time.perf_counter()
+        values = f.get_many(["rate"])
+        elapsed = time.perf_counter() - start
+        time.sleep(0.2)
+        refreshed = Stub.hits.get("/rate", 0) > before
+    finally:
+        Stub.modes = {}
+        f.close()
+    problems = []
+    if values["rate"] != 900.0 or elapsed > 0.1:
+        problems.append(f"stale value {values} after {elapsed:.3f} s")
+    if not refreshed:
+        problems.append("no background refresh")
+    return problems
+
+
+# 지난 날 받아 둔 날씨를 만료값으로 보여줄 때: 지난 날짜에 '오늘'을 붙이지 않음 (전부 지났으면 실제 날짜)
+def stale_weather_labels(base, tmp):
+    today = datetime.now(miyako_fetch.pytz.timezone("Asia/Tokyo")).date()
+    old = [today + timedelta(days=n) for n in (-5, -4, -3)]
+    problems = []
+    for offsets, expected in [((-1, 0, 1), ["오늘", "내일"]), ((-5, -4, -3), [f"{d.month}/{d.day}" for d in old])]:
+        path = os.path.join(tmp, f"weather{offsets[0]}.json")
+        daily = dict(WEATHER["daily"], time=[(today + timedelta(days=o)).isoformat() for o in offsets])
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"weather": {"payload": {"daily": daily}, "fetched_at": time.time() + 86400 * offsets[0]}}, f)
+        Stub.modes = {"/weather": "error"}
+        f = fetcher(base, path)
+        try:
+            labels = [w["day"] for w in f.get_many(["weather"])["weather"] or []]
+        finally:
+            Stub.modes = {}
+            f.close()
+        if labels != expected:
+            problems.append(f"dates {offsets}: {labels}, expected {expected}")
+    return problems
+
+
+# 캐시 파일을 쓸 수 없어도 받은 값은 그대로 씀
+def unwritable_cache(base, tmp):
+    f = fetcher(base, os.path.join(tmp, "missing", "dir", "cache.json"))
+    try:
+        values = f.get_many(["rate", "weather"])
+    except Exception as e:
+        return [f"{type(e).__name__}: {e}"]
+    finally:
+        f.close()
+    return [] if values["rate"] == 900.0 and values["weather"] else [f"{values}"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check miyako_fetch against a local stub HTTP server")
+    parser.add_argument("--cold-starts", type=int, default=COLD_STARTS)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    tmp = tempfile.mkdtemp(prefix="miyako_fetch_")
+    checks = [
+        (f"{args.cold_starts} cold starts", lambda: cold_starts(base, tmp, args.cold_starts)),
+        ("slow source times out", lambda: degraded(base, tmp, "slow")),
+        ("5xx source", lambda: degraded(base, tmp, "error")),
+        ("garbage JSON", lambda: degraded(base, tmp, "garbage")),
+        ("stale-while-revalidate", lambda: stale_while_revalidate(base, tmp)),
+        ("stale weather day labels", lambda: stale_weather_labels(base, tmp)),
+        ("unwritable cache file", lambda: unwritable_cache(base, tmp)),
+    ]
+    failed = 0
+    for name, check in checks:
+        problems = check()
+        print(f"{'ok' if not problems else 'FAIL':>4}  {name}")
+        for p in problems[:5]:
+            print(f"      {p}")
+        if len(problems) > 5:
+            print(f"      ... {len(problems) - 5} more")
+        failed += bool(problems)
+    server.shutdown()
+    shutil.rmtree(tmp)
+    if failed:
+        raise SystemExit(f"{failed} check(s) failed")
+
+
+if __name__ == "__main__":
+    main()
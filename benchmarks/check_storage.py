@@ -0,0 +1,321 @@
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+import miyako_storage
+
+# 추가 전용 연산 로그(miyako_storage.JournalBackend)의 정확성 점검. 하나라도 어긋나면 exit 1
+#   python benchmarks/check_storage.py                 # 전부 (프로세스 2개 x 400건 포함)
+#   python benchmarks/check_storage.py --ops 2000
+# 쓰다 죽어 잘린 마지막 줄, 압축 세 단계 사이에 끼어든 apply, 두 rename 사이에서 죽은 압축, 다른 프로세스가 먼저 끝낸 압축,
+# 스레드/프로세스 여러 개가 쓰는 중의 백그라운드 압축, id 없는 예전 파일(ensure_ids/migrate_legacy_json)
+OPS = 400
+# 압축이 자주 일어나도록 작게 (기본 500)
+THRESHOLD = 37
+
+
+def expense(tag, i):
+    return {"op": "add_expense", "expense": {"item": f"{tag}{i}", "amount": i}}
+
+
+def backend(data_dir, **kwargs):
+    b = miyako_storage.JournalBackend(data_dir, **kwargs)
+    b.load()
+    return b
+
+
+def state_of(data_dir):
+    b = backend(data_dir)
+    try:
+        return json.loads(json.dumps(b.state)), b.seq
+    finally:
+        b.close()
+
+
+def leftovers(data_dir):
+    return [name for name in os.listdir(data_dir) if name.endswith(".tmp")]
+
+
+# 상태 불변식: id는 목록 안에서 오름차순이고 전체에서 겹치지 않으며 next_id보다 작음
+def invariants(state):
+    problems = []
+    ids = [r["id"] for key in ("expenses", "diary") for r in state[key]]
+    if len(ids) != len(set(ids)):
+        problems.append("duplicate ids")
+    for key in ("expenses", "diary"):
+        own = [r["id"] for r in state[key]]
+        if own != sorted(own):
+            problems.append(f"{key} ids not ascending")
+    if ids and max(ids) >= state["next_id"]:
+        problems.append(f"next_id {state['next_id']} <= max id {max(ids)}")
+    return problems
+
+
+# 쓰는 도중 죽어 마지막 줄이 잘림: 다시 열면 온전한 줄까지만 재생하고 잘린 꼬리는 잘라냄. 그 뒤 쓴 연산도 남음.
+# 줄바꿈 직전에 죽으면 꼬리가 JSON으로는 온전하므로 그 경우도 따로
+TORN_TAILS = [b'{"op": "add_expense", "expense": {"item": "torn"',
+              b'{"op": "add_expense", "expense": {"item": "torn", "amount": 0}, "seq": %d}']
+
+
+def torn_tail(tmp, n):
+    problems = []
+    for tail in TORN_TAILS:
+        d = tempfile.mkdtemp(dir=tmp)
+        b = backend(d, compact_threshold=10 ** 9)
+        for i in range(n):
+            b.apply(expense("t", i))
+        b.close()
+        log = os.path.join(d, miyako_storage.LOG_FILE)
+        good = os.path.getsize(log)
+        with open(log, "ab") as f:
+            f.write(tail.replace(b"%d", str(n + 1).encode()))
+        state, seq = state_of(d)
+        if len(state["expenses"]) != n or seq != n:
+            problems.append(f"after torn line: {len(state['expenses'])} expenses, seq {seq}, expected {n}")
+        if os.path.getsize(log) != good:
+            problems.append(f"torn tail not truncated ({os.path.getsize(log)} != {good} bytes)")
+        b = backend(d, compact_threshold=10 ** 9)
+        b.apply(expense("t", n))
+        b.close()
+        state, seq = state_of(d)
+        if [r["item"] for r in state["expenses"]] != [f"t{i}" for i in range(n + 1)]:
+            problems.append("op written after the torn line lost or out of order")
+        with open(log, "rb") as f:
+            for raw in f:
+                try:
+                    json.loads(raw)
+                except ValueError:
+                    problems.append(f"unparsable log line {raw[:40]!r}")
+        problems += invariants(state)
+    return problems
+
+
+# 압축 세 단계 사이에 apply가 끼어듦: 표시 이후의 연산은 로그에 남고, 다시 열어도 같은 상태
+def compaction_interleaved(tmp, n):
+    d = tempfile.mkdtemp(dir=tmp)
+    b = backend(d, compact_threshold=10 ** 9)
+    for i in range(n):
+        b.apply(expense("a", i))
+    mark = b.begin_compaction()
+    for i in range(n, n + 30):
+        b.apply(expense("a", i))
+    snapshot_tmp = b.build_snapshot(mark)
+    b.apply({"op": "edit_expenses", "update": [{"id": 0, "amount": -1}], "delete": [1]})
+    b.apply(expense("a", n + 30))
+    live = json.loads(json.dumps(b.state))
+    done = b.finish_compaction(mark, snapshot_tmp)
+    b.close()
+    problems = [] if done else ["finish_compaction gave up"]
+    state, seq = state_of(d)
+    if state != live:
+        problems.append("state after reopen differs from the live state")
+    if seq != n + 32:
+        problems.append(f"seq {seq}, expected {n + 32}")
+    with open(os.path.join(d, miyako_storage.LOG_FILE), "rb") as f:
+        lines = f.read().count(b"\n")
+    if lines != 32:
+        problems.append(f"{lines} log lines after compaction, expected 32 (ops applied after the mark)")
+    if leftovers(d):
+        problems.append(f"tmp files left: {leftovers(d)}")
+    return problems + invariants(state)
+
+
+# 새 스냅샷으로 바꾼 직후(로그는 아직 예전 것) 죽음: 스냅샷의 seq 덕분에 로그를 다시 재생해도 중복되지 않음
+def crash_between_renames(tmp, n):
+    d = tempfile.mkdtemp(dir=tmp)
+    b = backend(d, compact_threshold=10 ** 9)
+    for i in range(n):
+        b.apply(expense("c", i))
+    live = json.loads(json.dumps(b.state))
+    mark = b.begin_compaction()
+    os.replace(b.build_snapshot(mark), b.snapshot_path)
+    b.close()
+    state, seq = state_of(d)
+    problems = [] if state == live else [f"{len(state['expenses'])} expenses after replay, expected {n}"]
+    if seq != n:
+        problems.append(f"seq {seq}, expected {n}")
+    return problems + invariants(state)
+
+
+# 표시와 마무리 사이에 다른 프로세스(다른 백엔드)가 먼저 압축: 늦은 쪽은 포기하고 임시 파일을 지움
+def compaction_lost_race(tmp, n):
+    d = tempfile.mkdtemp(dir=tmp)
+    first = backend(d, compact_threshold=10 ** 9)
+    for i in range(n):
+        first.apply(expense("x", i))
+    other = backend(d, compact_threshold=10 ** 9)
+    mark = first.begin_compaction()
+    snapshot_tmp = first.build_snapshot(mark)
+    other.apply(expense("y", 0))
+    # 임시 파일 이름은 pid/스레드별이라 다른 프로세스 대신 다른 스레드에서
+    t = threading.Thread(target=other.compact)
+    t.start()
+    t.join()
+    # SharedStore.update처럼 쓰기 전에 항상 catch_up (바뀐 스냅샷을 다시 읽음)
+    first.catch_up()
+    first.apply(expense("x", n))
+    done = first.finish_compaction(mark, snapshot_tmp)
+    problems = ["late compaction replaced the newer snapshot"] if done else []
+    first.catch_up()
+    other.catch_up()
+    if first.state != other.state:
+        problems.append("the two backends disagree")
+    first.close()
+    other.close()
+    state, _ = state_of(d)
+    if len(state["expenses"]) != n + 2:
+        problems.append(f"{len(state['expenses'])} expenses, expected {n + 2}")
+    if leftovers(d):
+        problems.append(f"tmp files left: {leftovers(d)}")
+    return problems + invariants(state)
+
+
+# SharedStore 하나에 스레드 여러 개가 쓰는 동안 백그라운드 스레드가 압축
+def threads_with_compaction(tmp, n):
+    d = tempfile.mkdtemp(dir=tmp)
+    store = miyako_storage.SharedStore(miyako_storage.JournalBackend(d, compact_threshold=THRESHOLD), d)
+    errors = []
+
+    def write(tag):
+        try:
+            for i in range(n):
+                store.update(expense(tag, i))
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+
+    threads = [threading.Thread(target=write, args=(tag,)) for tag in "pqrs"]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    live = json.loads(json.dumps(dict(store.view())))
+    store.close()
+    state, _ = state_of(d)
+    problems = errors[:]
+    if state != live:
+        problems.append("state after reopen differs from the live state")
+    for tag in "pqrs":
+        items = [r["item"] for r in state["expenses"] if r["item"].startswith(tag)]
+        if items != [f"{tag}{i}" for i in range(n)]:
+            problems.append(f"thread {tag}: {len(items)} of {n} ops, in order: {items == sorted(items, key=lambda s: int(s[1:]))}")
+    if leftovers(d):
+        problems.append(f"tmp files left: {leftovers(d)}")
+    return problems + invariants(state)
+
+
+def _process_writer(data_dir, tag, n):
+    store = miyako_storage.SharedStore(miyako_storage.JournalBackend(data_dir, compact_threshold=THRESHOLD), data_dir)
+    for i in range(n):
+        store.update(expense(tag, i))
+        # 자기 항목을 id로 고치고 지움 (다른 프로세스의 추가/압축과 섞여도 같은 항목에 적용되는지). 고친 항목은 지우지 않음
+        if i % 5 == 4:
+            mine = [r["id"] for r in store.view()["expenses"] if r["item"].startswith(tag) and r["amount"] != -1]
+            store.update({"op": "edit_expenses", "update": [{"id": mine[-1], "amount": -1}], "delete": [mine[0]]})
+    store.close()
+
+
+# 워커 프로세스 두 개가 같은 파일에 동시에 쓰고 각자 압축
+def two_processes(tmp, n):
+    d = tempfile.mkdtemp(dir=tmp)
+    procs = [multiprocessing.Process(target=_process_writer, args=(d, tag, n)) for tag in "mn"]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    problems = [f"writer exited with {p.exitcode}" for p in procs if p.exitcode]
+    state, _ = state_of(d)
+    for tag in "mn":
+        items = [r for r in state["expenses"] if r["item"].startswith(tag)]
+        if len(items) != n - n // 5:
+            problems.append(f"process {tag}: {len(items)} expenses, expected {n - n // 5}")
+        if sum(r["amount"] == -1 for r in items) != n // 5:
+            problems.append(f"process {tag}: {sum(r['amount'] == -1 for r in items)} edits kept, expected {n // 5}")
+    if leftovers(d):
+        problems.append(f"tmp files left: {leftovers(d)}")
+    return problems + invariants(state)
+
+
+# id가 없던 예전 파일: 읽을 때마다 같은 순서로 같은 id, 변환(migrate) 뒤에도 같고, 새 항목은 그다음 id
+def legacy_ids(tmp):
+    d = tempfile.mkdtemp(dir=tmp)
+    legacy = {"expenses": [{"item": f"e{i}", "amount": i} for i in range(5)], "total_budget": 90000,
+              "diary": ["first", "second", {"text": "third"}], "dark_mode": True}
+    src = os.path.join(d, "legacy.json")
+    with open(src, "w", encoding="utf-8") as f:
+        json.dump(legacy, f)
+    problems = []
+    shutil.copy(src, os.path.join(d, miyako_storage.DATA_FILE))
+    first, _ = state_of(d)
+    second, _ = state_of(d)
+    if first != second:
+        problems.append("two loads of the same legacy file gave different ids")
+    if [r["id"] for r in first["expenses"]] != list(range(5)) or [r["id"] for r in first["diary"]] != [5, 6, 7]:
+        problems.append(f"unexpected ids {[r['id'] for r in first['expenses'] + first['diary']]}")
+    if [r["text"] for r in first["diary"]] != ["first", "second", "third"]:
+        problems.append("legacy diary strings not converted")
+    migrated = miyako_storage.migrate_legacy_json(src, d)
+    if migrated != first:
+        problems.append("migrate_legacy_json assigned different ids than a plain load")
+    b = backend(d)
+    b.apply(expense("new", 0))
+    b.apply({"op": "add_diary", "entry": "fourth"})
+    b.close()
+    state, _ = state_of(d)
+    if [r["id"] for r in state["expenses"]][-1] != 8 or state["diary"][-1]["id"] != 9:
+        problems.append(f"new ids {state['expenses'][-1]['id']}, {state['diary'][-1]['id']}, expected 8, 9")
+    # 일부만 id가 있는 파일: 없는 항목은 이미 쓰인 가장 큰 id 다음부터
+    mixed = {"expenses": [{"item": "a", "amount": 1, "id": 10}, {"item": "b", "amount": 2}], "diary": ["c"]}
+    ensured = miyako_storage.ensure_ids(dict(miyako_storage.default_state(), **mixed))
+    if [r["id"] for r in ensured["expenses"] + ensured["diary"]] != [10, 11, 12] or ensured["next_id"] != 13:
+        problems.append(f"mixed ids {[r['id'] for r in ensured['expenses'] + ensured['diary']]}, next_id {ensured['next_id']}")
+    try:
+        miyako_storage.migrate_legacy_json(src, d)
+        problems.append("second migrate over a non-empty log did not refuse")
+    except RuntimeError:
+        pass
+    return problems + invariants(state)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Correctness checks for the journal storage backend")
+    parser.add_argument("--ops", type=int, default=OPS, help="ops per writer")
+    args = parser.parse_args()
+    n = args.ops
+    tmp = tempfile.mkdtemp(prefix="miyako_storage_")
+    checks = [
+        ("replay after a torn last line", lambda: torn_tail(tmp, n)),
+        ("apply between compaction phases", lambda: compaction_interleaved(tmp, n)),
+        ("crash between compaction renames", lambda: crash_between_renames(tmp, n)),
+        ("compaction lost to another process", lambda: compaction_lost_race(tmp, n)),
+        (f"4 threads x {n} ops, background compaction", lambda: threads_with_compaction(tmp, n)),
+        (f"2 processes x {n} ops, background compaction", lambda: two_processes(tmp, n)),
+        ("ensure_ids / migrate on legacy files", lambda: legacy_ids(tmp)),
+    ]
+    failed = 0
+    for name, check in checks:
+        start = time.perf_counter()
+        try:
+            problems = check()
+        except Exception as e:
+            problems = [f"{type(e).__name__}: {e}"]
+        print(f"{'ok' if not problems else 'FAIL':>4}  {name} ({time.perf_counter() - start:.1f} s)")
+        for p in problems[:5]:
+            print(f"      {p}")
+        if len(problems) > 5:
+            print(f"      ... {len(problems) - 5} more")
+        failed += bool(problems)
+    shutil.rmtree(tmp)
+    if failed:
+        raise SystemExit(f"{failed} check(s) failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import itertools
+import os
+import time
+
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import local_script_runner
+
+# bench_suite.py / bench_rerun.py / bench_metrics.py가 같이 쓰는 AppTest 도우미: 저장소 시드, 탭을 지정한 실행, 상호작용.
+# AppTest는 선택된 탭을 기억하지 않으므로 (브라우저는 기억함) 매 실행 전에 다시 지정하고, 위젯 상호작용을 전체 rerun으로
+# 돌리므로 브라우저가 하듯 fragment id를 rerun 요청에 실어 보냄. 이 두 가지는 AppTest 내부
+# (local_script_runner.RerunData, AppTest._fragment_storage)에 기대므로 Streamlit을 올릴 때는 이 파일만 고치면 됨.
+# miyako_* 모듈은 함수 안에서만 import (스크립트가 MIYAKO_DATA_DIR 등을 먼저 정한 뒤에 읽히도록)
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+APP = os.path.join(ROOT, "miyakojima_web.py")
+
+OVERVIEW, MAP, ITINERARY, WALLET = "🏛️ Overview", "🗺️ Map", "📅 Itinerary", "💰 Wallet"
+DAYS = ["2/16 (월)", "2/17 (화)", "2/18 (수)", "2/19 (목)", "2/20 (금)"]
+MAPCODE_QUERIES = ["ㅇㄹㅂ", "irabu", "310 481", "대교", "ㄷㄱ"]
+
+_fragment_queue = []
+_RerunData = local_script_runner.RerunData
+
+
+def _rerun_data(**kwargs):
+    if _fragment_queue:
+        kwargs["fragment_id_queue"] = list(_fragment_queue)
+    return _RerunData(**kwargs)
+
+
+def app_test(timeout):
+    local_script_runner.RerunData = _rerun_data
+    return AppTest.from_file(APP, default_timeout=timeout)
+
+
+# 탭을 지정해 한 번 실행하고 걸린 ms를 돌려줌. fragments: 브라우저가 다시 실행할 fragment 키 (없으면 전체 rerun)
+def run(at, tab, fragments=None):
+    ids = at._fragment_storage._ids_by_target_key
+    _fragment_queue[:] = [fid for key in fragments or [] for fid in ids[key]]
+    at.session_state["main_tab"] = tab
+    start = time.perf_counter()
+    try:
+        at.run()
+    finally:
+        _fragment_queue.clear()
+    elapsed = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return elapsed
+
+
+# ---- 저장소 시드 ----
+
+def seed(data_dir, n, diary=None):
+    import miyako_ledger
+    import miyako_storage
+
+    state = miyako_storage.default_state()
+    state["expenses"] = [miyako_ledger.new_expense(f"item {i}", 100 + i % 5000, miyako_ledger.CATEGORIES[i % len(miyako_ledger.CATEGORIES)],
+                                                   "JPY", DAYS[i % len(DAYS)], ts=1771200000 + i) for i in range(n)]
+    state["diary"] = [f"[02/16 12:{i % 60:02d}] note {i}" for i in range(n if diary is None else diary)]
+    miyako_storage.write_json_atomic(os.path.join(data_dir, miyako_storage.DATA_FILE), state)
+
+
+# 환율/날씨 응답을 방금 받은 것처럼 캐시에 넣어 둠 (네트워크 없이 즉시 값이 나옴)
+def seed_api_cache(data_dir):
+    import miyako_fetch
+    import miyako_storage
+
+    now = time.time()
+    weather = {"daily": {"time": [], "weathercode": [0, 2, 61], "temperature_2m_max": [24, 23, 21], "temperature_2m_min": [18, 18, 17]}}
+    miyako_storage.write_json_atomic(os.path.join(data_dir, miyako_fetch.CACHE_FILE), {
+        "rate": {"payload": {"rates": {"KRW": 9.0}}, "fetched_at": now},
+        "weather": {"payload": weather, "fetched_at": now},
+    })
+
+
+# ---- 상호작용 (위젯 값을 바꾸기만 함. 실행은 run으로) ----
+
+def add_expense(at):
+    at.text_input(key="expense_item").input("bench")
+    at.number_input(key="expense_amount").set_value(500)
+    [b for b in at.button if b.label == "추가"][0].click()
+
+
+# History 편집기에서 맨 위(최신) 행을 체크하고 저장
+def delete_expense(at):
+    editor = next(d for d in at.dataframe if d.key and d.key.startswith("exp_editor_"))
+    at.session_state[editor.key] = {"edited_rows": {0: {"삭제": True}}, "added_rows": [], "deleted_rows": []}
+    next(b for b in at.button if b.label.startswith("변경 저장")).click()
+
+
+def change_budget(at):
+    widget = at.number_input(key="budget_input")
+    widget.set_value(widget.value + 10000)
+
+
+def add_diary(at):
+    at.text_input(key="diary_note").input("bench")
+    [b for b in at.button if b.label == "기록 (Save)"][0].click()
+
+
+def select_day(at):
+    current = at.session_state.selected_day
+    at.session_state.selected_day = DAYS[(DAYS.index(current) + 1) % len(DAYS)]
+
+
+def jpy_calc(at):
+    widget = [n for n in at.number_input if n.label == "JPY"][0]
+    widget.set_value((widget.value or 0) + 100)
+
+
+def pick_spot(at):
+    box = at.selectbox(key="mapcode_spot")
+    box.select(box.options[(box.options.index(box.value) + 1) % len(box.options)])
+
+
+def nearby_radius(at):
+    widget = at.slider(key="nearby_km")
+    widget.set_value(widget.value % 30 + 1)
+
+
+_queries = itertools.cycle(MAPCODE_QUERIES)
+
+
+def mapcode_lookup(at):
+    at.text_input(key="mapcode_query").input(next(_queries))
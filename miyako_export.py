@@ -0,0 +1,492 @@
+import argparse
+import functools
+import hashlib
+import html
+import importlib.metadata
+import importlib.util
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import miyako_fetch
+import miyako_geo
+import miyako_images
+import miyako_search
+import miyako_storage
+from miyako_trip import (mapcode_dict, MAPCODE_ALIASES, itinerary_data, locations, TRIP_DAYS, THEMES, HIDDEN_GEMS,
+                         GOURMET_TOP10, MUST_VISIT_TOP10, EXPERIENCES, PACKING_LIST, PHRASES, EMERGENCY_CONTACTS, TIDE_LEVELS,
+                         map_url, trip_date, stop_time)
+
+# 여행 전체를 네트워크 없이 열리는 정적 HTML 묶음으로 내보냄 (일정/맵코드/지도/스팟/준비물/회화 + 마지막 날씨·환율)
+#   python miyako_export.py              # static/offline/ 에서 원본이 바뀐 파일만 다시 생성
+#   python miyako_export.py --force      # 전부 다시
+# 앱 서버의 정적 서빙(/app/static/offline/index.html)이나 아무 정적 호스팅에서 한 번 열면 서비스 워커가 전부 캐시해 두고,
+# 이후에는 신호가 없어도 캐시에서 바로 열림. 파일마다 원본 데이터의 해시를 export_manifest.json에 남겨 바뀐 것만 다시 씀
+ROOT = os.path.dirname(os.path.abspath(__file__))
+EXPORT_DIR = os.path.join(ROOT, "static", "offline")
+EXPORT_URL = "/app/static/offline/index.html"
+MANIFEST_FILE = "export_manifest.json"
+# 내보내기는 한 번에 하나만 (같은 프로세스의 다른 세션은 _lock, 다른 워커 프로세스는 이 파일 잠금)
+LOCK_FILE = ".export.lock"
+CACHE_PREFIX = "miyako-offline"
+# 지도 타일/CDN을 담는 런타임 캐시의 최대 항목 수
+RUNTIME_CACHE_MAX = 1500
+TRIP_START = "2026-02-16"
+# 동선 이미지는 이 폭의 변형만 묶음에 넣음 (서비스 워커가 전부 미리 받으므로)
+IMAGE_WIDTHS = (640, 1024)
+CDN_RE = re.compile(r'(?:src|href)="(https://[^"]+\.(?:js|css))"')
+# 페이지를 그리는 모듈과 라이브러리. 이 중 하나라도 바뀌면 모든 페이지의 해시가 바뀌어 다시 만듦
+RENDER_MODULES = ("miyako_export", "miyako_trip", "miyako_tide", "miyako_geo", "miyako_route", "miyako_images",
+                  "miyako_search", "miyako_fetch")
+RENDER_PACKAGES = ("folium",)
+
+
+class ExportRunning(Exception):
+    pass
+
+
+_lock = threading.Lock()
+
+
+@dataclass
+class Page:
+    name: str
+    inputs: object  # 이 파일을 만드는 원본 데이터. 해시가 같으면 다시 만들지 않음
+    render: object  # () -> str 또는 bytes
+
+
+# 모듈은 import하지 않고 소스 파일만 읽음 (miyako_route/miyako_tide는 다시 만들 페이지가 있을 때만 import)
+def _code_version():
+    digest = hashlib.sha1()
+    for name in RENDER_MODULES:
+        with open(importlib.util.find_spec(name).origin, "rb") as f:
+            digest.update(f.read())
+    for name in RENDER_PACKAGES:
+        digest.update(importlib.metadata.version(name).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def _digest(code, page):
+    raw = json.dumps([code, page.name, page.inputs], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def _write(path, content):
+    tmp = miyako_storage._tmp_path(path)
+    with open(tmp, "wb") as f:
+        f.write(content if isinstance(content, bytes) else content.encode("utf-8"))
+    os.replace(tmp, path)
+
+
+esc = html.escape
+
+
+# ---- 공통 레이아웃 ----
+
+def nav_items():
+    days = [(f"day-{i}.html", f"📅 {day}") for i, day in enumerate(TRIP_DAYS, 1)]
+    return [("index.html", "🏛️ Overview")] + days + [("map.html", "🗺️ Map"), ("mapcodes.html", "📍 MapCode"),
+                                                    ("spots.html", "💎 Spots"), ("kit.html", "🎒 Kit")]
+
+
+def _layout(current, title, body):
+    links = []
+    for href, label in nav_items():
+        cls = ' class="on"' if href == current else ""
+        links.append(f'<a href="{href}"{cls}>{esc(label)}</a>')
+    return f"""<!doctype html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta name="theme-color" content="#0077b6">
+<title>{esc(title)} · Miyako Blue 🐢</title>
+<link rel="manifest" href="manifest.webmanifest">
+<link rel="stylesheet" href="style.css">
+</head>
+<body>
+<header class="wave-header"><h2>Miyako Blue 🐢</h2><p>Offline Edition <span id="net"></span></p></header>
+<nav>{"".join(links)}</nav>
+<main>
+{body}
+</main>
+<script src="app.js"></script>
+</body>
+</html>
+"""
+
+
+def _link(place, label=None):
+    return f'<a href="{esc(map_url(place))}" target="_blank" rel="noopener">{esc(label or place)}</a>'
+
+
+def _stamp(ts):
+    return datetime.fromtimestamp(ts).strftime("%m/%d %H:%M")
+
+
+# ---- 페이지 ----
+
+def index_page(weather, rate):
+    rows = "".join(f"<tr><td>{esc(day)}</td><td>{esc(date)}</td><td>{esc(theme)}</td><td>{esc(point)}</td></tr>" for day, date, theme, point in THEMES)
+    days = "".join(f'<li><a href="day-{i}.html">{esc(day)}</a></li>' for i, day in enumerate(TRIP_DAYS, 1))
+    parts = [f'<h3>Trip Overview</h3><p id="dday" data-start="{TRIP_START}"></p>',
+             f'<table><tr><th>일차</th><th>날짜</th><th>테마</th><th>포인트</th></tr>{rows}</table>',
+             f'<h4>📅 일정</h4><ul class="days">{days}</ul>']
+    if weather:
+        forecasts, fetched_at = weather
+        cells = "".join(f'<div class="weather-row"><b>{esc(w["day"])}</b><span>{w["icon"]}</span>'
+                        f'<span><span class="hi">{w["max"]}°</span> / <span class="lo">{w["min"]}°</span></span></div>' for w in forecasts)
+        parts.append(f'<h4>☀️ Miyako Weather</h4><div class="card">{cells}<p class="muted">{_stamp(fetched_at)} 예보 기준</p></div>')
+    value, fetched_at = rate or (miyako_fetch.DEFAULT_RATE, None)
+    stamp = f"{_stamp(fetched_at)} 기준" if fetched_at else "기본값"
+    parts.append(f'<h4>💴 JPY Calc</h4><div class="card"><p class="muted">100¥ = {value:.1f}₩ ({stamp})</p>'
+                 f'<input id="jpy" type="number" inputmode="numeric" placeholder="엔화 입력" data-rate="{value}"><p id="krw"></p></div>')
+    return _layout("index.html", "Overview", "\n".join(parts))
+
+
+def day_stops(day):
+    return [row for row in itinerary_data if row[0] == day]
+
+
+def day_plan(stops):
+    import miyako_route
+
+    plan = miyako_route.plan_day([(row[3], row[2]) for row in stops], miyako_route.distance_matrix(locations))
+    return {"order": plan.order, "km_before": round(plan.km_before, 1), "km_after": round(plan.km_after, 1), "saved_km": round(plan.saved_km, 1)}
+
+
+# 그날의 간조/만조 시각과 물때 경고 (문자열만 남겨 해시 입력으로도 씀)
+def day_tide(day, stops):
+    import miyako_tide
+
+    table = miyako_tide.tide_table(trip_date(TRIP_DAYS[0]), len(TRIP_DAYS))
+    begin = stop_time(day, "00:00")
+    end = begin + timedelta(days=1)
+    extremes = [f"{'간조' if kind == 'low' else '만조'} {t:%H:%M} ({h:.2f} m)" for t, h, kind in table.extremes() if begin <= t < end]
+    warnings = miyako_tide.tide_warnings(table, [(row[3], stop_time(day, row[1])) for row in stops], TIDE_LEVELS)
+    return {"extremes": extremes, "warnings": [w.message() for w in warnings]}
+
+
+def _day_image_name(index, fmt, width):
+    return f"day-{index}-{width}.{miyako_images.FORMATS[fmt][0]}"
+
+
+def day_page(index, day, stops, plan, tide, image):
+    items = []
+    for _, t, kind, place, summary, cost, desc in stops:
+        code = mapcode_dict.get(place, "-")
+        items.append(f'<details class="card"><summary>⏰ {esc(t)} | {esc(place)} ({esc(kind)})</summary>'
+                     f'<p><b>💡 {esc(summary)}</b></p><p>{esc(desc)}</p>'
+                     f'<p>📍 {_link(place, "구글 지도")} · <code>{esc(code)}</code> · ¥{cost:,}</p></details>')
+    body = [f"<h3>{esc(day)} Schedule</h3>"] + [f'<p class="warning">🌊 {esc(w)}</p>' for w in tide["warnings"]] + items
+    body.append(f'<p class="muted">🌊 물때 (히라라): {esc(" · ".join(tide["extremes"]))}</p>')
+    if plan["saved_km"] > 0.1:
+        body.append(f'<p class="info">🧭 <b>추천 동선</b>: {esc(" → ".join(plan["order"]))}<br>'
+                    f'약 {plan["saved_km"]:.1f} km 단축 ({plan["km_before"]:.1f} → {plan["km_after"]:.1f} km)</p>')
+    if image:
+        body.append(miyako_images.picture_html(image["set"], f"Day {index} Route", widths=image["widths"], url=image["url"]))
+    return _layout(f"day-{index}.html", day, "\n".join(body))
+
+
+def map_page():
+    body = '<h3>🗺️ Map</h3><iframe src="map_frame.html" title="Miyako map" class="map"></iframe>' \
+           '<p class="muted">지도 타일은 온라인에서 한 번 본 영역만 오프라인에 남아요.</p>'
+    return _layout("map.html", "Map", body)
+
+
+def mapcodes_page(flags):
+    rows = []
+    for name, code in mapcode_dict.items():
+        keys = [miyako_search.normalize(name), miyako_search.to_choseong(name), miyako_search.normalize(code)]
+        keys += [miyako_search.normalize(alias) for alias in MAPCODE_ALIASES.get(name, [])]
+        notes = " ".join(f'<span class="warn">{esc(miyako_search.MAPCODE_FLAGS[f])}</span>' for f in flags.get(name, []))
+        rows.append(f'<tr data-key="{esc("|".join(keys))}"><td>{_link(name)}</td><td><code>{esc(code)}</code> {notes}</td></tr>')
+    body = ('<h3>📍 MapCode</h3><input id="q" type="search" placeholder="예: ㅇㄹㅂ, irabu, 310 481">'
+            f'<table class="codes"><tr><th>장소</th><th>MapCode</th></tr>{"".join(rows)}</table>'
+            '<p class="muted">👆 렌터카 내비게이션에 입력하세요.</p>')
+    return _layout("mapcodes.html", "MapCode", body)
+
+
+def _top10(entries):
+    items = []
+    for label, query, rating, note in entries:
+        rated = f"({esc(rating)}) " if rating else ""
+        items.append(f"<li><b>{_link(query, label)}</b>: {rated}{esc(note)}</li>")
+    return f"<ol>{''.join(items)}</ol>"
+
+
+def spots_page():
+    cards = []
+    for sections in HIDDEN_GEMS:
+        parts = []
+        for title, spots in sections:
+            items = "".join(f"<li>{_link(name)}: {esc(note)}</li>" for name, note in spots)
+            parts.append(f"<h4>{esc(title)}</h4><ul>{items}</ul>")
+        cards.append(f'<div class="card">{"".join(parts)}</div>')
+    experiences = "".join(f'<p class="{style}">{icon} <b>{_link(query, name)}</b><br>{esc(note)}</p>' for style, icon, name, query, note in EXPERIENCES)
+    body = [f'<h3>The Hidden Gems</h3><div class="cols">{"".join(cards)}</div>',
+            f"<details><summary>🍽️ Gourmet Top 10 (구글 4.0+ 맛집 추가 추천)</summary>{_top10(GOURMET_TOP10)}</details>",
+            f"<details><summary>🌟 Must-Visit Top 10 (현지인 추천 명소)</summary>{_top10(MUST_VISIT_TOP10)}</details>",
+            f'<h3>Island Experiences</h3><div class="cols">{experiences}</div>']
+    return _layout("spots.html", "Secret Spots", "\n".join(body))
+
+
+def kit_page():
+    groups = []
+    for group, expanded, items in PACKING_LIST:
+        boxes = "".join(f'<label><input type="checkbox" data-check="{esc(group)}/{esc(item)}"> {esc(item)}</label>' for item in items)
+        groups.append(f'<details{" open" if expanded else ""}><summary>{esc(group)}</summary>{boxes}</details>')
+    phrases = []
+    for tab, lines in PHRASES:
+        rows = "".join(f'<p class="{style}">{esc(situation)}: {esc(phrase)}</p>' for style, situation, phrase in lines)
+        phrases.append(f"<h4>{esc(tab)}</h4>{rows}")
+    contacts = "<br>".join(" / ".join(f"<b>{esc(label)}:</b> {esc(number)}" for label, number in line) for line in EMERGENCY_CONTACTS)
+    body = [f'<h3>🎒 Smart Travel Kit</h3><h4>✅ Packing Checklist</h4>{"".join(groups)}',
+            f'<h4>🗣️ Survival Japanese</h4>{"".join(phrases)}',
+            f'<div class="sos-card">{contacts}</div>']
+    return _layout("kit.html", "Travel Kit", "\n".join(body))
+
+
+STYLE_CSS = """body { margin: 0; font-family: -apple-system, BlinkMacSystemFont, "SF Pro Display", sans-serif; background: linear-gradient(180deg, #e0f2f1 0%, #f8fbff 30%, #ffffff 100%); color: #263238; }
+main { max-width: 960px; margin: 0 auto; padding: 0 16px 40px; }
+.wave-header { background: linear-gradient(90deg, #0077b6 0%, #00b4d8 50%, #90e0ef 100%); padding: 15px; color: white; text-align: center; }
+.wave-header h2 { margin: 0; font-size: 24px; }
+.wave-header p { margin: 4px 0 0; font-size: 13px; }
+nav { display: flex; gap: 6px; overflow-x: auto; padding: 10px 16px; background: white; position: sticky; top: 0; box-shadow: 0 2px 8px rgba(0,0,0,0.05); }
+nav a { white-space: nowrap; padding: 6px 10px; border-radius: 16px; color: #546e7a; font-size: 14px; }
+nav a.on { background: #0077b6; color: white; }
+a { color: #0077b6; text-decoration: none; font-weight: 600; }
+table { border-collapse: collapse; width: 100%; background: white; }
+th, td { text-align: left; padding: 6px 8px; border-bottom: 1px solid #eee; font-size: 14px; }
+.card, details { background: white; padding: 14px 18px; border-radius: 14px; box-shadow: 0 10px 25px rgba(0,0,0,0.03); margin: 10px 0; }
+summary { font-weight: 700; cursor: pointer; }
+.cols { display: grid; grid-template-columns: repeat(auto-fit, minmax(260px, 1fr)); gap: 12px; }
+.weather-row { display: flex; justify-content: space-between; padding: 6px 0; border-bottom: 1px solid #eee; }
+.hi { color: #ff5252; } .lo { color: #448aff; }
+.muted { color: #78909c; font-size: 13px; }
+.info, .success, .warning, .error { padding: 10px 14px; border-radius: 10px; }
+.info { background: #e3f2fd; } .success { background: #e8f5e9; } .warning { background: #fff8e1; } .error { background: #ffebee; }
+.warn { color: #e65100; font-size: 12px; }
+.sos-card { background-color: #ffebee; border: 1px solid #ffcdd2; padding: 15px; border-radius: 12px; color: #c62828; margin-top: 16px; }
+label { display: block; padding: 4px 0; }
+input[type=search], input[type=number] { width: 100%; box-sizing: border-box; padding: 10px; font-size: 16px; border: 1px solid #cfd8dc; border-radius: 10px; }
+iframe.map { width: 100%; height: 70vh; border: 0; border-radius: 14px; }
+img { max-width: 100%; border-radius: 14px; }
+"""
+
+# 서비스 워커 등록, 체크리스트 저장, 맵코드 필터, 엔화 계산기, D-Day (모두 네트워크 없이 동작)
+APP_JS = """if ("serviceWorker" in navigator) navigator.serviceWorker.register("sw.js");
+function showNet() { document.getElementById("net").textContent = navigator.onLine ? "" : "· 📴 오프라인"; }
+addEventListener("online", showNet); addEventListener("offline", showNet); showNet();
+document.querySelectorAll("input[data-check]").forEach(function (box) {
+  var key = "miyako-check:" + box.dataset.check;
+  box.checked = localStorage.getItem(key) === "1";
+  box.addEventListener("change", function () { localStorage.setItem(key, box.checked ? "1" : "0"); });
+});
+var q = document.getElementById("q");
+if (q) q.addEventListener("input", function () {
+  var v = q.value.toLowerCase().replace(/[\\s\\-_'’.,()·*]+/g, "");
+  document.querySelectorAll("tr[data-key]").forEach(function (row) { row.hidden = v !== "" && row.dataset.key.indexOf(v) < 0; });
+});
+var jpy = document.getElementById("jpy");
+if (jpy) jpy.addEventListener("input", function () {
+  var won = Math.floor(Number(jpy.value) * Number(jpy.dataset.rate) / 100);
+  document.getElementById("krw").textContent = jpy.value ? "🇰🇷 " + won.toLocaleString() + " 원" : "";
+});
+var dday = document.getElementById("dday");
+if (dday) {
+  var days = Math.round((new Date(dday.dataset.start + "T00:00:00") - new Date(new Date().toDateString())) / 86400000);
+  dday.textContent = days > 0 ? "D-" + days : "D+" + (-days) + " 여행 중";
+}
+"""
+
+MANIFEST_JSON = json.dumps({"name": "Miyako Blue 🐢", "short_name": "Miyako", "start_url": "index.html", "display": "standalone",
+                            "background_color": "#ffffff", "theme_color": "#0077b6"}, ensure_ascii=False, indent=2)
+
+# 파일은 "경로?v=해시"를 키로 캐시 → 새 버전을 설치할 때 해시가 같은 파일은 이전 캐시에서 복사하고 바뀐 것만 받음.
+# 지도 타일/CDN 같은 외부 요청은 캐시 우선 + 처음 받을 때 저장 (오래된 것부터 RUNTIME_MAX개까지)
+SW_TEMPLATE = """const VERSION = "%(version)s";
+const FILES = %(files)s;
+const CDN = %(cdn)s;
+const CACHE = "%(prefix)s-" + VERSION;
+const RUNTIME = "%(prefix)s-runtime";
+const RUNTIME_MAX = %(runtime_max)d;
+const scope = new URL(self.registration.scope);
+const key = (path) => new URL(path + "?v=" + FILES[path], scope).href;
+
+self.addEventListener("install", (event) => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(CACHE);
+    await Promise.all(Object.keys(FILES).map(async (path) => {
+      const old = await caches.match(key(path));
+      if (old) return cache.put(key(path), old);
+      const resp = await fetch(new URL(path, scope), {cache: "no-cache"});
+      if (!resp.ok) throw new Error("precache failed: " + path);
+      return cache.put(key(path), resp);
+    }));
+    const runtime = await caches.open(RUNTIME);
+    await Promise.allSettled(CDN.map(async (url) => {
+      if (!(await runtime.match(url))) await runtime.put(url, await fetch(new Request(url, {mode: "no-cors"})));
+    }));
+    await self.skipWaiting();
+  })());
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil((async () => {
+    for (const name of await caches.keys()) {
+      if (name.startsWith("%(prefix)s-") && name !== CACHE && name !== RUNTIME) await caches.delete(name);
+    }
+    await self.clients.claim();
+  })());
+});
+
+async function fromRuntime(request) {
+  const runtime = await caches.open(RUNTIME);
+  const hit = await runtime.match(request);
+  if (hit) return hit;
+  const resp = await fetch(request);
+  if (resp.ok || resp.type === "opaque") {
+    await runtime.put(request, resp.clone());
+    const keys = await runtime.keys();
+    for (const old of keys.slice(0, Math.max(0, keys.length - RUNTIME_MAX))) await runtime.delete(old);
+  }
+  return resp;
+}
+
+self.addEventListener("fetch", (event) => {
+  if (event.request.method !== "GET") return;
+  const url = new URL(event.request.url);
+  if (url.origin === scope.origin && url.pathname.startsWith(scope.pathname)) {
+    const path = url.pathname.slice(scope.pathname.length) || "index.html";
+    if (path in FILES) {
+      event.respondWith(caches.match(key(path)).then((hit) => hit || fetch(event.request)));
+      return;
+    }
+  }
+  if (url.origin === scope.origin) return;
+  event.respondWith(fromRuntime(event.request).catch(() =>
+    event.request.mode === "navigate" ? caches.match(key("index.html")) : Response.error()));
+});
+"""
+
+
+def _service_worker(files, cdn):
+    version = hashlib.sha1(json.dumps([files, cdn], sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return SW_TEMPLATE % {"version": version, "files": json.dumps(files, sort_keys=True, indent=2), "cdn": json.dumps(cdn, indent=2),
+                          "prefix": CACHE_PREFIX, "runtime_max": RUNTIME_CACHE_MAX}
+
+
+# 내보낼 파일 목록. 입력(inputs)은 가볍게 모으고, 무거운 렌더링(지도/동선)은 render 안에서만
+def site_pages(snapshot):
+    nav = nav_items()
+    images = miyako_images.ImageCache()
+    pages = [
+        Page("style.css", None, lambda: STYLE_CSS),
+        Page("app.js", None, lambda: APP_JS),
+        Page("manifest.webmanifest", None, lambda: MANIFEST_JSON),
+        Page("index.html", [nav, THEMES, TRIP_DAYS, snapshot["weather"], snapshot["rate"]],
+             lambda: index_page(snapshot["weather"], snapshot["rate"])),
+    ]
+    for i, day in enumerate(TRIP_DAYS, 1):
+        stops = day_stops(day)
+        places = {row[3]: (locations.get(row[3]), mapcode_dict.get(row[3])) for row in stops}
+        image = None
+        route = images.from_file(f"0{i}.png")
+        if route:
+            widths = [w for w in route.widths if w in IMAGE_WIDTHS] or [route.widths[-1]]
+            url = functools.partial(_day_image_name, i)
+            image = {"set": route, "widths": widths, "url": url}
+            for fmt in miyako_images.FORMATS:
+                for w in widths:
+                    variant = os.path.join(images.cache_dir, os.path.basename(route.url(fmt, w)))
+                    pages.append(Page(url(fmt, w), route.key, lambda variant=variant: open(variant, "rb").read()))
+        tide = day_tide(day, stops)
+        pages.append(Page(f"day-{i}.html", [nav, stops, places, tide, route and route.key],
+                          lambda i=i, day=day, stops=stops, tide=tide, image=image: day_page(i, day, stops, day_plan(stops), tide, image)))
+    flags = miyako_search.PlaceIndex(mapcode_dict, MAPCODE_ALIASES).flags
+    pages += [
+        Page("map_frame.html", miyako_geo.poi_version(locations), lambda: miyako_geo.map_html(locations)),
+        Page("map.html", nav, map_page),
+        Page("mapcodes.html", [nav, mapcode_dict, MAPCODE_ALIASES, flags, miyako_search.MAPCODE_FLAGS], lambda: mapcodes_page(flags)),
+        Page("spots.html", [nav, HIDDEN_GEMS, GOURMET_TOP10, MUST_VISIT_TOP10, EXPERIENCES], spots_page),
+        Page("kit.html", [nav, PACKING_LIST, PHRASES, EMERGENCY_CONTACTS], kit_page),
+    ]
+    return pages
+
+
+def _load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("files", {})
+    except (OSError, ValueError):
+        return {}
+
+
+# 원본이 바뀐 파일만 다시 쓰고 (쓴 파일, 그대로 둔 파일) 목록을 돌려줌. 날씨/환율은 디스크 캐시의 마지막 응답 (네트워크 안 씀).
+# 이미 다른 세션/프로세스가 내보내는 중이면 기다리지 않고 ExportRunning
+def export(out_dir=EXPORT_DIR, force=False, cache_path=None):
+    os.makedirs(out_dir, exist_ok=True)
+    file_lock = miyako_storage.FileLock(os.path.join(out_dir, LOCK_FILE))
+    if not _lock.acquire(blocking=False):
+        raise ExportRunning(out_dir)
+    try:
+        if not file_lock.acquire(blocking=False):
+            raise ExportRunning(out_dir)
+        try:
+            return _export(out_dir, force, cache_path)
+        finally:
+            file_lock.release()
+    finally:
+        _lock.release()
+
+
+def _export(out_dir, force, cache_path):
+    old = {} if force else _load_manifest(out_dir)
+    snapshot = miyako_fetch.cached_values(["weather", "rate"], cache_path=cache_path)
+    code = _code_version()
+    files, written, kept = {}, [], []
+    for page in site_pages(snapshot):
+        digest = _digest(code, page)
+        files[page.name] = digest
+        path = os.path.join(out_dir, page.name)
+        if old.get(page.name) == digest and os.path.exists(path):
+            kept.append(page.name)
+            continue
+        _write(path, page.render())
+        written.append(page.name)
+
+    with open(os.path.join(out_dir, "map_frame.html"), "r", encoding="utf-8") as f:
+        cdn = sorted(set(CDN_RE.findall(f.read())))
+    sw = _service_worker(files, cdn)
+    sw_path = os.path.join(out_dir, "sw.js")
+    if written or not os.path.exists(sw_path):
+        _write(sw_path, sw)
+        written.append("sw.js")
+    else:
+        kept.append("sw.js")
+    for name in set(old) - set(files):
+        if os.path.exists(os.path.join(out_dir, name)):
+            os.remove(os.path.join(out_dir, name))
+    miyako_storage.write_json_atomic(os.path.join(out_dir, MANIFEST_FILE),
+                                     {"exported_at": datetime.now().isoformat(timespec="seconds"), "code": code, "files": files}, indent=2)
+    return written, kept
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the trip as an offline static bundle")
+    parser.add_argument("--out", default=EXPORT_DIR)
+    parser.add_argument("--force", action="store_true", help="rebuild every file")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    written, kept = export(args.out, force=args.force)
+    print(f"{len(written)} written, {len(kept)} unchanged in {(time.perf_counter() - start) * 1000:.0f} ms -> {args.out}")
+    if written:
+        print("  " + ", ".join(written))
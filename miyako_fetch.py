@@ -0,0 +1,221 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+
+import pytz
+import requests
+from requests.adapters import HTTPAdapter
+
+from miyako_metrics import metrics
+from miyako_storage import DATA_DIR, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+# API 주소 (로컬 스텁 서버로 바꿔 끼울 수 있게 환경변수 지원)
+RATE_URL = os.environ.get("MIYAKO_RATE_URL", "https://api.exchangerate-api.com/v4/latest/JPY")
+WEATHER_URL = os.environ.get("MIYAKO_WEATHER_URL", "https://api.open-meteo.com/v1/forecast?latitude=24.80&longitude=125.28&daily=weathercode,temperature_2m_max,temperature_2m_min&timezone=Asia%2FTokyo&forecast_days=3")
+CACHE_FILE = "miyako_api_cache.json"
+
+TTL = 3600
+# (연결, 읽기) 타임아웃 초. 콜드 스타트에서 기다리는 최대 시간은 둘의 합
+TIMEOUT = (2, 4)
+# 실패한 소스는 이 간격으로만 (백그라운드에서) 다시 시도
+RETRY_AFTER = 60
+DEFAULT_RATE = 900.0
+
+
+def parse_rate(payload):
+    return payload['rates']['KRW'] * 100
+
+
+def _weather_icon(code):
+    if code in [1, 2, 3]: return "☁️"
+    if code in [45, 48]: return "🌫️"
+    if code in [51, 53, 55, 61, 63, 65]: return "🌧️"
+    if code >= 80: return "☔"
+    return "☀️"
+
+
+# 오프라인에서 예전 응답을 쓰더라도 '오늘'이 맞도록 날짜 기준으로 라벨을 붙임
+DAY_LABELS = ["오늘", "내일", "모레"]
+
+
+# 오늘 기준 상대 이름. 그 밖의 날짜는 실제 날짜(M/D)로
+def _day_label(date, today):
+    d = datetime.strptime(date, '%Y-%m-%d').date()
+    delta = (d - today).days
+    return DAY_LABELS[delta] if 0 <= delta < len(DAY_LABELS) else f"{d.month}/{d.day}"
+
+
+# 만료된 캐시(지난 날 받은 응답)를 보여줄 때도 지난 날짜를 '오늘'로 붙이지 않도록 오늘 이후 날짜부터.
+# 전부 지난 날짜면 마지막 3일을 실제 날짜로 보여줌. 날짜가 없는 응답은 첫날을 오늘로 봄
+def parse_weather(payload):
+    daily = payload['daily']
+    today = datetime.now(pytz.timezone('Asia/Tokyo')).date()
+    count = len(daily['weathercode'])
+    dates = daily.get('time')
+    if dates:
+        start = next((i for i, d in enumerate(dates) if d >= today.isoformat()), max(0, count - 3))
+    else:
+        start = 0
+    forecasts = []
+    for offset, i in enumerate(range(start, min(start + 3, count))):
+        label = _day_label(dates[i], today) if dates else DAY_LABELS[offset]
+        forecasts.append({"day": label, "icon": _weather_icon(daily['weathercode'][i]), "max": round(daily['temperature_2m_max'][i]), "min": round(daily['temperature_2m_min'][i])})
+    return forecasts or None
+
+
+SOURCES = {
+    "rate": (RATE_URL, parse_rate),
+    "weather": (WEATHER_URL, parse_weather),
+}
+
+
+def _read_cache(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        logger.warning("ignoring unreadable API cache %s", path)
+        return {}
+
+
+# 네트워크 없이 디스크에 남은 마지막 정상 응답만 읽음 (오프라인 내보내기용). name → (값, 받은 시각) 또는 None
+def cached_values(names, cache_path=None, sources=SOURCES):
+    saved = _read_cache(cache_path or os.path.join(DATA_DIR, CACHE_FILE))
+    values = {}
+    for name in names:
+        entry = saved.get(name)
+        try:
+            values[name] = (sources[name][1](entry["payload"]), entry["fetched_at"]) if entry else None
+        except (ValueError, KeyError, TypeError, IndexError):
+            values[name] = None
+    return values
+
+
+# 병렬 조회 + 타임아웃 + stale-while-revalidate + 디스크에 마지막 정상 응답 보관
+class Fetcher:
+    def __init__(self, sources=SOURCES, cache_path=None, ttl=TTL, timeout=TIMEOUT):
+        self.sources = sources
+        self.cache_path = cache_path or os.path.join(DATA_DIR, CACHE_FILE)
+        self.ttl = ttl
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(sources), pool_maxsize=len(sources) * 2)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=len(sources) * 2, thread_name_prefix="miyako-fetch")
+        self._lock = threading.Lock()
+        # 디스크 저장은 한 번에 하나씩, 저장 직전의 최신 상태로 (먼저 끝난 조회가 나중 결과를 덮지 않게)
+        self._save_lock = threading.Lock()
+        self._entries = {}
+        self._refreshing = set()
+        self._failed_at = {}
+        self._load_disk()
+
+    def _load_disk(self):
+        for name, entry in _read_cache(self.cache_path).items():
+            if name in self.sources:
+                self._entries[name] = entry
+
+    # 디스크 캐시를 못 써도 받은 값은 메모리에 남기고 계속 씀
+    def _save_disk(self):
+        with self._save_lock:
+            with self._lock:
+                snapshot = dict(self._entries)
+            try:
+                write_json_atomic(self.cache_path, snapshot)
+            except OSError as e:
+                logger.warning("could not write API cache %s: %s", self.cache_path, e)
+
+    def _fetch(self, name):
+        url, parse = self.sources[name]
+        with metrics.section(f"api.{name}"):
+            resp = self.session.get(url, timeout=self.timeout)
+        resp.raise_for_status()
+        payload = resp.json()
+        parse(payload)  # 파싱이 안 되는 응답은 저장하지 않음
+        with self._lock:
+            self._entries[name] = {"payload": payload, "fetched_at": time.time()}
+            self._failed_at.pop(name, None)
+        self._save_disk()
+        return payload
+
+    def _refresh(self, name):
+        try:
+            self._fetch(name)
+            metrics.count(f"api.{name}", "refresh")
+        # 네트워크/파싱/디스크 어느 쪽 오류든 그 소스만 실패로 처리
+        except Exception as e:
+            logger.warning("background refresh of %s failed: %s", name, e)
+            metrics.count(f"api.{name}", "error")
+            self._mark_failed(name, time.time())
+        finally:
+            with self._lock:
+                self._refreshing.discard(name)
+
+    # 실패 시각은 get_many/_schedule_refresh가 락 안에서 읽으므로 쓰기도 락 안에서 (_refresh는 풀 스레드)
+    def _mark_failed(self, name, when):
+        with self._lock:
+            self._failed_at[name] = when
+
+    def _value(self, name, payload):
+        try:
+            return self.sources[name][1](payload)
+        except (ValueError, KeyError, TypeError, IndexError):
+            return None
+
+    def _schedule_refresh(self, name, now):
+        if name not in self._refreshing and now - self._failed_at.get(name, 0) >= RETRY_AFTER:
+            self._refreshing.add(name)
+            self._pool.submit(self._refresh, name)
+
+    # 캐시가 있으면 (만료되었어도) 즉시 반환하고 만료분은 백그라운드에서 갱신.
+    # 한 번도 받은 적 없는 것만 병렬로 기다리며, 실패하면 None
+    # (지표: hit 신선한 캐시, stale 만료값 제공, miss 기다려서 받음/실패)
+    def get_many(self, names):
+        now = time.time()
+        payloads = {}
+        missing = []
+        with self._lock:
+            for name in names:
+                entry = self._entries.get(name)
+                if entry is None:
+                    metrics.count(f"api.{name}", "miss")
+                    if name in self._failed_at:
+                        self._schedule_refresh(name, now)
+                    else:
+                        missing.append(name)
+                    continue
+                payloads[name] = entry["payload"]
+                if now - entry["fetched_at"] >= self.ttl:
+                    metrics.count(f"api.{name}", "stale")
+                    self._schedule_refresh(name, now)
+                else:
+                    metrics.count(f"api.{name}", "hit")
+        if missing:
+            futures = {name: self._pool.submit(self._fetch, name) for name in missing}
+            wait(futures.values(), timeout=sum(self.timeout))
+            for name, future in futures.items():
+                if not future.done():
+                    logger.warning("fetching %s timed out", name)
+                    metrics.count(f"api.{name}", "error")
+                    self._mark_failed(name, now)
+                    continue
+                try:
+                    payloads[name] = future.result()
+                except Exception as e:
+                    logger.warning("fetching %s failed: %s", name, e)
+                    metrics.count(f"api.{name}", "error")
+                    self._mark_failed(name, now)
+        return {name: self._value(name, payloads[name]) if name in payloads else None for name in names}
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        self.session.close()
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import math
+import os
+from collections import defaultdict
+
+# Streamlit 정적 서빙 폴더 (.streamlit/config.toml 의 enableStaticServing)
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "cache")
+STATIC_URL = "/app/static/cache"
+
+EARTH_RADIUS_KM = 6371.0
+MAP_CENTER = [24.80, 125.28]
+
+# 클러스터 마커: 행마다 [lat, lon, name, color]
+_CLUSTER_CALLBACK = """
+function (row) {
+    var icon = L.AwesomeMarkers.icon({icon: 'info-sign', markerColor: row[3], prefix: 'glyphicon'});
+    var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: icon});
+    marker.bindTooltip(row[2]);
+    marker.bindPopup(row[2]);
+    return marker;
+}
+"""
+
+
+# POI 집합이 바뀌었는지 판단하는 버전 키
+def poi_version(pois):
+    raw = json.dumps(sorted(pois.items()), ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def marker_color(name):
+    return "red" if "힐튼" in name else "blue"
+
+
+# folium 지도 한 장의 HTML (folium은 실제로 만들 때만 import)
+def map_html(pois):
+    import folium
+    from folium.plugins import FastMarkerCluster
+
+    m = folium.Map(location=MAP_CENTER, zoom_start=11)
+    rows = [[lat, lon, name, marker_color(name)] for name, (lat, lon) in pois.items()]
+    FastMarkerCluster(rows, callback=_CLUSTER_CALLBACK, options={"disableClusteringAtZoom": 14}).add_to(m)
+    return m.get_root().render()
+
+
+# 지도 HTML을 한 번만 만들어 정적 파일로 저장. 이미 있으면 folium을 import하지 않고 그대로 재사용
+def build_map(pois, version=None):
+    version = version or poi_version(pois)
+    path = os.path.join(STATIC_DIR, f"map_{version}.html")
+    if not os.path.exists(path):
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(map_html(pois))
+        os.replace(tmp, path)
+    return f"{STATIC_URL}/map_{version}.html"
+
+
+# 위경도 격자 버킷 인덱스: 반경 질의 시 주변 칸만 거리 계산
+class GridIndex:
+    def __init__(self, pois, cell_km=2.0):
+        self.cell_lat = cell_km / 111.0
+        self.cell_lon = cell_km / (111.0 * math.cos(math.radians(MAP_CENTER[0])))
+        self.points = [(name, lat, lon) for name, (lat, lon) in pois.items()]
+        self.cells = defaultdict(list)
+        for i, (_, lat, lon) in enumerate(self.points):
+            self.cells[self._cell(lat, lon)].append(i)
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.cell_lat), math.floor(lon / self.cell_lon))
+
+    # (이름, 거리km) 목록을 가까운 순으로
+    def nearby(self, lat, lon, radius_km, exclude=None):
+        ci, cj = self._cell(lat, lon)
+        di = math.ceil(radius_km / 111.0 / self.cell_lat)
+        dj = math.ceil(radius_km / (111.0 * math.cos(math.radians(lat))) / self.cell_lon)
+        found = []
+        for i in range(ci - di, ci + di + 1):
+            for j in range(cj - dj, cj + dj + 1):
+                for idx in self.cells.get((i, j), ()):
+                    name, plat, plon = self.points[idx]
+                    if name == exclude:
+                        continue
+                    dist = haversine_km(lat, lon, plat, plon)
+                    if dist <= radius_km:
+                        found.append((name, dist))
+        found.sort(key=lambda x: x[1])
+        return found
@@ -0,0 +1,279 @@
+import hashlib
+import html
+import io
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from miyako_metrics import metrics
+from miyako_storage import DATA_DIR, _tmp_path
+
+# 사진/동선 이미지를 크기별 WebP·JPEG 변형과 썸네일로 한 번만 만들어 정적 파일로 제공 (python benchmarks/bench_images.py)
+# 원본 내용 해시가 키라서 같은 사진은 다시 만들지 않고, 브라우저는 <picture> srcset에서 화면 폭에 맞는 파일만,
+# 화면에 보일 때(loading="lazy")만 받음. 캐시 폴더가 MAX_CACHE_MB를 넘으면 가장 오래 안 쓴 이미지부터 지움
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(ROOT, "static", "cache", "img")
+CACHE_URL = "/app/static/cache/img"
+# 다이어리 첨부 사진 원본 (내용 해시 이름, 같은 사진은 한 번만 저장)
+PHOTO_DIR = os.path.join(DATA_DIR, "photos")
+PHOTO_TYPES = ["jpg", "jpeg", "png", "webp"]
+
+WIDTHS = (320, 640, 1024, 1600)
+THUMB_SIZE = 240
+# WebP method 2: 기본값(4)보다 인코딩이 약 3배 빠르고 크기는 몇 % 차이 (업로드 콜백 안에서 만들므로)
+FORMATS = {"webp": ("webp", {"quality": 80, "method": 2}),
+           "jpeg": ("jpg", {"quality": 82, "optimize": True, "progressive": True})}
+MAX_CACHE_MB = int(os.environ.get("MIYAKO_IMAGE_CACHE_MB", "256"))
+# 마지막 사용 시각(매니페스트 mtime)은 이 간격으로만 갱신 (rerun마다 파일을 건드리지 않게)
+TOUCH_INTERVAL = 3600
+
+
+# 원본을 이미지로 읽지 못함 (없거나, 이미지가 아니거나, 잘렸거나, 너무 큼)
+class ImageError(ValueError):
+    pass
+
+
+def content_key(data):
+    return hashlib.sha1(data).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class ImageSet:
+    key: str
+    width: int       # 원본 크기 (회전 보정 후)
+    height: int
+    widths: tuple    # 만든 변형 폭 (원본보다 크게 키우지 않음)
+    base_url: str = CACHE_URL
+
+    def url(self, fmt, width):
+        return f"{self.base_url}/{self.key}_{width}.{FORMATS[fmt][0]}"
+
+    def thumb_url(self, fmt):
+        return self.url(fmt, "t")
+
+    def srcset(self, fmt, widths=None, url=None):
+        url = url or self.url
+        return ", ".join(f"{url(fmt, w)} {w}w" for w in widths or self.widths)
+
+
+def _variant_widths(width):
+    return tuple(sorted({w for w in WIDTHS if w < width} | {min(width, WIDTHS[-1])}))
+
+
+def _save(image, path, fmt):
+    tmp = _tmp_path(path)
+    image.save(tmp, format=fmt.upper(), **FORMATS[fmt][1])
+    os.replace(tmp, path)
+
+
+# 원본 하나 → 폭별 변형 + 정사각 썸네일 (포맷마다). 매니페스트를 마지막에 써서 매니페스트가 있으면 전부 있는 것
+def _generate(source, key, cache_dir):
+    from PIL import Image, ImageOps
+
+    # 디코딩 오류는 PIL이 OSError/SyntaxError/DecompressionBombError 등으로 내므로 ImageError 하나로 모음
+    try:
+        with Image.open(source) as im:
+            # JPEG는 필요한 크기까지만 축소 디코딩 (회전 보정 전이라 짧은 변 기준)
+            scale = min(1.0, WIDTHS[-1] / min(im.size))
+            im.draft("RGB", (round(im.width * scale), round(im.height * scale)))
+            im = ImageOps.exif_transpose(im)
+            alpha = im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info)
+            base = im.convert("RGBA" if alpha else "RGB")
+    except (OSError, SyntaxError, Image.DecompressionBombError) as exc:
+        raise ImageError(f"cannot read image: {exc}") from exc
+    width, height = base.size
+    widths = _variant_widths(width)
+    sizes = {w: (w, max(1, round(height * w / width))) for w in widths}
+    for fmt, (ext, _) in FORMATS.items():
+        source_image = base
+        if fmt == "jpeg" and alpha:
+            source_image = Image.new("RGB", base.size, "white")
+            source_image.paste(base, mask=base.getchannel("A"))
+        # 큰 폭부터 줄이면서 앞 결과를 다음 입력으로 (reducing_gap으로 큰 원본 축소를 빠르게)
+        current = source_image
+        for w in reversed(widths):
+            current = current.resize(sizes[w], Image.LANCZOS, reducing_gap=3.0) if current.width != w else current
+            _save(current, os.path.join(cache_dir, f"{key}_{w}.{ext}"), fmt)
+        thumb = ImageOps.fit(current if current.width >= THUMB_SIZE else source_image, (THUMB_SIZE, THUMB_SIZE), Image.LANCZOS)
+        _save(thumb, os.path.join(cache_dir, f"{key}_t.{ext}"), fmt)
+    info = {"width": width, "height": height, "widths": list(widths), "created": time.time()}
+    manifest = os.path.join(cache_dir, f"{key}.json")
+    tmp = _tmp_path(manifest)
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(info, f)
+    os.replace(tmp, manifest)
+    return info
+
+
+# 프로세스 전체에서 하나 (st.cache_resource로 보관). 키 → ImageSet, 경로 → (파일 식별자, 키)를 기억해
+# rerun마다 원본을 다시 읽거나 해시하지 않음. 변형 만들기(0.5~1초)는 락 밖에서 하고, 같은 키를 동시에 만들려는
+# 쪽만 먼저 시작한 쪽이 끝나길 기다림 (다른 세션의 캐시 적중은 기다리지 않음)
+class ImageCache:
+    def __init__(self, cache_dir=CACHE_DIR, base_url=CACHE_URL, photo_dir=PHOTO_DIR, max_mb=MAX_CACHE_MB):
+        self.cache_dir = cache_dir
+        self.base_url = base_url
+        self.photo_dir = photo_dir
+        self.max_bytes = max_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self._sets = {}      # 키 → (ImageSet, 마지막 touch 시각)
+        self._keys = {}      # 원본 경로 → ((ino, mtime, size), 키)
+        self._inflight = {}  # 지금 만들고 있는 키 → 끝나면 set되는 Event
+
+    # 키의 변형 묶음. 캐시에 없으면(처음이거나 밀려났으면) 원본에서 만듦
+    def get(self, key, source):
+        manifest = os.path.join(self.cache_dir, f"{key}.json")
+        while True:
+            with self._lock:
+                entry = self._sets.get(key)
+                if entry and os.path.exists(manifest):
+                    image, touched = entry
+                    if time.time() - touched > TOUCH_INTERVAL:
+                        os.utime(manifest)
+                        self._sets[key] = (image, time.time())
+                    metrics.count("images", "hit")
+                    return image
+                done = self._inflight.get(key)
+                if done is None:
+                    done = self._inflight[key] = threading.Event()
+                    break
+            # 다른 스레드가 같은 키를 만드는 중. 끝나면 처음부터 다시 확인 (실패했으면 이쪽이 만듦)
+            done.wait()
+        try:
+            generated = False
+            try:
+                with open(manifest, "r", encoding="utf-8") as f:
+                    info = json.load(f)
+                os.utime(manifest)
+                metrics.count("images", "hit")
+            except (OSError, ValueError):
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with metrics.section("images.generate"):
+                    info = _generate(source, key, self.cache_dir)
+                metrics.count("images", "miss")
+                generated = True
+            image = ImageSet(key, info["width"], info["height"], tuple(info["widths"]), self.base_url)
+            with self._lock:
+                self._sets[key] = (image, time.time())
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            done.set()
+        if generated:
+            self._evict(keep={key})
+        return image
+
+    # 디스크의 이미지 파일 (동선 이미지 등). 없으면 None. 파일이 그대로면 stat 한 번으로 끝
+    def from_file(self, path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        file_id = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            known = self._keys.get(path)
+        if known and known[0] == file_id:
+            key = known[1]
+        else:
+            # 해시는 락 밖에서. 그 사이 다른 스레드가 더 새 파일을 기록했으면 덮어쓰지 않음
+            with open(path, "rb") as f:
+                key = content_key(f.read())
+            with self._lock:
+                if self._keys.get(path, known) == known:
+                    self._keys[path] = (file_id, key)
+        return self.get(key, path)
+
+    # 첨부 사진 저장: 변형을 바로 만들고(이미지가 아니면 ValueError) 원본은 PHOTO_DIR에 내용 해시 이름으로. 파일 이름을 돌려줌
+    def save_photo(self, data, filename):
+        ext = os.path.splitext(filename)[1].lower()
+        if ext.lstrip(".") not in PHOTO_TYPES:
+            raise ValueError(f"unsupported image type: {filename}")
+        key = content_key(data)
+        try:
+            self.get(key, io.BytesIO(data))
+        except ImageError as exc:
+            raise ImageError(f"not a readable image: {filename}") from exc
+        name = f"{key}{ext}"
+        path = os.path.join(self.photo_dir, name)
+        if not os.path.exists(path):
+            os.makedirs(self.photo_dir, exist_ok=True)
+            tmp = _tmp_path(path)
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return name
+
+    def photo(self, name):
+        return self.get(os.path.splitext(name)[0], os.path.join(self.photo_dir, name))
+
+    # 총 크기가 한도를 넘으면 마지막 사용(매니페스트 mtime)이 오래된 키부터 통째로 삭제.
+    # 매니페스트 없이 오래된 조각(만들다 중단)은 가장 먼저 지움. 원본(PHOTO_DIR, 동선 이미지)은 건드리지 않음.
+    # 한 번에 하나만 정리하고, 지금 만들고 있는 키는 남김
+    def _evict(self, keep=()):
+        with self._evict_lock:
+            with self._lock:
+                keep = set(keep) | set(self._inflight)
+            return self._evict_locked(keep)
+
+    def _evict_locked(self, keep):
+        groups = {}
+        for entry in os.scandir(self.cache_dir):
+            key = entry.name.split("_")[0].split(".")[0]
+            st = entry.stat()
+            g = groups.setdefault(key, {"used": None, "newest": 0.0, "size": 0})
+            g["size"] += st.st_size
+            g["newest"] = max(g["newest"], st.st_mtime)
+            if entry.name == f"{key}.json":
+                g["used"] = st.st_mtime
+        total = sum(g["size"] for g in groups.values())
+        stale = time.time() - 600
+        evicted = 0
+        for key, g in sorted(groups.items(), key=lambda kv: (kv[1]["used"] is not None, kv[1]["used"] or 0.0)):
+            if total <= self.max_bytes:
+                break
+            # 다른 프로세스가 지금 만들고 있을 수 있는 조각은 남김
+            if key in keep or (g["used"] is None and g["newest"] > stale):
+                continue
+            for name in os.listdir(self.cache_dir):
+                if name.startswith(f"{key}_") or name.startswith(f"{key}."):
+                    os.remove(os.path.join(self.cache_dir, name))
+            with self._lock:
+                self._sets.pop(key, None)
+            total -= g["size"]
+            evicted += 1
+        if evicted:
+            metrics.count("images", "evict", evicted)
+        return evicted
+
+
+esc = html.escape
+
+
+# 반응형 이미지: WebP를 지원하면 WebP, 아니면 JPEG. sizes는 화면에서 차지할 폭 (브라우저가 srcset에서 고름)
+def picture_html(image, alt, sizes="100vw", lazy=True, widths=None, url=None):
+    url = url or image.url
+    widths = widths or image.widths
+    fallback = min(widths, key=lambda w: abs(w - 1024))
+    loading = ' loading="lazy"' if lazy else ""
+    return (f'<picture><source type="image/webp" srcset="{image.srcset("webp", widths, url)}" sizes="{sizes}">'
+            f'<img src="{url("jpeg", fallback)}" srcset="{image.srcset("jpeg", widths, url)}" sizes="{sizes}" '
+            f'width="{image.width}" height="{image.height}" alt="{esc(alt)}"{loading} decoding="async" '
+            f'style="width:100%;height:auto;border-radius:12px"></picture>')
+
+
+# 썸네일 격자. 누르면 큰 변형을 새 탭에서. 화면 밖 썸네일은 스크롤해야 받음
+# image가 None이면(원본을 읽지 못함) 같은 크기의 빈 칸에 캡션만
+def gallery_html(items):
+    cells = []
+    for image, caption in items:
+        if image is None:
+            cells.append(f'<div title="{esc(caption)}" style="aspect-ratio:1;border-radius:8px;background:rgba(128,128,128,.15);'
+                         f'display:flex;align-items:center;justify-content:center">🖼️</div>')
+            continue
+        cells.append(f'<a href="{image.url("webp", image.widths[-1])}" target="_blank" title="{esc(caption)}">'
+                     f'<picture><source type="image/webp" srcset="{image.thumb_url("webp")}">'
+                     f'<img src="{image.thumb_url("jpeg")}" width="{THUMB_SIZE}" height="{THUMB_SIZE}" alt="{esc(caption)}" '
+                     f'loading="lazy" decoding="async" style="width:100%;height:auto;border-radius:8px"></picture></a>')
+    return f'<div style="display:grid;grid-template-columns:repeat(auto-fill,minmax(96px,1fr));gap:6px">{"".join(cells)}</div>'
@@ -0,0 +1,234 @@
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+CATEGORIES = ["식비", "교통", "투어/입장", "쇼핑", "숙박", "기타"]
+DEFAULT_CATEGORY = "기타"
+CURRENCIES = ["JPY", "KRW"]
+CURRENCY_SYMBOL = {"JPY": "¥", "KRW": "₩"}
+UNKNOWN_DAY = "미지정"
+
+# 일정표 '구분' → 지출 카테고리 (계획 대비 실제 비교용)
+CATEGORY_OF_TYPE = {
+    "중식": "식비", "석식": "식비", "브런치": "식비", "후식": "식비", "디저트": "식비",
+    "도착": "교통", "이동": "교통", "출발": "교통",
+    "관광": "투어/입장", "투어": "투어/입장",
+    "쇼핑": "쇼핑", "숙소": "숙박", "휴식": "기타",
+}
+
+
+# 문자열 값 → 정수 코드 (범주형 열)
+class _Codes:
+    def __init__(self, labels=()):
+        self.labels = list(labels)
+        self.index = {label: i for i, label in enumerate(self.labels)}
+
+    def code(self, label):
+        i = self.index.get(label)
+        if i is None:
+            i = self.index[label] = len(self.labels)
+            self.labels.append(label)
+        return i
+
+
+# 예전 기록({"item", "amount"})에도 빈 칸을 채워 같은 모양으로
+def normalize_expense(expense):
+    return {
+        "id": expense.get("id", -1),
+        "item": expense.get("item", ""),
+        "amount": expense.get("amount", 0),
+        "category": expense.get("category") or DEFAULT_CATEGORY,
+        "currency": expense.get("currency") or "JPY",
+        "day": expense.get("day") or UNKNOWN_DAY,
+        "ts": expense.get("ts") or 0.0,
+    }
+
+
+# 지출 내역의 열 지향 사본. 추가/삭제/수정 때마다 합계를 건당 O(1)로 갱신하고 집계는 bincount로 한 번에.
+# id는 저장소에서 오름차순으로 붙으므로 id → 행 위치는 searchsorted로 찾음
+class Ledger:
+    def __init__(self, capacity=1024):
+        self._lock = threading.Lock()
+        self.categories = _Codes(CATEGORIES)
+        self.currencies = _Codes(CURRENCIES)
+        self.days = _Codes()
+        self._reset(capacity)
+
+    def _reset(self, capacity):
+        self.n = 0
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.amount = np.zeros(capacity, dtype=np.float64)
+        self.category = np.zeros(capacity, dtype=np.int32)
+        self.currency = np.zeros(capacity, dtype=np.int32)
+        self.day = np.zeros(capacity, dtype=np.int32)
+        self.ts = np.zeros(capacity, dtype=np.float64)
+        self.items = []
+        # (카테고리, 통화) → 합계
+        self._totals = defaultdict(float)
+
+    def __len__(self):
+        return self.n
+
+    def _columns(self):
+        return (self.ids, self.amount, self.category, self.currency, self.day, self.ts)
+
+    def _grow(self, needed):
+        capacity = len(self.amount)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self.ids, self.amount, self.category, self.currency, self.day, self.ts = (np.resize(col, capacity) for col in self._columns())
+
+    def _encode(self, expense):
+        e = normalize_expense(expense)
+        return (e["id"], float(e["amount"]), self.categories.code(e["category"]), self.currencies.code(e["currency"]),
+                self.days.code(e["day"]), float(e["ts"])), e["item"]
+
+    def load(self, expenses):
+        with self._lock:
+            self._reset(max(1024, len(expenses)))
+            if not expenses:
+                return
+            rows, self.items = zip(*(self._encode(e) for e in expenses))
+            self.items = list(self.items)
+            n = len(rows)
+            for col, values in zip(self._columns(), zip(*rows)):
+                col[:n] = values
+            self.n = n
+            keys = self.category[:n] * len(self.currencies.labels) + self.currency[:n]
+            sums = np.bincount(keys, weights=self.amount[:n])
+            for key in np.flatnonzero(sums):
+                cat, cur = divmod(int(key), len(self.currencies.labels))
+                self._totals[(cat, cur)] = float(sums[key])
+
+    def append(self, expense):
+        row, item = self._encode(expense)
+        with self._lock:
+            self._grow(self.n + 1)
+            for col, value in zip(self._columns(), row):
+                col[self.n] = value
+            self.items.append(item)
+            self.n += 1
+            self._totals[(row[2], row[3])] += row[1]
+
+    def delete(self, index):
+        with self._lock:
+            if index < 0:
+                index += self.n
+            if not 0 <= index < self.n:
+                raise IndexError(index)
+            self._totals[(int(self.category[index]), int(self.currency[index]))] -= self.amount[index]
+            for col in self._columns():
+                col[index:self.n - 1] = col[index + 1:self.n]
+            del self.items[index]
+            self.n -= 1
+
+    def _row(self, expense_id):
+        i = int(np.searchsorted(self.ids[:self.n], expense_id))
+        return i if i < self.n and self.ids[i] == expense_id else None
+
+    # 저장소의 edit_expenses 연산과 같은 일괄 수정/삭제 (없는 id는 무시)
+    def edit(self, update=(), delete=()):
+        with self._lock:
+            for u in update:
+                i = self._row(u["id"])
+                if i is None:
+                    continue
+                self._totals[(int(self.category[i]), int(self.currency[i]))] -= self.amount[i]
+                if "amount" in u:
+                    self.amount[i] = float(u["amount"])
+                if "category" in u:
+                    self.category[i] = self.categories.code(u["category"])
+                if "currency" in u:
+                    self.currency[i] = self.currencies.code(u["currency"])
+                if "day" in u:
+                    self.day[i] = self.days.code(u["day"])
+                if "item" in u:
+                    self.items[i] = u["item"]
+                self._totals[(int(self.category[i]), int(self.currency[i]))] += self.amount[i]
+            if not delete:
+                return
+            n = self.n
+            keep = ~np.isin(self.ids[:n], list(delete))
+            for i in np.flatnonzero(~keep):
+                self._totals[(int(self.category[i]), int(self.currency[i]))] -= self.amount[i]
+            for col in self._columns():
+                col[:int(keep.sum())] = col[:n][keep]
+            self.items = [item for item, k in zip(self.items, keep) if k]
+            self.n = int(keep.sum())
+
+    # SharedStore.subscribe 용: 저장소 연산을 그대로 따라감 (새 항목은 id가 붙은 state 쪽을 읽음)
+    def on_change(self, state, op):
+        if op is None:
+            self.load(state["expenses"])
+        elif op["op"] == "add_expense":
+            self.append(state["expenses"][-1])
+        elif op["op"] == "delete_expense":
+            self.delete(op["index"])
+        elif op["op"] == "edit_expenses":
+            self.edit(op.get("update", []), op.get("delete", []))
+
+    # 통화 코드별 엔화 환산 계수. rate는 100엔당 원화
+    def _factors(self, rate):
+        factors = np.ones(len(self.currencies.labels))
+        factors[self.currencies.code("KRW")] = 100.0 / rate
+        return factors
+
+    def total(self, rate):
+        factors = self._factors(rate)
+        with self._lock:
+            return float(sum(amount * factors[cur] for (_, cur), amount in self._totals.items()))
+
+    def _group(self, codes, column, rate):
+        import pandas as pd
+
+        factors = self._factors(rate)
+        with self._lock:
+            n = self.n
+            jpy = self.amount[:n] * factors[self.currency[:n]]
+            sums = np.bincount(column[:n], weights=jpy, minlength=len(codes.labels))
+        return pd.Series(sums, index=list(codes.labels), dtype=float)
+
+    def by_category(self, rate):
+        return self._group(self.categories, self.category, rate)
+
+    def by_day(self, rate):
+        return self._group(self.days, self.day, rate)
+
+    def frame(self):
+        import pandas as pd
+
+        with self._lock:
+            n = self.n
+            return pd.DataFrame({
+                "id": self.ids[:n].copy(),
+                "item": self.items[:],
+                "amount": self.amount[:n].copy(),
+                "category": pd.Categorical.from_codes(self.category[:n], self.categories.labels),
+                "currency": pd.Categorical.from_codes(self.currency[:n], self.currencies.labels),
+                "day": pd.Categorical.from_codes(self.day[:n], self.days.labels),
+                "ts": self.ts[:n].copy(),
+            })
+
+
+# 일정표 비용을 카테고리/날짜별로 합산 (계획). pandas는 집계할 때만 import
+def plan_totals(df_plan, by="category"):
+    key = df_plan["구분"].map(CATEGORY_OF_TYPE).fillna(DEFAULT_CATEGORY) if by == "category" else df_plan["날짜"]
+    return df_plan.groupby(key, sort=False)["비용"].sum().astype(float)
+
+
+def planned_vs_actual(planned, actual):
+    import pandas as pd
+
+    df = pd.concat([planned.rename("계획"), actual.rename("실제")], axis=1).fillna(0.0)
+    df = df[(df["계획"] != 0) | (df["실제"] != 0)]
+    df["차이"] = df["실제"] - df["계획"]
+    return df
+
+
+def new_expense(item, amount, category=DEFAULT_CATEGORY, currency="JPY", day=UNKNOWN_DAY, ts=None):
+    return {"item": item, "amount": amount, "category": category, "currency": currency, "day": day,
+            "ts": round(time.time() if ts is None else ts, 3)}
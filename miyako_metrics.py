@@ -0,0 +1,203 @@
+import atexit
+import contextlib
+import functools
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+
+from miyako_storage import DATA_DIR, _tmp_path, write_json_atomic
+
+# 구간별 실행 시간과 캐시 적중/미스를 프로세스 전체(모든 rerun, 모든 세션)에 걸쳐 모음.
+# MIYAKO_METRICS=1 로 켜면 프로세스 전체, 앱 주소에 ?debug=1 을 붙이면 그 세션의 rerun만 모음 (opt_in).
+# 꺼져 있으면 section()은 빈 컨텍스트를 돌려주고 count()/observe()는 바로 반환 (python benchmarks/bench_metrics.py)
+ENABLED = os.environ.get("MIYAKO_METRICS") == "1"
+JSON_FILE = "miyako_metrics.json"
+PROM_FILE = "miyako_metrics.prom"
+# 구간마다 최근 샘플만 남겨 백분위를 계산 (호출 수/합계/최댓값은 전체 누적)
+WINDOW = 2048
+PERCENTILES = (50, 90, 99)
+
+_NULL = contextlib.nullcontext()
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+# nearest-rank 백분위
+def _percentile(ordered, p):
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+class _Stats:
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=WINDOW)
+
+    def add(self, ms):
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+        self.recent.append(ms)
+
+    def summary(self):
+        ordered = sorted(self.recent)
+        out = {"count": self.count, "sum_ms": round(self.total, 3), "mean_ms": round(self.total / self.count, 3)}
+        for p in PERCENTILES:
+            out[f"p{p}_ms"] = round(_percentile(ordered, p), 3)
+        out["max_ms"] = round(self.max, 3)
+        return out
+
+
+class Metrics:
+    def __init__(self, enabled=ENABLED):
+        self.enabled = enabled
+        # 프로세스 전체가 꺼져 있을 때 지금 호출한 쪽(세션)이 수집을 켰는지 돌려주는 함수. 앱이 설정함
+        self.opt_in = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self, on=True):
+        self.enabled = on
+
+    def active(self):
+        return self.enabled or (self.opt_in is not None and self.opt_in())
+
+    def reset(self):
+        with self._lock:
+            self.since = time.time()
+            self._timings = defaultdict(_Stats)
+            # (캐시 이름, 이벤트) → 횟수. 이벤트: hit / miss / stale(만료값 제공) / refresh / error
+            self._counters = defaultdict(int)
+
+    def observe(self, name, ms):
+        if not self.active():
+            return
+        with self._lock:
+            self._timings[name].add(ms)
+
+    def count(self, cache, event, n=1):
+        if not self.active():
+            return
+        with self._lock:
+            self._counters[(cache, event)] += n
+
+    # with metrics.section("tab.wallet"): ...
+    def section(self, name):
+        return _Timer(self, name) if self.active() else _NULL
+
+    def timed(self, name):
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.active():
+                    return fn(*args, **kwargs)
+                with _Timer(self, name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # 메모이제이션 데코레이터(st.cache_resource, functools.lru_cache 등)를 감싸 적중/미스를 셈.
+    # 캐시가 원래 함수를 실제로 부르면 미스
+    def cached(self, name, cache):
+        local = threading.local()
+
+        def decorator(fn):
+            @functools.wraps(fn)
+            def compute(*args, **kwargs):
+                local.missed = True
+                return fn(*args, **kwargs)
+
+            memo = cache(compute)
+
+            @functools.wraps(fn)
+            def call(*args, **kwargs):
+                if not self.active():
+                    return memo(*args, **kwargs)
+                local.missed = False
+                value = memo(*args, **kwargs)
+                self.count(name, "miss" if local.missed else "hit")
+                return value
+
+            call.clear = getattr(memo, "clear", None)
+            return call
+        return decorator
+
+    def snapshot(self):
+        with self._lock:
+            sections = {name: stats.summary() for name, stats in sorted(self._timings.items())}
+            counters = sorted(self._counters.items())
+            since = self.since
+        caches = defaultdict(dict)
+        for (cache, event), n in counters:
+            caches[cache][event] = n
+        for events in caches.values():
+            served = events.get("hit", 0) + events.get("stale", 0)
+            lookups = served + events.get("miss", 0)
+            events["hit_ratio"] = round(served / lookups, 3) if lookups else None
+        return {"enabled": self.enabled, "since": datetime.fromtimestamp(since).isoformat(timespec="seconds"),
+                "uptime_s": round(time.time() - since, 1), "sections": sections, "caches": dict(caches)}
+
+    # Prometheus 텍스트 형식 (node_exporter textfile collector 등으로 읽을 수 있게)
+    def prometheus(self, snap=None):
+        snap = snap or self.snapshot()
+        lines = ["# HELP miyako_section_ms Wall time of an app section in milliseconds (quantiles over recent samples).",
+                 "# TYPE miyako_section_ms summary"]
+        for name, s in snap["sections"].items():
+            label = f'section="{_escape(name)}"'
+            for p in PERCENTILES:
+                lines.append(f'miyako_section_ms{{{label},quantile="{p / 100:g}"}} {s[f"p{p}_ms"]}')
+            lines.append(f"miyako_section_ms_sum{{{label}}} {s['sum_ms']}")
+            lines.append(f"miyako_section_ms_count{{{label}}} {s['count']}")
+        lines += ["# HELP miyako_cache_events_total Cache lookups by outcome.",
+                  "# TYPE miyako_cache_events_total counter"]
+        for cache, events in snap["caches"].items():
+            for event, n in events.items():
+                if event != "hit_ratio":
+                    lines.append(f'miyako_cache_events_total{{cache="{_escape(cache)}",event="{event}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    # DATA_DIR에 JSON과 Prometheus 텍스트 파일로 저장하고 경로를 돌려줌
+    def dump(self, data_dir=DATA_DIR):
+        snap = self.snapshot()
+        json_path = os.path.join(data_dir, JSON_FILE)
+        prom_path = os.path.join(data_dir, PROM_FILE)
+        write_json_atomic(json_path, snap, indent=2)
+        tmp = _tmp_path(prom_path)
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus(snap))
+        os.replace(tmp, prom_path)
+        return json_path, prom_path
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# 프로세스 전체에서 하나만 씀 (모듈은 rerun 사이에 다시 import되지 않음)
+metrics = Metrics()
+
+
+@atexit.register
+def _dump_on_exit():
+    if metrics.enabled and metrics.snapshot()["sections"]:
+        metrics.dump()
@@ -0,0 +1,149 @@
+import functools
+from dataclasses import dataclass
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+# 직선거리 → 실제 도로거리 보정 (섬 해안도로/다리 우회)
+ROAD_FACTOR = 1.3
+AVG_SPEED_KMH = 40.0
+# 시간이 정해진 일정(공항, 체크인, 출발 등)은 순서를 바꾸지 않음
+ANCHOR_TYPES = {"도착", "숙소", "출발", "이동"}
+
+
+class DistanceMatrix:
+    def __init__(self, names, km):
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.km = km
+        self.minutes = km / AVG_SPEED_KMH * 60
+
+    def __contains__(self, name):
+        return name in self.index
+
+
+# 모든 장소 쌍의 거리를 한 번의 벡터 연산으로 계산
+def haversine_matrix(lat, lon):
+    lat, lon = np.radians(lat), np.radians(lon)
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+@functools.lru_cache(maxsize=8)
+def _build_matrix(places):
+    names = [p[0] for p in places]
+    coords = np.array([p[1:] for p in places], dtype=float).reshape(-1, 2)
+    return DistanceMatrix(names, haversine_matrix(coords[:, 0], coords[:, 1]) * ROAD_FACTOR)
+
+
+# 장소 집합이 같으면 캐시된 행렬을 그대로 돌려줌
+def distance_matrix(pois):
+    return _build_matrix(tuple(sorted((name, float(lat), float(lon)) for name, (lat, lon) in pois.items())))
+
+
+def path_km(path, d):
+    path = np.asarray(path)
+    return float(d[path[:-1], path[1:]].sum()) if len(path) > 1 else 0.0
+
+
+def _nearest_neighbour(free, d, start):
+    remaining = list(free)
+    order = []
+    cur = start if start is not None else remaining.pop(0)
+    if start is None:
+        order.append(cur)
+    while remaining:
+        k = int(np.argmin(d[cur, remaining]))
+        cur = remaining.pop(k)
+        order.append(cur)
+    return order
+
+
+# 2-opt: 양 끝 고정 여부를 지키며 구간을 뒤집어 거리가 줄면 적용. i마다 j 전체를 벡터로 평가
+def _two_opt(path, d, fixed_start, fixed_end):
+    path = np.array(path)
+    n = len(path)
+    lo = 1 if fixed_start else 0
+    hi = n - 2 if fixed_end else n - 1
+    improved = True
+    while improved:
+        improved = False
+        for i in range(lo, hi):
+            js = np.arange(i + 1, hi + 1)
+            nxt = path[np.minimum(js + 1, n - 1)]
+            has_next = js + 1 < n
+            old = np.where(has_next, d[path[js], nxt], 0.0)
+            new = np.where(has_next, d[path[i], nxt], 0.0)
+            if i > 0:
+                old = old + d[path[i - 1], path[i]]
+                new = new + d[path[i - 1], path[js]]
+            delta = new - old
+            k = int(np.argmin(delta))
+            if delta[k] < -1e-9:
+                j = js[k]
+                path[i:j + 1] = path[i:j + 1][::-1]
+                improved = True
+    return path.tolist()
+
+
+# 앵커 사이의 자유 구간만 최적화
+def _optimize_segment(free, d, start, end):
+    if len(free) < 2:
+        return list(free)
+    order = _nearest_neighbour(free, d, start)
+    path = ([start] if start is not None else []) + order + ([end] if end is not None else [])
+    path = _two_opt(path, d, start is not None, end is not None)
+    if start is not None:
+        path = path[1:]
+    if end is not None:
+        path = path[:-1]
+    return path
+
+
+@dataclass
+class DayPlan:
+    order: list
+    km_before: float
+    km_after: float
+
+    @property
+    def saved_km(self):
+        return self.km_before - self.km_after
+
+
+# 지오코딩된 장소끼리 이어지는 구간의 총 거리 (좌표 없는 장소가 끼면 끊김)
+def _route_km(names, matrix):
+    total = 0.0
+    for a, b in zip(names, names[1:]):
+        if a in matrix and b in matrix:
+            total += matrix.km[matrix.index[a], matrix.index[b]]
+    return float(total)
+
+
+# stops: [(장소, 구분)] 시간순. 앵커와 좌표 없는 장소는 자리를 지키고 나머지를 재배열
+def plan_day(stops, matrix, anchor_types=ANCHOR_TYPES):
+    names = [name for name, _ in stops]
+    fixed = [kind in anchor_types or name not in matrix for name, kind in stops]
+    order = []
+    i = 0
+    while i < len(stops):
+        if fixed[i]:
+            order.append(names[i])
+            i += 1
+            continue
+        j = i
+        while j < len(stops) and not fixed[j]:
+            j += 1
+        start = matrix.index[names[i - 1]] if i > 0 and names[i - 1] in matrix else None
+        end = matrix.index[names[j]] if j < len(stops) and names[j] in matrix else None
+        seg = _optimize_segment([matrix.index[n] for n in names[i:j]], matrix.km, start, end)
+        order.extend(matrix.names[k] for k in seg)
+        i = j
+    km_before = _route_km(names, matrix)
+    km_after = _route_km(order, matrix)
+    # 휴리스틱이 원래보다 나쁘면 원래 순서 유지
+    if km_after > km_before:
+        return DayPlan(names, km_before, km_before)
+    return DayPlan(order, km_before, km_after)
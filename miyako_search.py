@@ -0,0 +1,131 @@
+import heapq
+import re
+from collections import Counter, defaultdict
+
+# 한글 음절 분해용 자모 (호환 자모)
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+CONSONANTS = set(CHOSEONG) | set("ㄳㄵㄶㄺㄻㄼㄽㄾㄿㅀㅄ")
+
+MAPCODE_RE = re.compile(r"^\d{3} \d{3} \d{3}\*\d{2}$")
+# 000으로 채워 넣은 임시 코드 (예: "721 000 000*00")
+PLACEHOLDER_RE = re.compile(r"^\d{3} (000 \d{3}|\d{3} 000)\*\d{2}$")
+
+# PlaceIndex.flags 의 표시 문구
+MAPCODE_FLAGS = {"placeholder": "임시(000) 코드라 위치가 정확하지 않을 수 있어요.", "duplicate": "다른 장소와 같은 코드예요.", "invalid": "맵코드 형식이 아니에요."}
+
+_STRIP_RE = re.compile(r"[\s\-_'’.,()·*]+")
+
+
+def _syllable(ch):
+    code = ord(ch) - 0xAC00
+    return code if 0 <= code < 11172 else None
+
+
+# "이라부 대교" → "ㅇㅣㄹㅏㅂㅜㄷㅐㄱㅛ"
+def to_jamo(text):
+    out = []
+    for ch in text:
+        code = _syllable(ch)
+        if code is None:
+            out.append(ch)
+        else:
+            out.append(CHOSEONG[code // 588] + JUNGSEONG[(code % 588) // 28] + JONGSEONG[code % 28])
+    return "".join(out)
+
+
+# "이라부 대교" → "ㅇㄹㅂㄷㄱ"
+def to_choseong(text):
+    return "".join(CHOSEONG[code // 588] for code in map(_syllable, text) if code is not None)
+
+
+def normalize(text):
+    return _STRIP_RE.sub("", text.lower())
+
+
+def is_choseong_query(text):
+    return bool(text) and all(ch in CONSONANTS for ch in text)
+
+
+def _ngrams(text, n=2):
+    if len(text) < n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+# 문자열 목록 → 2-gram 역색인. 후보는 posting 교집합 후 부분문자열로 확인
+class NgramIndex:
+    def __init__(self):
+        self.keys = []
+        self.postings = defaultdict(set)
+
+    def add(self, doc, text):
+        if not text:
+            return
+        k = len(self.keys)
+        self.keys.append((doc, text))
+        for gram in _ngrams(text) | set(text):
+            self.postings[gram].add(k)
+
+    def search(self, query):
+        grams = _ngrams(query) if len(query) > 1 else {query}
+        sets = sorted((self.postings.get(g, set()) for g in grams), key=len)
+        if not sets or not sets[0]:
+            return {}
+        cand = set.intersection(*sets)
+        hits = {}
+        for k in cand:
+            doc, text = self.keys[k]
+            pos = text.find(query)
+            if pos < 0:
+                continue
+            # 정확히 일치 > 앞부분 일치 > 중간 일치
+            score = 0 if text == query else (1 if pos == 0 else 2)
+            if score < hits.get(doc, 3):
+                hits[doc] = score
+        return hits
+
+
+class PlaceIndex:
+    def __init__(self, mapcodes, aliases=None):
+        aliases = aliases or {}
+        self.names = list(mapcodes)
+        self.codes = dict(mapcodes)
+        self._text = NgramIndex()
+        self._cho = NgramIndex()
+        self.by_code = defaultdict(list)
+        for doc, name in enumerate(self.names):
+            self._text.add(doc, to_jamo(normalize(name)))
+            self._cho.add(doc, to_choseong(name))
+            for alias in aliases.get(name, []):
+                self._text.add(doc, to_jamo(normalize(alias)))
+            code = self.codes[name]
+            self._text.add(doc, normalize(code))
+            self.by_code[normalize(code)].append(name)
+        self.flags = self._validate()
+
+    # 맵코드 점검: 형식 오류, 임시(000) 코드, 여러 장소가 같은 코드를 쓰는 경우
+    def _validate(self):
+        flags = defaultdict(list)
+        counts = Counter(self.codes.values())
+        for name, code in self.codes.items():
+            if not MAPCODE_RE.match(code):
+                flags[name].append("invalid")
+            elif PLACEHOLDER_RE.search(code):
+                flags[name].append("placeholder")
+            if counts[code] > 1:
+                flags[name].append("duplicate")
+        return dict(flags)
+
+    def search(self, query, limit=20):
+        q = normalize(query)
+        if not q:
+            return self.names[:limit]
+        hits = self._cho.search(q) if is_choseong_query(q) else self._text.search(to_jamo(q))
+        ranked = heapq.nsmallest(limit, hits, key=lambda doc: (hits[doc], len(self.names[doc]), doc))
+        return [self.names[doc] for doc in ranked]
+
+    # 맵코드 → 장소 (공백/별표 무시)
+    def lookup_code(self, code):
+        return list(self.by_code.get(normalize(code), []))
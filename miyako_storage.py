@@ -0,0 +1,574 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import atexit
+from collections import deque
+from types import MappingProxyType
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 저장소 파일 (스냅샷은 기존 miyako_data.json 레이아웃 그대로 + "seq")
+DATA_DIR = os.environ.get("MIYAKO_DATA_DIR", ".")
+DATA_FILE = "miyako_data.json"
+LOG_FILE = "miyako_data.log"
+LOCK_FILE = "miyako_data.lock"
+
+# 로그가 이만큼 쌓이면 스냅샷으로 압축 (SharedStore에서는 백그라운드 스레드가)
+COMPACT_THRESHOLD = 500
+# fsync 배치: N건마다 바로, 나머지는 T초 안에 타이머가 (SharedStore)
+FSYNC_EVERY = 16
+FSYNC_INTERVAL = 1.0
+
+
+def default_state():
+    return {
+        "expenses": [],
+        "total_budget": 150000,
+        "diary": [],
+        "dark_mode": False,
+        "next_id": 0
+    }
+
+
+# 지출/다이어리 항목마다 고정 id. 예전 데이터(id 없음, 다이어리는 문자열)는 읽을 때 순서대로 부여하므로
+# 어느 프로세스가 읽어도 같은 id가 나옴. 목록 안에서 id는 항상 오름차순
+def ensure_ids(state):
+    records = state["expenses"] + state["diary"]
+    next_id = max([state.get("next_id", 0)] + [r["id"] + 1 for r in records if isinstance(r, dict) and "id" in r])
+    for key in ("expenses", "diary"):
+        items = state[key]
+        for i, r in enumerate(items):
+            if isinstance(r, str):
+                items[i] = r = {"text": r}
+            if "id" not in r:
+                r["id"] = next_id
+                next_id += 1
+    state["next_id"] = next_id
+    return state
+
+
+def _next_id(state):
+    state["next_id"] += 1
+    return state["next_id"] - 1
+
+
+# id 기준 일괄 수정/삭제: 그 사이에 목록이 바뀌어도 같은 항목에 적용되고, 이미 없는 id는 무시
+def _edit_records(records, op):
+    updates = {u["id"]: u for u in op.get("update", [])}
+    if updates:
+        for r in records:
+            u = updates.get(r["id"])
+            if u:
+                r.update((k, v) for k, v in u.items() if k != "id")
+    deleted = set(op.get("delete", []))
+    if deleted:
+        records[:] = [r for r in records if r["id"] not in deleted]
+
+
+# 연산 적용 (라이브 변경과 로그 재생이 같은 함수를 씀)
+def apply_op(state, op):
+    kind = op["op"]
+    if kind == "add_expense":
+        state["expenses"].append(dict(op["expense"], id=_next_id(state)))
+    elif kind == "delete_expense":
+        del state["expenses"][op["index"]]
+    elif kind == "edit_expenses":
+        _edit_records(state["expenses"], op)
+    elif kind == "add_diary":
+        entry = {"id": _next_id(state), "text": op["entry"]}
+        # 첨부 사진: PHOTO_DIR(miyako_images.py)의 파일 이름 목록
+        if op.get("photos"):
+            entry["photos"] = list(op["photos"])
+        state["diary"].append(entry)
+    elif kind == "delete_diary":
+        del state["diary"][op["index"]]
+    elif kind == "edit_diary":
+        _edit_records(state["diary"], op)
+    elif kind == "set_budget":
+        state["total_budget"] = op["value"]
+    elif kind == "set_theme":
+        state["dark_mode"] = op["value"]
+    else:
+        raise ValueError(f"unknown op: {kind}")
+
+
+# 상태에서 파생된 인덱스(지출 장부 등)에 변경을 알림. op가 None이면 전체를 다시 읽은 것
+def _notify(listeners, state, op):
+    for listener in listeners:
+        listener(state, op)
+
+
+def _fsync_dir(path):
+    if sys.platform.startswith("win"):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# 임시 파일 이름은 프로세스/스레드마다 달라서 같은 파일을 동시에 써도 서로의 임시 파일을 가로채지 않음
+def _tmp_path(path):
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _write_json_tmp(path, data, indent=None):
+    tmp = _tmp_path(path)
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp
+
+
+# 임시 파일에 쓰고 rename → 중간에 죽어도 기존 파일이 잘리지 않음
+def write_json_atomic(path, data, indent=None):
+    os.replace(_write_json_tmp(path, data, indent), path)
+    _fsync_dir(os.path.dirname(os.path.abspath(path)))
+
+
+def _read_snapshot(path):
+    state = default_state()
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            state.update(json.load(f))
+    seq = state.pop("seq", 0)
+    return ensure_ids(state), seq
+
+
+# 다시 로드해도 세션들이 들고 있는 뷰가 계속 유효하도록 같은 dict를 갱신.
+# 세션들은 잠금 없이 읽으므로 clear() 없이 키마다 바꿔 끼움 (어느 순간에도 "expenses"/"diary" 등이 빠지지 않게).
+# 새 상태에 없는 키(예전 파일에만 있던 것)는 다 바꾼 뒤에 지움
+def _reset_state(current, new):
+    if current is None:
+        return new
+    current.update(new)
+    for key in set(current) - set(new):
+        del current[key]
+    return current
+
+
+# 파일이 교체(rename)되었는지 확인용 식별자
+def _file_id(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+# 기존 방식: 변경마다 전체 파일 재작성 (원자적 rename만 추가)
+class JsonFileBackend:
+    def __init__(self, data_dir=DATA_DIR):
+        self.path = os.path.join(data_dir, DATA_FILE)
+        self.state = None
+        self.seq = 0
+        self.listeners = []
+        self._file_id = None
+
+    def load(self):
+        state, _ = _read_snapshot(self.path)
+        self.state = _reset_state(self.state, state)
+        self._file_id = _file_id(self.path)
+        self.seq += 1
+        _notify(self.listeners, self.state, None)
+        return self.state
+
+    # 다른 프로세스가 파일을 바꿨으면 다시 읽음
+    def catch_up(self):
+        if _file_id(self.path) == self._file_id:
+            return False
+        self.load()
+        return True
+
+    def apply(self, op):
+        apply_op(self.state, op)
+        _notify(self.listeners, self.state, op)
+        write_json_atomic(self.path, self.state, indent=4)
+        self._file_id = _file_id(self.path)
+        self.seq += 1
+
+    def close(self):
+        pass
+
+
+# 추가 전용 연산 로그 + 주기적 스냅샷 압축
+class JournalBackend:
+    def __init__(self, data_dir=DATA_DIR, compact_threshold=COMPACT_THRESHOLD,
+                 fsync_every=FSYNC_EVERY, fsync_interval=FSYNC_INTERVAL):
+        self.snapshot_path = os.path.join(data_dir, DATA_FILE)
+        self.log_path = os.path.join(data_dir, LOG_FILE)
+        self.compact_threshold = compact_threshold
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.state = None
+        self.seq = 0
+        self.listeners = []
+        self._log = None
+        self._log_ops = 0
+        self._offset = 0
+        self._snapshot_id = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        # 압축할 때가 되면 부르는 콜백 (SharedStore가 백그라운드 스레드를 깨움). 없으면 apply 안에서 바로 압축
+        self.on_compact_due = None
+        atexit.register(self.close)
+
+    def load(self):
+        if self._log and not self._log.closed:
+            self._sync()
+            self._log.close()
+        state, self.seq = _read_snapshot(self.snapshot_path)
+        self.state = _reset_state(self.state, state)
+        self._snapshot_id = _file_id(self.snapshot_path)
+        self._offset = 0
+        self._log_ops = 0
+        self._replay(truncate=True, notify=False)
+        self._log = open(self.log_path, "ab")
+        _notify(self.listeners, self.state, None)
+        return self.state
+
+    # 마지막으로 읽은 위치 이후의 로그만 재생. 끝에 잘린 줄이 있으면 (load 시) 잘라냄
+    def _replay(self, truncate=False, notify=True):
+        if not os.path.exists(self.log_path):
+            return False
+        changed = False
+        with open(self.log_path, "rb") as f:
+            f.seek(self._offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(raw)
+                except ValueError:
+                    break
+                self._offset += len(raw)
+                self._log_ops += 1
+                if entry["seq"] <= self.seq:
+                    continue
+                apply_op(self.state, entry)
+                if notify:
+                    _notify(self.listeners, self.state, entry)
+                self.seq = entry["seq"]
+                changed = True
+        if truncate and self._offset != os.path.getsize(self.log_path):
+            with open(self.log_path, "r+b") as f:
+                f.truncate(self._offset)
+        return changed
+
+    # 다른 프로세스의 변경분 반영: 스냅샷이 바뀌었으면 다시 로드, 아니면 로그 꼬리만 읽음
+    def catch_up(self):
+        if _file_id(self.snapshot_path) != self._snapshot_id:
+            self.load()
+            return True
+        try:
+            size = os.path.getsize(self.log_path)
+        except FileNotFoundError:
+            return False
+        if size <= self._offset:
+            return False
+        return self._replay()
+
+    def apply(self, op):
+        apply_op(self.state, op)
+        _notify(self.listeners, self.state, op)
+        self.seq += 1
+        line = (json.dumps(dict(op, seq=self.seq), ensure_ascii=False) + "\n").encode("utf-8")
+        self._log.write(line)
+        self._log.flush()
+        self._offset += len(line)
+        self._log_ops += 1
+        self._pending += 1
+        now = time.monotonic()
+        if self._pending >= self.fsync_every or now - self._last_sync >= self.fsync_interval:
+            self._sync(now)
+        if self.compact_due():
+            if self.on_compact_due:
+                self.on_compact_due()
+            else:
+                self.compact()
+
+    def _sync(self, now=None):
+        if self._pending:
+            os.fsync(self._log.fileno())
+            self._pending = 0
+        self._last_sync = now or time.monotonic()
+
+    # 타이머에서: 쓰기가 멈춘 뒤에도 fsync 안 된 연산이 남지 않게
+    def flush(self):
+        if self._pending:
+            self._sync()
+
+    def compact_due(self):
+        return self._log_ops >= self.compact_threshold
+
+    # 압축은 세 단계. 시작/마무리만 잠금 안에서 짧게 하고, 스냅샷을 만드는 무거운 부분은 잠금 밖에서
+    # 1) 지금까지의 로그 위치를 표시. 다른 프로세스가 이미 압축해 둔 상태면 None
+    def begin_compaction(self):
+        if _file_id(self.snapshot_path) != self._snapshot_id:
+            return None
+        self._sync()
+        return self._snapshot_id, self._offset, self.seq
+
+    # 2) 디스크의 스냅샷 + 표시한 위치까지의 로그로 그 시점 상태를 따로 만들어 임시 파일에 씀.
+    #    세션들이 읽는 살아 있는 상태는 건드리지 않으므로 잠금이 필요 없음
+    def build_snapshot(self, mark):
+        _, offset, seq = mark
+        state, base_seq = _read_snapshot(self.snapshot_path)
+        with open(self.log_path, "rb") as f:
+            for raw in f.read(offset).splitlines():
+                entry = json.loads(raw)
+                if entry["seq"] > base_seq:
+                    apply_op(state, entry)
+        return _write_json_tmp(self.snapshot_path, dict(state, seq=seq))
+
+    # 3) 그 사이 다른 프로세스가 압축하지 않았으면 스냅샷을 바꾸고, 로그는 압축 중에 추가된 연산만 남김.
+    #    스냅샷에 seq를 같이 저장하므로 두 rename 사이에 죽어도 재생이 중복되지 않음
+    def finish_compaction(self, mark, tmp):
+        snapshot_id, offset, _ = mark
+        self.catch_up()
+        if self._snapshot_id != snapshot_id:
+            os.remove(tmp)
+            return False
+        self._sync()
+        with open(self.log_path, "rb") as f:
+            f.seek(offset)
+            tail = f.read(self._offset - offset)
+        log_tmp = _tmp_path(self.log_path)
+        with open(log_tmp, "wb") as f:
+            f.write(tail)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        os.replace(log_tmp, self.log_path)
+        _fsync_dir(os.path.dirname(os.path.abspath(self.log_path)))
+        self._log.close()
+        self._log = open(self.log_path, "ab")
+        self._snapshot_id = _file_id(self.snapshot_path)
+        self._offset = len(tail)
+        self._log_ops = tail.count(b"\n")
+        return True
+
+    # 단독으로 쓸 때 (SharedStore 없이): 세 단계를 바로 이어서
+    def compact(self):
+        mark = self.begin_compaction()
+        if mark is not None:
+            self.finish_compaction(mark, self.build_snapshot(mark))
+
+    def close(self):
+        if self._log and not self._log.closed:
+            self._sync()
+            self._log.close()
+
+
+# 여러 워커 프로세스가 같은 파일을 쓸 때를 위한 파일 잠금 (fcntl 없는 환경에서는 프로세스 내 잠금만)
+class FileLock:
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    # blocking=False면 다른 프로세스가 잡고 있을 때 기다리지 않고 False
+    def acquire(self, blocking=True):
+        if fcntl is not None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(self._fd)
+                self._fd = None
+                return False
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class ConflictError(Exception):
+    pass
+
+
+# 화면을 그린 시점의 버전(expected_version)과 비교하는 연산. 그 뒤에 다른 세션이 같은 값을 바꿨으면 충돌:
+# 예산은 예산을 바꾼 연산, id 기반 edit_*는 같은 항목의 같은 칸을 바꾸거나 그 항목을 지운 연산.
+# 위치(index) 기반 삭제(예전 로그의 연산)는 버전이 하나라도 바뀌었으면 충돌
+VERSIONED_OPS = {"set_budget", "edit_expenses", "edit_diary", "delete_expense", "delete_diary"}
+INDEX_OPS = {"delete_expense", "delete_diary"}
+EDIT_TABLES = {"edit_expenses": "expenses", "edit_diary": "diary"}
+# 버전 검사를 위해 기억하는 최근 연산 수 (이보다 오래된 버전에서 그린 화면은 무조건 충돌로 봄)
+HISTORY = 1024
+
+
+# 연산이 바꾸는 값: (목록, 항목 id, 칸). 칸이 None이면 항목 전체(삭제), 예산은 ("total_budget", None, None)
+def _touched(op):
+    kind = op["op"]
+    if kind == "set_budget":
+        return {("total_budget", None, None)}
+    table = EDIT_TABLES.get(kind)
+    if table is None:
+        return set()
+    keys = {(table, u["id"], field) for u in op.get("update", []) for field in u if field != "id"}
+    return keys | {(table, i, None) for i in op.get("delete", [])}
+
+
+def _overlaps(keys, other):
+    rows = {(t, i) for t, i, f in other}
+    deleted = {(t, i) for t, i, f in other if f is None}
+    return any((t, i, f) in other or (t, i) in deleted or (f is None and (t, i) in rows) for t, i, f in keys)
+
+
+# 프로세스 전체에서 하나만 두는 상태 저장소 (st.cache_resource로 보관)
+class SharedStore:
+    def __init__(self, backend, data_dir=DATA_DIR):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(os.path.join(data_dir, LOCK_FILE))
+        # 최근 연산 (버전, 연산). _history_from 이하 버전에서 그린 화면은 그 사이 변경을 알 수 없음
+        self._history = deque()
+        self._history_from = 0
+        backend.listeners.append(self._record)
+        with self._lock, self._file_lock:
+            backend.load()
+        # 연산 로그의 시간 기준 fsync와 압축은 요청 경로 밖의 스레드에서
+        self._wake = threading.Event()
+        self._closed = False
+        self._worker = None
+        if isinstance(backend, JournalBackend):
+            backend.on_compact_due = self._wake.set
+            self._worker = threading.Thread(target=self._maintain, name="miyako-store", daemon=True)
+            self._worker.start()
+
+    def _maintain(self):
+        while True:
+            self._wake.wait(self.backend.fsync_interval)
+            self._wake.clear()
+            if self._closed:
+                return
+            try:
+                with self._lock:
+                    self.backend.flush()
+                if self.backend.compact_due():
+                    self._compact()
+            except Exception:
+                logger.exception("store maintenance failed")
+
+    def _compact(self):
+        with self._lock, self._file_lock:
+            mark = self.backend.begin_compaction()
+        if mark is None:
+            return
+        tmp = self.backend.build_snapshot(mark)
+        with self._lock, self._file_lock:
+            self.backend.finish_compaction(mark, tmp)
+
+    @property
+    def version(self):
+        return self.backend.seq
+
+    # 백엔드 리스너: 라이브 연산은 적용 직후 버전이 하나 오르고, 로그 재생은 연산에 seq가 붙어 있음.
+    # 전체를 다시 읽었으면(op=None) 그 전 기록은 버림
+    def _record(self, state, op):
+        if op is None:
+            self._history.clear()
+            self._history_from = self.backend.seq
+            return
+        self._history.append((op.get("seq", self.backend.seq + 1), op))
+        if len(self._history) > HISTORY:
+            self._history_from = self._history.popleft()[0]
+
+    def _conflicts(self, op, expected_version):
+        if expected_version == self.version:
+            return False
+        if op["op"] in INDEX_OPS or expected_version < self._history_from:
+            return True
+        keys = _touched(op)
+        changed = set()
+        for seq, other in self._history:
+            if seq > expected_version:
+                changed |= _touched(other)
+        return _overlaps(keys, changed)
+
+    # 세션에는 복사 없이 읽기 전용 뷰만 넘김
+    def view(self):
+        return MappingProxyType(self.backend.state)
+
+    # listener(state, op)를 등록하고 현재 상태로 한 번 초기화 (op=None)
+    def subscribe(self, listener):
+        with self._lock:
+            self.backend.listeners.append(listener)
+            listener(self.backend.state, None)
+
+    # 매 rerun 시작 시 호출: 다른 프로세스가 쓴 변경분만 반영
+    def refresh(self):
+        with self._lock, self._file_lock:
+            return self.backend.catch_up()
+
+    def update(self, op, expected_version=None):
+        with self._lock, self._file_lock:
+            self.backend.catch_up()
+            if op["op"] in VERSIONED_OPS and expected_version is not None and self._conflicts(op, expected_version):
+                raise ConflictError(f"data changed (v{expected_version} -> v{self.version})")
+            self.backend.apply(op)
+            return self.version
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        if self._worker:
+            self._worker.join(timeout=5)
+        with self._lock:
+            self.backend.close()
+
+
+BACKENDS = {"json": JsonFileBackend, "journal": JournalBackend}
+
+
+def open_backend(kind=None, data_dir=DATA_DIR):
+    kind = kind or os.environ.get("MIYAKO_STORAGE", "journal")
+    return BACKENDS[kind](data_dir)
+
+
+def open_store(kind=None, data_dir=DATA_DIR):
+    return SharedStore(open_backend(kind, data_dir), data_dir)
+
+
+# 기존 miyako_data.json → 스냅샷(seq 포함) + 빈 로그로 1회 변환
+def migrate_legacy_json(src, data_dir=DATA_DIR):
+    log_path = os.path.join(data_dir, LOG_FILE)
+    if os.path.exists(log_path) and os.path.getsize(log_path) > 0:
+        raise RuntimeError(f"{log_path} already has journal entries; nothing to migrate")
+    state = default_state()
+    with open(src, "r", encoding="utf-8") as f:
+        state.update(json.load(f))
+    seq = state.pop("seq", 0)
+    ensure_ids(state)
+    write_json_atomic(os.path.join(data_dir, DATA_FILE), dict(state, seq=seq))
+    with open(log_path, "w", encoding="utf-8"):
+        pass
+    return state
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "migrate":
+        src = sys.argv[2] if len(sys.argv) > 2 else os.path.join(DATA_DIR, DATA_FILE)
+        migrated = migrate_legacy_json(src)
+        print(f"migrated {len(migrated['expenses'])} expenses, {len(migrated['diary'])} diary entries")
+    else:
+        print("usage: python miyako_storage.py migrate [legacy_json]")
@@ -0,0 +1,173 @@
+import functools
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# 조화분해 상수로 조위를 합성하는 오프라인 조석 예보 (네트워크 없음)
+#   h(t) = Z0 + Σ f·H·cos(V(t) + u − G)
+# V는 천문 인수(달/태양 평균 경도)에서, f/u는 달 승교점 주기 보정. 시각은 일본 표준시(JST) 기준
+JST_OFFSET_HOURS = 9
+
+# Doodson 번호 (τ, s, h, p, N', p1)와 위상 보정(도)
+DOODSON = {
+    "M2": ((2, 0, 0, 0, 0, 0), 0), "S2": ((2, 2, -2, 0, 0, 0), 0), "N2": ((2, -1, 0, 1, 0, 0), 0), "K2": ((2, 2, 0, 0, 0, 0), 0),
+    "K1": ((1, 1, 0, 0, 0, 0), 90), "O1": ((1, -1, 0, 0, 0, 0), -90), "P1": ((1, 1, -2, 0, 0, 0), -90), "Q1": ((1, -2, 0, 1, 0, 0), -90),
+    "M4": ((4, 0, 0, 0, 0, 0), 0), "MS4": ((4, 2, -2, 0, 0, 0), 0),
+}
+# 천문 인수 (τ, s, h, p, N', p1)의 시간당 변화 (도/시)
+ARGUMENT_SPEEDS = np.array([14.4920521, 0.5490165, 0.0410686, 0.0046418, 0.0022064, 0.0000020])
+
+
+# 식별자로 해시 (tide_table 캐시 키)
+@dataclass(frozen=True, eq=False)
+class Station:
+    name: str
+    z0: float          # 기본 수준면(약최저저조면) 위 평균 해면 (m)
+    constituents: dict  # 분조 → (진폭 H (m), 그리니치 지각 G (도))
+
+
+# 히라라(平良) 검조소 근사 상수. 미야코 주변 조석 특성(대조 조차 약 2 m, 반일주조 우세, 대조 저조가 한낮 무렵,
+# 겨울엔 밤 저조·여름엔 낮 저조가 더 낮음)에 맞춘 값이라 시각은 ±30분 정도로 봐야 함.
+# 기상청(JMA) 공표 조화 상수로 바꾸면 그대로 정밀해짐
+HIRARA = Station("平良 (Hirara)", 1.10, {
+    "M2": (0.58, 293.0), "S2": (0.24, 319.0), "N2": (0.12, 273.0), "K2": (0.066, 316.0),
+    "K1": (0.21, 298.0), "O1": (0.16, 275.0), "P1": (0.07, 296.0), "Q1": (0.03, 262.0),
+    "M4": (0.006, 32.0), "MS4": (0.004, 72.0),
+})
+
+
+# 천문 인수 (도). hours_j2000: J2000(2000-01-01 12:00 UTC)부터 지난 시간
+def _astronomical_arguments(hours_j2000):
+    t = hours_j2000 / (24 * 36525.0)
+    s = 218.3165 + 481267.8813 * t
+    h = 280.4665 + 36000.7698 * t
+    p = 83.3532 + 4069.0137 * t
+    n = 125.0445 - 1934.1363 * t
+    p1 = 282.9384 + 1.7195 * t
+    ut = (hours_j2000 + 12.0) % 24.0
+    tau = 15.0 * ut + h - s + 180.0
+    return np.array([tau, s, h, p, -n, p1]), n
+
+
+# 달 승교점 보정 (Schureman 근사)
+def _nodal(n_deg):
+    n = np.radians(n_deg)
+    c1, c2, c3 = np.cos(n), np.cos(2 * n), np.cos(3 * n)
+    s1, s2, s3 = np.sin(n), np.sin(2 * n), np.sin(3 * n)
+    m2 = (1.0004 - 0.0373 * c1 + 0.0002 * c2, -2.14 * s1)
+    k1 = (1.0060 + 0.1150 * c1 - 0.0088 * c2 + 0.0006 * c3, -8.86 * s1 + 0.68 * s2 - 0.07 * s3)
+    o1 = (1.0089 + 0.1871 * c1 - 0.0147 * c2 + 0.0014 * c3, 10.80 * s1 - 1.34 * s2 + 0.19 * s3)
+    k2 = (1.0241 + 0.2863 * c1 + 0.0083 * c2 - 0.0015 * c3, -17.74 * s1 + 0.68 * s2 - 0.04 * s3)
+    return {"M2": m2, "N2": m2, "S2": (1.0, 0.0), "K2": k2, "K1": k1, "O1": o1, "Q1": o1, "P1": (1.0, 0.0),
+            "M4": (m2[0] ** 2, 2 * m2[1]), "MS4": m2}
+
+
+def _hours_j2000(local_dt):
+    return (local_dt - timedelta(hours=JST_OFFSET_HOURS) - datetime(2000, 1, 1, 12)).total_seconds() / 3600.0
+
+
+# start부터 step분 간격으로 n개 조위 (m). 분조 × 시각 행렬 한 번으로 계산. f/u는 구간 중앙값 (한 달 이내면 충분)
+def predict(station, start, n, step_minutes=1):
+    names = list(station.constituents)
+    doodson = np.array([DOODSON[c][0] for c in names], dtype=float)
+    offset = np.array([DOODSON[c][1] for c in names], dtype=float)
+    amp, lag = np.array([station.constituents[c] for c in names]).T
+    h0 = _hours_j2000(start)
+    args0, _ = _astronomical_arguments(h0)
+    _, n_mid = _astronomical_arguments(h0 + (n - 1) * step_minutes / 120.0)
+    nodal = _nodal(n_mid)
+    f = np.array([nodal[c][0] for c in names])
+    u = np.array([nodal[c][1] for c in names])
+    phase0 = np.radians(doodson @ args0 + offset + u - lag)
+    speed = np.radians(doodson @ ARGUMENT_SPEEDS) * step_minutes / 60.0
+    steps = np.arange(n, dtype=float)
+    return station.z0 + (f * amp) @ np.cos(phase0[:, None] + speed[:, None] * steps[None, :])
+
+
+@dataclass
+class LowTideWindow:
+    start: datetime
+    end: datetime
+    lowest: datetime
+    height: float
+
+    def covers(self, begin, end):
+        return self.start <= begin and end <= self.end
+
+
+@dataclass
+class TideWarning:
+    place: str
+    begin: datetime
+    height: float      # 예정 시각의 조위
+    level: float       # 이 장소의 조위 상한
+    window: object     # 같은 날 가장 가까운 LowTideWindow (없으면 None)
+
+    def message(self):
+        text = f"{self.place} {self.begin:%H:%M} 예정: 조위 {self.height:.2f} m로 기준({self.level} m 이하)보다 높아요."
+        if self.window:
+            w = self.window
+            text += f" 가장 가까운 간조 구간은 {w.start:%H:%M}–{w.end:%H:%M} (최저 {w.lowest:%H:%M}, {w.height:.2f} m)."
+        return text
+
+
+# 분 단위 조위표. 인덱스 = start부터 지난 분
+class TideTable:
+    def __init__(self, station, start, days, step_minutes=1):
+        self.station = station
+        self.start = start
+        self.step = step_minutes
+        self.heights = predict(station, start, days * 24 * 60 // step_minutes, step_minutes)
+
+    def time_at(self, i):
+        return self.start + timedelta(minutes=int(i) * self.step)
+
+    def height_at(self, when):
+        i = int(round((when - self.start).total_seconds() / 60 / self.step))
+        return float(self.heights[min(max(i, 0), len(self.heights) - 1)])
+
+    # (시각, 조위, "high"/"low") 시간순. 기울기 부호가 바뀌는 지점
+    def extremes(self):
+        slope = np.sign(np.diff(self.heights))
+        turns = np.flatnonzero(slope[1:] != slope[:-1]) + 1
+        return [(self.time_at(i), float(self.heights[i]), "low" if slope[i - 1] < 0 else "high") for i in turns if slope[i - 1] != 0]
+
+    # 조위가 level 이하인 연속 구간
+    def low_windows(self, level):
+        below = np.concatenate(([False], self.heights <= level, [False]))
+        edges = np.flatnonzero(below[1:] != below[:-1])
+        windows = []
+        for a, b in zip(edges[::2], edges[1::2]):
+            k = a + int(np.argmin(self.heights[a:b]))
+            windows.append(LowTideWindow(self.time_at(a), self.time_at(b - 1), self.time_at(k), float(self.heights[k])))
+        return windows
+
+    def slice(self, begin, end):
+        a = max(0, int((begin - self.start).total_seconds() // 60 // self.step))
+        b = int((end - self.start).total_seconds() // 60 // self.step)
+        return self.heights[a:b]
+
+
+# 같은 기간은 한 번만 계산 (일정 기간 전체를 한 번에)
+@functools.lru_cache(maxsize=16)
+def tide_table(start_date, days, station=HIRARA, step_minutes=1):
+    return TideTable(station, datetime(start_date.year, start_date.month, start_date.day), days, step_minutes)
+
+
+# 일정의 물때 의존 장소가 조위 상한 아래(간조 구간)에 들어가는지. 머무는 시간 전체가 구간 안이어야 함
+# stops: [(장소, 시작 시각 datetime)], levels: 장소 → 조위 상한 (m)
+def tide_warnings(table, stops, levels, stay_minutes=60):
+    warnings = []
+    for place, begin in stops:
+        level = levels.get(place)
+        if level is None:
+            continue
+        end = begin + timedelta(minutes=stay_minutes)
+        windows = table.low_windows(level)
+        if any(w.covers(begin, end) for w in windows):
+            continue
+        same_day = [w for w in windows if w.lowest.date() == begin.date()]
+        best = min(same_day or windows, key=lambda w: abs(w.lowest - begin), default=None)
+        warnings.append(TideWarning(place, begin, table.height_at(begin), level, best))
+    return warnings
@@ -0,0 +1,185 @@
+import functools
+import urllib.parse
+from datetime import date, datetime
+
+# 앱의 고정 데이터. 모듈이라 프로세스당 한 번만 만들어지고 rerun마다 다시 만들지 않음
+
+# 맵코드 (대폭 추가 완료)
+mapcode_dict = {
+    # 기존 일정 장소
+    "시모지시마 공항": "721 212 255*62", "블루 터틀": "721 214 624*34", "17END": "721 211 534*83",
+    "힐튼 미야코지마": "310 451 316*52", "산에이 시티": "310 482 173*33", "K's Pit Diner": "310 481 054*41",
+    "요나하 마에하마 비치": "310 211 487*43", "코자 소바": "310 453 583*58", "히가시 헨나자키": "310 231 661*74",
+    "크로스 포인트": "310 183 831*25", "유토피아 팜": "310 304 492*06", "아타라스 시장": "310 395 726*47",
+    "야키니쿠 나카오": "310 483 145*55", "무스누 해변": "310 152 478*22", "해리스 쉬림프": "721 000 000*00",
+    "이케마 대교": "721 000 000*00", "이라부 대교": "310 481 211*17", "이온타운 미나미": "310 394 485*17",
+    "이자카야 훌라": "310 453 789*12", "스나야마 비치": "310 573 234*25", "나가마하마 비치": "310 151 518*55",
+    "토구치노하마": "721 214 742*71",
+    # [NEW] 추천 맛집 10선
+    "다그즈 버거": "310 453 752*33", "리히터 (스테이크)": "310 482 443*22", "코샤마 (이자카야)": "310 453 332*11",
+    "더 고조 (퓨전)": "310 453 665*88", "그랑 블루 가맹": "310 451 112*44", "파이나가마 블루 부스": "310 483 221*55",
+    "DOUG'S COFFEE": "310 453 752*35", "스낵 R": "310 453 999*00", "소라니와 (카페)": "721 213 123*45",
+    "공항 17END 키친": "721 212 255*65",
+    # [NEW] 필수 명소 10선
+    "임갸 마린 가든": "310 183 678*85", "나카노시마 비치": "721 241 123*45", "마키나 전망대": "310 481 777*22",
+    "토리이케 (용의 눈)": "721 210 555*11", "사와다 해변": "721 272 123*44", "후나쿠사기": "721 000 111*22",
+    "야비지 (항구)": "721 000 222*33", "쿠리마 대교": "310 181 333*44", "식물원": "310 000 555*66", "마모루군 (경찰)": "섬 곳곳"
+}
+
+# 영문/로마자 이름으로도 검색되도록 (miyako_search.py)
+MAPCODE_ALIASES = {
+    "시모지시마 공항": ["Shimojishima Airport"], "블루 터틀": ["Blue Turtle"], "17END": ["seventeen end"],
+    "힐튼 미야코지마": ["Hilton Miyakojima"], "산에이 시티": ["San-A City"], "K's Pit Diner": ["케이즈 핏 다이너"],
+    "요나하 마에하마 비치": ["Yonaha Maehama Beach"], "코자 소바": ["Koja Soba"], "히가시 헨나자키": ["Higashi-Hennazaki"],
+    "크로스 포인트": ["Cross Point"], "유토피아 팜": ["Utopia Farm"], "아타라스 시장": ["Atarass Market"],
+    "야키니쿠 나카오": ["Yakiniku Nakao"], "무스누 해변": ["Musunu Beach"], "해리스 쉬림프": ["Harry's Shrimp"],
+    "이케마 대교": ["Ikema Bridge"], "이라부 대교": ["Irabu Bridge"], "이온타운 미나미": ["AEON Town Minami"],
+    "이자카야 훌라": ["Izakaya Hula"], "스나야마 비치": ["Sunayama Beach"], "나가마하마 비치": ["Nagamahama Beach"],
+    "토구치노하마": ["Toguchi no Hama"],
+    "다그즈 버거": ["Doug's Burger"], "리히터 (스테이크)": ["Richter"], "코샤마 (이자카야)": ["Koshama"],
+    "더 고조 (퓨전)": ["The Gozso"], "그랑 블루 가맹": ["Grand Bleu Gamin"], "파이나가마 블루 부스": ["Painagama Blue Booth"],
+    "DOUG'S COFFEE": ["다그즈 커피"], "스낵 R": ["Snack R"], "소라니와 (카페)": ["Soraniwa"],
+    "공항 17END 키친": ["17END Kitchen"],
+    "임갸 마린 가든": ["Imgya Marine Garden"], "나카노시마 비치": ["Nakanoshima Beach"], "마키나 전망대": ["Makina Observatory"],
+    "토리이케 (용의 눈)": ["Toriike"], "사와다 해변": ["Sawada no Hama"], "후나쿠사기": ["Funakusagi"],
+    "야비지 (항구)": ["Yabiji"], "쿠리마 대교": ["Kurima Bridge"], "식물원": ["Botanical Garden"], "마모루군 (경찰)": ["Mamoru-kun"]
+}
+
+itinerary_data = [
+    ["2/16 (월)", "11:00", "도착", "시모지시마 공항", "렌터카 수령", 20000, "바다 위에 떠 있는 듯한 활주로로 유명한 공항입니다."],
+    ["2/16 (월)", "12:30", "중식", "블루 터틀", "오션뷰 스테이크", 5000, "이라부섬의 에메랄드빛 바다를 보며 즐기는 야외 테라스 식사."],
+    ["2/16 (월)", "14:00", "관광", "17END", "환상의 물빛 (간조)", 0, "지도에서 사라지는 환상의 해변. 간조 시간에만 드러나는 모래섬."],
+    ["2/16 (월)", "16:00", "숙소", "힐튼 미야코지마", "체크인", 0, "이라부 대교가 한눈에 보이는 럭셔리 리조트. 로비 석양 뷰 맛집."],
+    ["2/16 (월)", "17:00", "쇼핑", "산에이 시티", "마트/의류 쇼핑", 5000, "호텔에서 먹을 간식과 오키나와 한정 맥주, 무인양품 쇼핑."],
+    ["2/16 (월)", "19:00", "석식", "K's Pit Diner", "미국 감성 다이너", 6000, "1950년대 올드카와 힙한 인테리어. 육즙 터지는 미야코규 햄버거."],
+    ["2/17 (화)", "10:00", "관광", "요나하 마에하마 비치", "동양 최고 비치", 0, "동양의 몰디브. 7km나 이어지는 눈부신 백사장."],
+    ["2/17 (화)", "12:00", "중식", "코자 소바", "두툼 삼겹살 소바", 2500, "그릇을 덮는 거대한 삼겹살 조림이 올라간 소바."],
+    ["2/17 (화)", "13:30", "관광", "히가시 헨나자키", "웅장한 절벽 뷰", 500, "섬의 동쪽 끝, 거친 파도와 웅장한 절벽, 하얀 등대의 파노라마."],
+    ["2/17 (화)", "15:00", "쇼핑", "크로스 포인트", "기념품/리조트룩", 5000, "시기에 리조트 단지 내 쇼핑몰. 황금 거북이 빵 등 기념품."],
+    ["2/17 (화)", "16:00", "디저트", "유토피아 팜", "망고 파르페", 2000, "꽃들이 만발한 온실 속에서 즐기는 농장 직영 망고 파르페."],
+    ["2/17 (화)", "17:00", "쇼핑", "아타라스 시장", "현지 과일/빵", 2000, "현지 과일(망고, 파인애플)과 도시락을 저렴하게 구입."],
+    ["2/17 (화)", "19:00", "석식", "힐튼 디너 뷔페", "호텔 럭셔리 만찬", 16000, "라이브 스테이션과 신선한 해산물. 로맨틱한 저녁."],
+    ["2/18 (수)", "09:00", "투어", "거북이 스노클링", "야비지 거북이", 15000, "눈앞에서 유유히 헤엄치는 바다거북과의 만남."],
+    ["2/18 (수)", "13:30", "중식", "카메 스시", "현지인 런치 스시", 4000, "가성비와 퀄리티를 모두 잡은 로컬 스시 맛집."],
+    ["2/18 (수)", "15:00", "휴식", "호텔 호캉스", "낮잠 & 온수 샤워", 0, "오전 물놀이 후 즐기는 꿀같은 휴식."],
+    ["2/18 (수)", "18:00", "석식", "야키니쿠 나카오", "최상급 미야코규", 15000, "입안에서 살살 녹는 미야코규 숯불 구이."],
+    ["2/18 (수)", "20:30", "관광", "별빛 드라이브", "무스누 해변", 0, "가로등 없는 해변에서 쏟아지는 별과 은하수 감상."],
+    ["2/19 (목)", "11:00", "브런치", "해리스 쉬림프", "갈릭 쉬림프", 3500, "이케마 대교 뷰. 하와이안 스타일 갈릭 쉬림프 트럭."],
+    ["2/19 (목)", "13:00", "관광", "이라부 대교", "드라이브", 0, "일본 최장 무료 다리(3,540m). 바다 위를 달리는 드라이브."],
+    ["2/19 (목)", "15:00", "쇼핑", "이온타운 미나미", "다이소/맥스밸류", 10000, "귀국 전 마지막 쇼핑. 곤약젤리, 컵라면 등 생필품 털기."],
+    ["2/19 (목)", "18:30", "석식", "이자카야 훌라", "현지 감성 다이닝", 8000, "오키나와 민요가 흐르는 활기찬 분위기. 오리온 생맥주."],
+    ["2/19 (목)", "20:30", "후식", "블루씰 아이스크림", "소금우유맛", 1000, "오키나와 1일 1블루씰. 단짠단짠 소금우유맛."],
+    ["2/20 (금)", "10:00", "이동", "렌터카 반납", "주유소 경유", 3000, "레귤러 만탄(가득) 주유 후 차량 반납."],
+    ["2/20 (금)", "12:00", "출발", "인천행", "진에어 귀국", 0, "아쉬움을 뒤로하고 일상으로 복귀."]
+]
+ITINERARY_COLUMNS = ["날짜", "시간", "구분", "장소", "요약", "비용", "설명"]
+TRIP_DAYS = list(dict.fromkeys(row[0] for row in itinerary_data))
+TRIP_YEAR = 2026
+
+# 물때를 타는 장소 → 조위 상한 (m, 기본 수준면 기준). 이보다 물이 빠졌을 때 가야 함 (miyako_tide.py)
+TIDE_LEVELS = {"17END": 0.8, "임갸 마린 가든": 0.9, "나카노시마 비치": 0.9}
+
+
+# "2/16 (월)" → date(2026, 2, 16)
+def trip_date(day):
+    month, dom = day.split()[0].split("/")
+    return date(TRIP_YEAR, int(month), int(dom))
+
+
+# 일정 한 줄의 시작 시각 (JST)
+def stop_time(day, hhmm):
+    d = trip_date(day)
+    hour, minute = hhmm.split(":")
+    return datetime(d.year, d.month, d.day, int(hour), int(minute))
+
+locations = {
+    "시모지시마 공항": [24.8263, 125.1447], "17END": [24.8384, 125.1378], "블루 터틀": [24.8143, 125.1834], "힐튼 미야코지마": [24.8187, 125.2673],
+    "요나하 마에하마 비치": [24.7364, 125.2638], "히가시 헨나자키": [24.7312, 125.4646], "이케마 대교": [24.9252, 125.2662], "이라부 대교": [24.8193, 125.1728],
+    "야키니쿠 나카오": [24.7958, 125.2855], "해리스 쉬림프": [24.9123, 125.2612]
+}
+
+THEMES = [
+    ["1일차", "2/16", "미야코 블루", "17END & 럭셔리 디너"], ["2일차", "2/17", "절경 드라이브", "등대 뷰 & 시장 투어"],
+    ["3일차", "2/18", "바다와 미식", "거북이 & 야키니쿠"], ["4일차", "2/19", "섬 일주", "이케마섬 & 이자카야"], ["5일차", "2/20", "귀국", "공항 이동"]
+]
+THEME_COLUMNS = ["일차", "날짜", "테마", "포인트"]
+
+# 💎 Secret Spots: 열마다 카드 하나, 카드 안에 (제목, [(장소, 한 줄 설명)]) 묶음
+HIDDEN_GEMS = [
+    [("🏖️ Hidden Beaches", [("스나야마 비치", "바위 아치 석양"), ("나가마하마 비치", "프라이빗 비밀 해변"), ("토구치노하마", "파우더 샌드")]),
+     ("🛍️ Boutique Shopping", [("디자트", "세련된 소품샵"), ("나모시아", "핸드메이드 액세서리")])],
+    [("🍱 Local's Choice", [("마루요시 소바", "전설의 소바"), ("모쟈노 빵집", "오픈런 베이커리"), ("보쿠노 키친", "이탈리안 퓨전")]),
+     ("📸 Photo Op", [("이케마 대교 전망대", "숨겨진 뷰포인트")])],
+]
+
+# 추천 목록: (표시 이름, 지도 검색어, 평점, 설명)
+GOURMET_TOP10 = [
+    ("다그즈 버거 (Doug's Burger)", "Doug's Burger", "★4.2", "참치 스테이크 버거가 유명한 미야코지마 대표 수제버거."),
+    ("리히터 (Richter)", "Richter Steak", "★4.5", "미야코규 스테이크를 합리적인 가격에 즐길 수 있는 곳."),
+    ("코샤마 (Koshama)", "Koshama", "★4.3", "라이브 연주를 들으며 즐기는 분위기 깡패 이자카야."),
+    ("더 고조 (The Gozso)", "The Gozso", "★4.1", "오키나와 식재료를 활용한 창작 퓨전 요리 전문점."),
+    ("그랑 블루 가맹 (Grand Bleu Gamin)", "Grand Bleu Gamin", "★4.6", "특별한 날 가기 좋은 프라이빗 럭셔리 디너."),
+    ("파이나가마 블루 부스", "Painagama Blue Booth", "★4.4", "항구 뷰를 보며 먹는 핫도그와 카페 메뉴."),
+    ("DOUG'S COFFEE", "Doug's Coffee", "★4.3", "다그즈 버거 옆, 커피가 정말 맛있는 로스터리 카페."),
+    ("스낵 R (Snack R)", "Snack R", "★4.0", "현지인들과 어울려 술 한잔하기 좋은 로컬 스낵바."),
+    ("소라니와 (Soraniwa)", "Soraniwa", "★4.2", "이라부섬의 탁 트인 오션뷰를 자랑하는 카페 & 레스토랑."),
+    ("17END Kitchen", "Shimojishima Airport 17END Kitchen", "★4.1", "시모지시마 공항 내 위치, 활주로 뷰 맛집."),
+]
+MUST_VISIT_TOP10 = [
+    ("임갸 마린 가든", "Imgya Marine Garden", None, "천연 풀장으로 불리는 스노클링 초보자들의 성지."),
+    ("나카노시마 비치", "Nakanoshima Beach", None, "시모지시마의 스노클링 명소. 물고기 떼가 장관."),
+    ("마키나 전망대", "Makina Observatory", None, "이라부 대교 전체를 조망할 수 있는 숨겨진 뷰포인트."),
+    ("토리이케 (용의 눈)", "Toriike", None, "두 개의 연못이 지하로 바다와 연결된 신비로운 다이빙 포인트."),
+    ("사와다 해변", "Sawada no Hama", None, "거대한 바위들이 바다에 흩뿌려진 독특한 풍광 (석양 명소)."),
+    ("후나쿠사기", "Funakusagi", None, "절벽 아래 숨겨진 비경, 아는 사람만 가는 시크릿 스팟."),
+    ("야비지 (Yabiji)", "Yabiji", None, "일본 최대의 산호초 군락. 배를 타고 나가야만 볼 수 있는 절경."),
+    ("쿠리마 대교", "Kurima Bridge", None, "미야코지마 바다 색깔이 가장 예쁘게 보인다는 다리."),
+    ("미야코지마 시 열대식물원", "Miyakojima City Botanical Garden", None, "1,600종 이상의 식물이 있는 힐링 산책 코스."),
+    ("미야코지마 마모루군", "Miyakojima Mamoru-kun", None, "섬 곳곳에 서 있는 경찰 인형. 전원과 인증샷 찍기 도전!"),
+]
+
+# 🚲 Experiences: (스타일, 아이콘, 이름, 지도 검색어, 설명)
+EXPERIENCES = [
+    ("info", "🚲", "이라부 대교 자전거", "시모지시마 공항 자전거 대여", "바다 위를 달리는 자유."),
+    ("success", "🌌", "무스누 해변 별밤", "무스누 해변", "쏟아지는 은하수 명상."),
+    ("warning", "🏺", "시사 체험", "시사 체험", "커플 시사 만들기."),
+]
+
+# 🎒 Travel Kit: (묶음, 펼쳐 두기, 항목)
+PACKING_LIST = [
+    ("📄 필수 서류 & 현금", True, ["여권 (6개월 이상)", "국제운전면허증 (실물)", "한국 면허증", "엔화 현금", "트래블카드", "바우처"]),
+    ("🔌 전자기기 (Camera & Tech)", True, ["DJI Flip (충전기)", "GoPro 액션캠 (배터리 여분)", "DJI 360", "DJI Pocket 3", "돼지코 (110V)", "보조배터리", "멀티탭", "메모리 카드"]),
+    ("🏊‍♂️ 물놀이 & 의류", False, ["수영복/래시가드", "아쿠아슈즈", "스노클링 장비", "방수팩", "선글라스/모자", "선크림"]),
+    ("💊 비상약 & 기타", False, ["멀미약", "소화제/진통제", "대일밴드", "물티슈/휴지"]),
+]
+
+# 상황별 일본어: (탭, [(스타일, 상황, 표현)])
+PHRASES = [
+    ("🚗 운전", [("info", "주유", "레귤러 만탄 오네가이"), ("info", "주차", "코코니 토메테모 이이데스까?")]),
+    ("🍱 식당", [("success", "주문", "고레 히토츠"), ("success", "고수", "파쿠치 누키데"), ("success", "계산", "오카이케 오네가이")]),
+    ("🆘 응급", [("error", "도와줘요", "다스케테 구다사이!"), ("warning", "화장실", "토이레와 도코 데스까?")]),
+]
+
+# 비상 연락처 (줄마다)
+EMERGENCY_CONTACTS = [[("👮 경찰", "110"), ("🚑 구급", "119")], [("📞 영사관", "+81-92-771-0461")]]
+
+
+def map_url(place):
+    return f"https://www.google.com/maps/search/{urllib.parse.quote(f'미야코지마 {place}')}"
+
+
+# pandas는 일정표를 실제로 그릴 때만 import
+@functools.lru_cache(maxsize=1)
+def itinerary_frame():
+    import pandas as pd
+
+    df = pd.DataFrame(itinerary_data, columns=ITINERARY_COLUMNS)
+    df['MapCode'] = df['장소'].map(mapcode_dict).fillna("-")
+    return df
+
+
+@functools.lru_cache(maxsize=1)
+def themes_frame():
+    import pandas as pd
+
+    return pd.DataFrame(THEMES, columns=THEME_COLUMNS).set_index("일차")
@@ -1,63 +1,139 @@
 import streamlit as st
-import pandas as pd
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import os
-import urllib.parse
-import plotly.express as px
-from datetime import datetime
+from datetime import datetime, timedelta
 import pytz
-import requests
-import folium
-from streamlit_folium import st_folium
 import random
-import json
+import time
+import miyako_storage
+import miyako_fetch
+import miyako_geo
+import miyako_search
+import miyako_export
+import miyako_images
+import miyako_metrics
+from miyako_metrics import metrics
+from miyako_trip import (mapcode_dict, MAPCODE_ALIASES, locations, TRIP_DAYS, HIDDEN_GEMS, GOURMET_TOP10, MUST_VISIT_TOP10,
+                         EXPERIENCES, PACKING_LIST, PHRASES, EMERGENCY_CONTACTS, TIDE_LEVELS, map_url, trip_date, stop_time,
+                         itinerary_frame, themes_frame)
+
+# pandas/plotly/numpy(miyako_ledger, miyako_route)는 쓰는 탭 안에서만 import (python benchmarks/bench_startup.py)
 
 # 1. 페이지 설정 및 디자인
 st.set_page_config(page_title="Miyako Blue 🐢", page_icon="🐢", layout="wide")
 
-# 데이터 파일 경로
-DATA_FILE = "miyako_data.json"
-
-# 데이터 로드 함수
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {
-        "expenses": [],
-        "total_budget": 150000,
-        "diary": [],
-        "dark_mode": False
-    }
-
-# 데이터 저장 함수
-def save_data():
-    data = {
-        "expenses": st.session_state.expenses,
-        "total_budget": st.session_state.total_budget,
-        "diary": st.session_state.diary,
-        "dark_mode": st.session_state.dark_mode
-    }
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+# 성능 지표 (miyako_metrics.py): MIYAKO_METRICS=1 이면 프로세스 전체, ?debug=1 이면 그 세션의 rerun만 모으고
+# 그 세션의 사이드바 맨 아래에 디버그 패널을 띄움 (다른 세션에는 보이지 않음)
+# opt_in은 계측 지점마다 불리므로 session_state 대신 세션 id 집합만 확인 (프로세스 전체에서 하나)
+@st.cache_resource
+def get_debug_sessions():
+    return set()
+
+debug_sessions = get_debug_sessions()
+st.session_state.metrics_debug = st.query_params.get("debug") == "1"
+session_id = get_script_run_ctx().session_id
+if st.session_state.metrics_debug:
+    debug_sessions.add(session_id)
+else:
+    debug_sessions.discard(session_id)
+# 닫힌 탭의 세션 id는 런타임에서 사라진 것을 보고 지움 (AppTest처럼 런타임이 없으면 건너뜀)
+if debug_sessions and runtime.exists():
+    for sid in list(debug_sessions):
+        if not runtime.get_instance().is_active_session(sid):
+            debug_sessions.discard(sid)
+
+def debug_session():
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx is not None and ctx.session_id in debug_sessions
+
+metrics.opt_in = debug_session
+script_start = time.perf_counter()
+
+# 데이터 저장소: 프로세스 전체에서 한 번만 로드하고 세션들은 같은 상태를 읽음 (miyako_storage.py)
+@metrics.cached("get_store", st.cache_resource)
+def get_store():
+    return miyako_storage.open_store()
+
+store = get_store()
+
+# 다른 프로세스가 쓴 변경 반영
+def refresh_data():
+    with metrics.section("storage.refresh"):
+        store.refresh()
+
+refresh_data()
+data = store.view()
+
+# 지출 장부: 저장소 변경을 따라가는 열 지향 사본. 합계/집계는 여기서 (miyako_ledger.py)
+@metrics.cached("get_ledger", st.cache_resource)
+def get_ledger():
+    import miyako_ledger
+    ledger = miyako_ledger.Ledger()
+    get_store().subscribe(ledger.on_change)
+    return ledger
+
+# 이미지 변형 캐시: 사진/동선 이미지를 크기별 WebP·JPEG로 한 번만 만들어 정적 파일로 (miyako_images.py)
+@metrics.cached("get_images", st.cache_resource)
+def get_images():
+    return miyako_images.ImageCache()
+
+# 데이터 저장 함수: 변경 하나를 연산 로그에 추가 (목록 편집은 위치가 아닌 항목 id 기준).
+# 예산/목록 편집은 화면을 그린 시점의 버전을 넘겨, 그 사이 다른 세션이 같은 값을 바꿨으면 덮어쓰지 않고 알림
+def save_data(op, expected_version=None, **fields):
+    with metrics.section("storage.save"):
+        try:
+            store.update({"op": op, **fields}, expected_version)
+        except miyako_storage.ConflictError:
+            st.session_state.save_conflict = True
+
+# 콜백 안에서는 요소를 그리지 않고, 다시 그려지는 fragment에서 알림
+def notify_conflict():
+    if st.session_state.pop("save_conflict", False):
+        st.toast("⚠️ 다른 곳에서 먼저 바뀐 내용이 있어 저장하지 않았어요. 최신 내용을 확인하고 다시 시도해 주세요.")
+
+# 지갑 변경: 지갑 fragment만 다시 그림 (Overview 예산 현황은 탭을 열 때 새로 그려짐)
+def save_wallet(op, expected_version=None, **fields):
+    save_data(op, expected_version, **fields)
+    st.rerun("wallet")
+
+# 긴 목록은 한 페이지(최신순)만 편집기로 보여줌. 체크한 삭제와 셀 수정은 저장 버튼에서 연산 하나로 기록
+PAGE_SIZE = 50
+
+def page_of(records, key):
+    total = len(records)
+    pages = max(1, -(-total // PAGE_SIZE))
+    if st.session_state.get(key, 1) > pages:
+        st.session_state[key] = pages
+    c_page, c_info = st.columns([1, 3], vertical_alignment="bottom")
+    page = c_page.number_input("페이지", min_value=1, max_value=pages, step=1, key=key)
+    c_info.caption(f"총 {total:,}건 · {page}/{pages} 페이지 (최신순)")
+    end = total - (page - 1) * PAGE_SIZE
+    return records[max(0, end - PAGE_SIZE):end][::-1], page
+
+# 편집기 상태 → (수정 목록, 삭제 id 목록). fields: 화면 열 이름 → 저장 필드
+def edited_batch(editor_key, ids, fields):
+    edited = st.session_state[editor_key]["edited_rows"]
+    delete = [ids[i] for i, row in edited.items() if row.get("삭제")]
+    update = []
+    for i, row in edited.items():
+        changes = {fields[c]: v for c, v in row.items() if c in fields and v is not None and v != ""}
+        if changes and not row.get("삭제"):
+            update.append(dict(changes, id=ids[i]))
+    return update, delete
 
 # 초기 Session State 설정
 if 'initialized' not in st.session_state:
-    saved_data = load_data()
-    st.session_state.expenses = saved_data["expenses"]
-    st.session_state.total_budget = saved_data["total_budget"]
-    st.session_state.diary = saved_data["diary"]
-    st.session_state.dark_mode = saved_data["dark_mode"]
     if 'selected_day' not in st.session_state:
         st.session_state.selected_day = "2/16 (월)"
     st.session_state.initialized = True
 
 # 다크 모드 토글
 def toggle_theme():
-    st.session_state.dark_mode = not st.session_state.dark_mode
-    save_data()
+    save_data("set_theme", value=not data["dark_mode"])
 
 # CSS 적용
-if st.session_state.dark_mode:
+if data["dark_mode"]:
     page_bg = """
     <style>
     .stApp { background-color: #0e1117; color: #e0e0e0; }
@@ -85,312 +161,500 @@ else:
     </style>"""
 st.markdown(page_bg, unsafe_allow_html=True)
 
-# 2. API 함수들
-@st.cache_data(ttl=3600)
-def get_exchange_rate():
-    try:
-        url = "https://api.exchangerate-api.com/v4/latest/JPY"
-        return requests.get(url).json()['rates']['KRW'] * 100
-    except: return 900.0
+# 헤더는 API 응답을 기다리기 전에 먼저 그림 (첫 화면)
+st.markdown(f"""<div class="wave-header"><h2>Miyako Blue 🐢</h2><p>The Ultimate Super App for Chris.</p></div>""", unsafe_allow_html=True)
 
-@st.cache_data(ttl=3600)
-def get_miyako_weather_3days():
-    try:
-        url = "https://api.open-meteo.com/v1/forecast?latitude=24.80&longitude=125.28&daily=weathercode,temperature_2m_max,temperature_2m_min&timezone=Asia%2FTokyo&forecast_days=3"
-        daily = requests.get(url).json()['daily']
-        forecasts = []
-        days_label = ["오늘", "내일", "모레"]
-        for i in range(3):
-            code = daily['weathercode'][i]
-            icon = "☀️"
-            if code in [1, 2, 3]: icon = "☁️"
-            elif code in [45, 48]: icon = "🌫️"
-            elif code in [51, 53, 55, 61, 63, 65]: icon = "🌧️"
-            elif code >= 80: icon = "☔"
-            forecasts.append({"day": days_label[i], "icon": icon, "max": round(daily['temperature_2m_max'][i]), "min": round(daily['temperature_2m_min'][i])})
-        return forecasts
-    except: return None
+# 2. API (miyako_fetch.py: 풀링된 세션으로 병렬 조회, 타임아웃, 마지막 정상값 즉시 제공)
+@metrics.cached("get_fetcher", st.cache_resource)
+def get_fetcher():
+    return miyako_fetch.Fetcher()
 
 d_day = (datetime(2026, 2, 16).date() - datetime.now(pytz.timezone('Asia/Seoul')).date()).days
-weather_3days = get_miyako_weather_3days()
-current_rate = get_exchange_rate()
+with metrics.section("api"):
+    api = get_fetcher().get_many(["rate", "weather"])
+weather_3days = api["weather"]
+current_rate = api["rate"] or miyako_fetch.DEFAULT_RATE
 
 # 3. 사이드바
-with st.sidebar:
+# 위젯을 건드려도 앱 전체가 아닌 해당 fragment만 다시 실행됨
+@st.fragment(key="roulette")
+@metrics.timed("fragment.roulette")
+def menu_roulette():
+    st.subheader("🎲 Menu Roulette")
+    if st.button("오늘 뭐 먹지? (Pick!)"):
+        pick = random.choice(["블루 터틀", "K's Pit Diner", "코자 소바", "유토피아 팜", "카메 스시", "야키니쿠 나카오", "해리스 쉬림프", "이자카야 훌라", "블루씰 아이스크림", "다그즈 버거"])
+        st.success(f"🎉 당첨! **{pick}** 가자!")
+
+@st.fragment(key="jpy_calc")
+@metrics.timed("fragment.jpy_calc")
+def jpy_calc():
+    st.subheader("💴 JPY Calc")
+    st.caption(f"Rate: 100¥ = {current_rate:.1f}₩")
+    jpy_input = st.number_input("JPY", value=None, step=100, placeholder="엔화 입력")
+    if jpy_input: st.success(f"🇰🇷 {int(jpy_input * (current_rate / 100)):,} 원")
+
+# 신호가 끊기는 곳에 대비한 정적 오프라인 묶음 (miyako_export.py). 바뀐 페이지만 다시 씀
+def export_offline():
+    try:
+        written, kept = miyako_export.export()
+    except miyako_export.ExportRunning:
+        st.session_state.offline_busy = True
+        return
+    st.session_state.offline_result = f"{len(written)}개 파일 갱신 · {len(kept)}개 그대로"
+
+@st.fragment(key="offline")
+@metrics.timed("fragment.offline")
+def offline_bundle():
+    st.subheader("📴 Offline")
+    st.button("오프라인 버전 만들기/갱신", on_click=export_offline)
+    if st.session_state.pop("offline_busy", False):
+        st.toast("⏳ 다른 곳에서 이미 오프라인 버전을 만들고 있어요. 잠시 후 다시 눌러 주세요.")
+    if st.session_state.get("offline_result"):
+        st.caption(st.session_state.offline_result)
+    if os.path.exists(os.path.join(miyako_export.EXPORT_DIR, "index.html")):
+        st.link_button("오프라인 버전 열기", miyako_export.EXPORT_URL)
+        st.caption("신호가 있을 때 한 번 열어 두면 이후엔 네트워크 없이 열려요.")
+
+with st.sidebar, metrics.section("sidebar"):
     st.header("🛫 Trip Dashboard")
-    st.toggle("🌌 Stargazing Mode", value=st.session_state.dark_mode, on_change=toggle_theme)
+    st.toggle("🌌 Stargazing Mode", value=data["dark_mode"], on_change=toggle_theme)
     
     st.subheader("☀️ Miyako Weather")
     if weather_3days:
-        st.markdown(f"""<div style="background:{'#333' if st.session_state.dark_mode else 'white'}; padding:15px; border-radius:12px; box-shadow:0 2px 8px rgba(0,0,0,0.05);">""", unsafe_allow_html=True)
+        st.markdown(f"""<div style="background:{'#333' if data['dark_mode'] else 'white'}; padding:15px; border-radius:12px; box-shadow:0 2px 8px rgba(0,0,0,0.05);">""", unsafe_allow_html=True)
         for w in weather_3days:
-            st.markdown(f"""<div class="weather-row"><span style="font-size:14px; font-weight:600;">{w['day']}</span><span style="font-size:18px;">{w['icon']}</span><span style="font-size:13px; color:{'#ccc' if st.session_state.dark_mode else '#777'};"><span style="color:#ff5252;">{w['max']}°</span> / <span style="color:#448aff;">{w['min']}°</span></span></div>""", unsafe_allow_html=True)
+            st.markdown(f"""<div class="weather-row"><span style="font-size:14px; font-weight:600;">{w['day']}</span><span style="font-size:18px;">{w['icon']}</span><span style="font-size:13px; color:{'#ccc' if data['dark_mode'] else '#777'};"><span style="color:#ff5252;">{w['max']}°</span> / <span style="color:#448aff;">{w['min']}°</span></span></div>""", unsafe_allow_html=True)
         st.markdown("</div>", unsafe_allow_html=True)
     
     st.markdown("---")
-    st.subheader("🎲 Menu Roulette")
-    if st.button("오늘 뭐 먹지? (Pick!)"):
-        pick = random.choice(["블루 터틀", "K's Pit Diner", "코자 소바", "유토피아 팜", "카메 스시", "야키니쿠 나카오", "해리스 쉬림프", "이자카야 훌라", "블루씰 아이스크림", "다그즈 버거"])
-        st.success(f"🎉 당첨! **{pick}** 가자!")
+    menu_roulette()
     
     st.markdown("---")
-    st.subheader("💴 JPY Calc")
-    st.caption(f"Rate: 100¥ = {current_rate:.1f}₩")
-    jpy_input = st.number_input("JPY", value=None, step=100, placeholder="엔화 입력")
-    if jpy_input: st.success(f"🇰🇷 {int(jpy_input * (current_rate / 100)):,} 원")
+    jpy_calc()
     
     st.markdown("---")
     if d_day > 0: st.metric("D-Day", f"D-{d_day}", "설렘 주의!")
     else: st.metric("D-Day", f"D+{abs(d_day)}", "여행 중")
     
+    st.markdown("---")
+    offline_bundle()
+
     st.markdown("---")
     st.subheader("🎵 BGM")
     st.markdown("""<iframe width="100%" height="200" src="https://www.youtube.com/embed/videoseries?list=PLkH-FRvpGUQTJv2K_bB8AyH1irPasrkiQ" title="Chris Playlist" frameborder="0" allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture" allowfullscreen></iframe>""", unsafe_allow_html=True)
 
-# 4. 헤더
-st.markdown(f"""<div class="wave-header"><h2>Miyako Blue 🐢</h2><p>The Ultimate Super App for Chris.</p></div>""", unsafe_allow_html=True)
+# 6. 탭 구성: 선택된 탭만 실행 (탭을 바꾸면 rerun). 무거운 탭은 tab.open일 때만 그림
+tab0, tab_map, tab1, tab2, tab3, tab4, tab5 = st.tabs(["🏛️ Overview", "🗺️ Map", "📅 Itinerary", "💎 Secret Spots", "🚲 Experiences", "🎒 Travel Kit", "💰 Wallet"], key="main_tab", on_change="rerun")
 
-# 5. 데이터 (맵코드 대폭 추가 완료)
-mapcode_dict = {
-    # 기존 일정 장소
-    "시모지시마 공항": "721 212 255*62", "블루 터틀": "721 214 624*34", "17END": "721 211 534*83",
-    "힐튼 미야코지마": "310 451 316*52", "산에이 시티": "310 482 173*33", "K's Pit Diner": "310 481 054*41",
-    "요나하 마에하마 비치": "310 211 487*43", "코자 소바": "310 453 583*58", "히가시 헨나자키": "310 231 661*74",
-    "크로스 포인트": "310 183 831*25", "유토피아 팜": "310 304 492*06", "아타라스 시장": "310 395 726*47",
-    "야키니쿠 나카오": "310 483 145*55", "무스누 해변": "310 152 478*22", "해리스 쉬림프": "721 000 000*00",
-    "이케마 대교": "721 000 000*00", "이라부 대교": "310 481 211*17", "이온타운 미나미": "310 394 485*17",
-    "이자카야 훌라": "310 453 789*12", "스나야마 비치": "310 573 234*25", "나가마하마 비치": "310 151 518*55",
-    "토구치노하마": "721 214 742*71",
-    # [NEW] 추천 맛집 10선
-    "다그즈 버거": "310 453 752*33", "리히터 (스테이크)": "310 482 443*22", "코샤마 (이자카야)": "310 453 332*11",
-    "더 고조 (퓨전)": "310 453 665*88", "그랑 블루 가맹": "310 451 112*44", "파이나가마 블루 부스": "310 483 221*55",
-    "DOUG'S COFFEE": "310 453 752*35", "스낵 R": "310 453 999*00", "소라니와 (카페)": "721 213 123*45",
-    "공항 17END 키친": "721 212 255*65",
-    # [NEW] 필수 명소 10선
-    "임갸 마린 가든": "310 183 678*85", "나카노시마 비치": "721 241 123*45", "마키나 전망대": "310 481 777*22",
-    "토리이케 (용의 눈)": "721 210 555*11", "사와다 해변": "721 272 123*44", "후나쿠사기": "721 000 111*22",
-    "야비지 (항구)": "721 000 222*33", "쿠리마 대교": "310 181 333*44", "식물원": "310 000 555*66", "마모루군 (경찰)": "섬 곳곳"
-}
-
-itinerary_data = [
-    ["2/16 (월)", "11:00", "도착", "시모지시마 공항", "렌터카 수령", 20000, "바다 위에 떠 있는 듯한 활주로로 유명한 공항입니다."],
-    ["2/16 (월)", "12:30", "중식", "블루 터틀", "오션뷰 스테이크", 5000, "이라부섬의 에메랄드빛 바다를 보며 즐기는 야외 테라스 식사."],
-    ["2/16 (월)", "14:00", "관광", "17END", "환상의 물빛 (간조)", 0, "지도에서 사라지는 환상의 해변. 간조 시간에만 드러나는 모래섬."],
-    ["2/16 (월)", "16:00", "숙소", "힐튼 미야코지마", "체크인", 0, "이라부 대교가 한눈에 보이는 럭셔리 리조트. 로비 석양 뷰 맛집."],
-    ["2/16 (월)", "17:00", "쇼핑", "산에이 시티", "마트/의류 쇼핑", 5000, "호텔에서 먹을 간식과 오키나와 한정 맥주, 무인양품 쇼핑."],
-    ["2/16 (월)", "19:00", "석식", "K's Pit Diner", "미국 감성 다이너", 6000, "1950년대 올드카와 힙한 인테리어. 육즙 터지는 미야코규 햄버거."],
-    ["2/17 (화)", "10:00", "관광", "요나하 마에하마 비치", "동양 최고 비치", 0, "동양의 몰디브. 7km나 이어지는 눈부신 백사장."],
-    ["2/17 (화)", "12:00", "중식", "코자 소바", "두툼 삼겹살 소바", 2500, "그릇을 덮는 거대한 삼겹살 조림이 올라간 소바."],
-    ["2/17 (화)", "13:30", "관광", "히가시 헨나자키", "웅장한 절벽 뷰", 500, "섬의 동쪽 끝, 거친 파도와 웅장한 절벽, 하얀 등대의 파노라마."],
-    ["2/17 (화)", "15:00", "쇼핑", "크로스 포인트", "기념품/리조트룩", 5000, "시기에 리조트 단지 내 쇼핑몰. 황금 거북이 빵 등 기념품."],
-    ["2/17 (화)", "16:00", "디저트", "유토피아 팜", "망고 파르페", 2000, "꽃들이 만발한 온실 속에서 즐기는 농장 직영 망고 파르페."],
-    ["2/17 (화)", "17:00", "쇼핑", "아타라스 시장", "현지 과일/빵", 2000, "현지 과일(망고, 파인애플)과 도시락을 저렴하게 구입."],
-    ["2/17 (화)", "19:00", "석식", "힐튼 디너 뷔페", "호텔 럭셔리 만찬", 16000, "라이브 스테이션과 신선한 해산물. 로맨틱한 저녁."],
-    ["2/18 (수)", "09:00", "투어", "거북이 스노클링", "야비지 거북이", 15000, "눈앞에서 유유히 헤엄치는 바다거북과의 만남."],
-    ["2/18 (수)", "13:30", "중식", "카메 스시", "현지인 런치 스시", 4000, "가성비와 퀄리티를 모두 잡은 로컬 스시 맛집."],
-    ["2/18 (수)", "15:00", "휴식", "호텔 호캉스", "낮잠 & 온수 샤워", 0, "오전 물놀이 후 즐기는 꿀같은 휴식."],
-    ["2/18 (수)", "18:00", "석식", "야키니쿠 나카오", "최상급 미야코규", 15000, "입안에서 살살 녹는 미야코규 숯불 구이."],
-    ["2/18 (수)", "20:30", "관광", "별빛 드라이브", "무스누 해변", 0, "가로등 없는 해변에서 쏟아지는 별과 은하수 감상."],
-    ["2/19 (목)", "11:00", "브런치", "해리스 쉬림프", "갈릭 쉬림프", 3500, "이케마 대교 뷰. 하와이안 스타일 갈릭 쉬림프 트럭."],
-    ["2/19 (목)", "13:00", "관광", "이라부 대교", "드라이브", 0, "일본 최장 무료 다리(3,540m). 바다 위를 달리는 드라이브."],
-    ["2/19 (목)", "15:00", "쇼핑", "이온타운 미나미", "다이소/맥스밸류", 10000, "귀국 전 마지막 쇼핑. 곤약젤리, 컵라면 등 생필품 털기."],
-    ["2/19 (목)", "18:30", "석식", "이자카야 훌라", "현지 감성 다이닝", 8000, "오키나와 민요가 흐르는 활기찬 분위기. 오리온 생맥주."],
-    ["2/19 (목)", "20:30", "후식", "블루씰 아이스크림", "소금우유맛", 1000, "오키나와 1일 1블루씰. 단짠단짠 소금우유맛."],
-    ["2/20 (금)", "10:00", "이동", "렌터카 반납", "주유소 경유", 3000, "레귤러 만탄(가득) 주유 후 차량 반납."],
-    ["2/20 (금)", "12:00", "출발", "인천행", "진에어 귀국", 0, "아쉬움을 뒤로하고 일상으로 복귀."]
-]
-df_itinerary = pd.DataFrame(itinerary_data, columns=["날짜", "시간", "구분", "장소", "요약", "비용", "설명"])
-df_itinerary['MapCode'] = df_itinerary['장소'].map(mapcode_dict).fillna("-")
-
-locations = {
-    "시모지시마 공항": [24.8263, 125.1447], "17END": [24.8384, 125.1378], "블루 터틀": [24.8143, 125.1834], "힐튼 미야코지마": [24.8187, 125.2673],
-    "요나하 마에하마 비치": [24.7364, 125.2638], "히가시 헨나자키": [24.7312, 125.4646], "이케마 대교": [24.9252, 125.2662], "이라부 대교": [24.8193, 125.1728],
-    "야키니쿠 나카오": [24.7958, 125.2855], "해리스 쉬림프": [24.9123, 125.2612]
-}
-def get_map_url(place): return f"https://www.google.com/maps/search/{urllib.parse.quote(f'미야코지마 {place}')}"
-
-# 6. 탭 구성
-tab0, tab_map, tab1, tab2, tab3, tab4, tab5 = st.tabs(["🏛️ Overview", "🗺️ Map", "📅 Itinerary", "💎 Secret Spots", "🚲 Experiences", "🎒 Travel Kit", "💰 Wallet"])
-
-with tab0:
-    st.markdown("### Trip Overview")
-    df_themes = pd.DataFrame([["1일차", "2/16", "미야코 블루", "17END & 럭셔리 디너"], ["2일차", "2/17", "절경 드라이브", "등대 뷰 & 시장 투어"], ["3일차", "2/18", "바다와 미식", "거북이 & 야키니쿠"], ["4일차", "2/19", "섬 일주", "이케마섬 & 이자카야"], ["5일차", "2/20", "귀국", "공항 이동"]], columns=["일차", "날짜", "테마", "포인트"])
-    st.table(df_themes.set_index("일차"))
-    
-    st.markdown("#### 📝 One-Line Diary")
+# 다이어리 기록/삭제는 다이어리 fragment만 다시 그림. 첨부 사진은 저장할 때 변형까지 만들어 둠
+def add_diary():
+    note = st.session_state.diary_note
+    uploads = st.session_state.diary_photos or []
+    photos = []
+    failed = []
+    # 읽을 수 없는 사진(ImageError)이나 저장 실패(OSError)는 그 사진만 빼고, 같이 쓴 기록은 저장
+    for f in uploads:
+        try:
+            photos.append(get_images().save_photo(f.getvalue(), f.name))
+        except (ValueError, OSError):
+            failed.append(f.name)
+    st.session_state.diary_failed_photos = failed
+    if note or photos:
+        stamp = datetime.now(pytz.timezone('Asia/Seoul')).strftime('%m/%d %H:%M')
+        save_data("add_diary", entry=f"[{stamp}] {note or '📷'}", **({"photos": photos} if photos else {}))
+
+# 원본이 없어졌거나 깨진 사진은 None (갤러리에서 빈 칸으로)
+def diary_photo(name):
+    try:
+        return get_images().photo(name)
+    except (ValueError, OSError):
+        return None
+
+# 사진이 붙은 기록만 (시간순). 저장소 버전이 바뀔 때만 다시 모음
+@metrics.cached("get_diary_photos", st.cache_resource(max_entries=1))
+def get_diary_photos(version):
+    return [(name, r["text"]) for r in data["diary"] for name in r.get("photos", ())]
+
+def save_diary_edits(editor_key, ids, version):
+    update, delete = edited_batch(editor_key, ids, {"기록": "text"})
+    if update or delete:
+        save_data("edit_diary", version, update=update, delete=delete)
+
+@st.fragment(key="diary")
+@metrics.timed("fragment.diary")
+def diary_section():
+    import pandas as pd
+    refresh_data()
+    notify_conflict()
+    for name in st.session_state.pop("diary_failed_photos", []):
+        st.toast(f"⚠️ 이미지를 읽을 수 없어요: {name}")
     with st.form("diary_form", clear_on_submit=True):
-        note = st.text_input("오늘 가장 좋았던 순간은?")
-        if st.form_submit_button("기록 (Save)") and note:
-            st.session_state.diary.append(f"[{datetime.now(pytz.timezone('Asia/Seoul')).strftime('%m/%d %H:%M')}] {note}")
-            save_data()
-            st.rerun()
+        st.text_input("오늘 가장 좋았던 순간은?", key="diary_note")
+        st.file_uploader("📷 사진 (선택)", type=miyako_images.PHOTO_TYPES, accept_multiple_files=True, key="diary_photos")
+        st.form_submit_button("기록 (Save)", on_click=add_diary)
             
-    if st.session_state.diary:
-        for i, entry in enumerate(st.session_state.diary):
-            c1, c2 = st.columns([0.9, 0.1])
-            c1.text(entry)
-            if c2.button("🗑️", key=f"del_diary_{i}"):
-                st.session_state.diary.pop(i)
-                save_data()
-                st.rerun()
+    if data["diary"]:
+        rows, page = page_of(data["diary"], "diary_page")
+        ids = [r["id"] for r in rows]
+        # 버전이 바뀌면 새 편집기로 (이전 편집 내용이 다른 항목에 붙지 않도록)
+        editor_key = f"diary_editor_{store.version}_{page}"
+        with st.form("diary_edit_form", border=False):
+            st.data_editor(pd.DataFrame({"삭제": False, "기록": [r["text"] for r in rows]}), key=editor_key, hide_index=True, width="stretch",
+                           column_config={"삭제": st.column_config.CheckboxColumn(width="small")})
+            st.form_submit_button("변경 저장 (선택 삭제)", on_click=save_diary_edits, args=(editor_key, ids, store.version))
 
+    # 사진 갤러리: 한 페이지의 썸네일 HTML만 보냄 (이미지 바이트는 브라우저가 정적 서빙에서, 보일 때만 받음)
+    photos = get_diary_photos(store.version)
+    if photos:
+        with st.expander(f"📷 Photos ({len(photos):,})"):
+            shown, _ = page_of(photos, "photo_page")
+            st.markdown(miyako_images.gallery_html([(diary_photo(name), text) for name, text in shown]), unsafe_allow_html=True)
+
+# 계획 비용은 일정표의 '비용' 열에서 (카테고리/날짜별)
+@metrics.cached("get_plan", st.cache_resource)
+def get_plan(by):
+    import miyako_ledger
+    return miyako_ledger.plan_totals(itinerary_frame(), by=by)
+
+def plan_chart(by, actual, title):
+    import plotly.express as px
+    import miyako_ledger
+    compare = miyako_ledger.planned_vs_actual(get_plan(by), actual).reset_index(names="항목")
+    return px.bar(compare, x="항목", y=["계획", "실제"], barmode="group", title=title, color_discrete_sequence=px.colors.sequential.Blues_r)
+
+# 예산 현황 (지갑에서 바뀐 내용은 Overview 탭을 열 때 반영)
+@st.fragment(key="budget_status")
+@metrics.timed("fragment.budget_status")
+def budget_status():
+    ledger = get_ledger()
+    actual_spent = ledger.total(current_rate)
     c1, c2 = st.columns(2)
-    planned_cost = pd.DataFrame({"항목": ["식비", "교통", "투어/입장", "쇼핑/기타"], "비용": [66000, 23000, 24500, 22000]})
-    actual_spent = sum([x['amount'] for x in st.session_state.expenses])
-    
-    with c1: 
+    with c1:
         st.markdown("**💰 Budget Status**")
-        st.metric("Total Budget", f"¥ {st.session_state.total_budget:,}")
-        st.metric("Actual Spent", f"¥ {actual_spent:,}", delta=f"Remaining: ¥ {st.session_state.total_budget - actual_spent:,}")
-    with c2: 
-        fig = px.pie(planned_cost, values='비용', names='항목', title='Planned Budget', hole=0.5, color_discrete_sequence=px.colors.sequential.Blues_r)
-        st.plotly_chart(fig, use_container_width=True)
-
-with tab_map:
-    st.markdown("### 🗺️ Map & MapCode Search")
-    col_search, col_res = st.columns([1, 2])
-    with col_search:
-        search_spot = st.selectbox("장소 선택 (MapCode)", list(mapcode_dict.keys()))
-        st.code(mapcode_dict[search_spot], language="text")
-        st.caption("👆 렌터카 내비게이션에 입력하세요.")
-    m = folium.Map(location=[24.80, 125.28], zoom_start=11)
-    for name, coords in locations.items():
-        folium.Marker(coords, popup=name, tooltip=name, icon=folium.Icon(color="blue" if "힐튼" not in name else "red", icon="info-sign")).add_to(m)
-    st_folium(m, width=700, height=400)
-
-with tab1:
-    days = df_itinerary['날짜'].unique()
+        st.metric("Total Budget", f"¥ {data['total_budget']:,}")
+        st.metric("Actual Spent", f"¥ {actual_spent:,.0f}", delta=f"Remaining: ¥ {data['total_budget'] - actual_spent:,.0f}")
+    with c2:
+        st.plotly_chart(plan_chart("category", ledger.by_category(current_rate), "Planned vs Actual"), width="stretch")
+
+if tab0.open:
+    with tab0, metrics.section("tab.overview"):
+        st.markdown("### Trip Overview")
+        st.table(themes_frame())
+
+        st.markdown("#### 📝 One-Line Diary")
+        diary_section()
+
+        budget_status()
+
+# 지도는 POI 집합 버전별로 한 번만 렌더링해 정적 파일로 제공 (miyako_geo.py)
+poi_ver = miyako_geo.poi_version(locations)
+
+@metrics.cached("get_map_url_for", st.cache_resource)
+def get_map_url_for(version, _pois):
+    return miyako_geo.build_map(_pois, version)
+
+@metrics.cached("get_poi_index", st.cache_resource)
+def get_poi_index(version, _pois):
+    return miyako_geo.GridIndex(_pois)
+
+@metrics.cached("get_search_index", st.cache_resource)
+def get_search_index():
+    return miyako_search.PlaceIndex(mapcode_dict, MAPCODE_ALIASES)
+
+# 초성/영문/맵코드로 검색. 입력할 때마다 n-gram 인덱스만 조회
+@st.fragment(key="mapcode")
+@metrics.timed("fragment.mapcode")
+def mapcode_search():
+    index = get_search_index()
+    query = st.text_input("장소 검색", key="mapcode_query", placeholder="예: ㅇㄹㅂ, irabu, 310 481")
+    matches = index.lookup_code(query) if miyako_search.MAPCODE_RE.match(query.strip()) else []
+    if matches:
+        st.info(f"📍 {', '.join(matches)}")
+    results = index.search(query) if query.strip() else list(mapcode_dict)
+    if not results:
+        st.caption("검색 결과가 없어요.")
+        return
+    search_spot = st.selectbox("장소 선택 (MapCode)", results, key="mapcode_spot")
+    st.code(mapcode_dict[search_spot], language="text")
+    for flag in index.flags.get(search_spot, []):
+        st.warning(miyako_search.MAPCODE_FLAGS[flag])
+    st.caption("👆 렌터카 내비게이션에 입력하세요.")
+
+# 반경 질의는 격자 인덱스로만 처리하고 지도는 다시 만들지 않음
+@st.fragment(key="nearby")
+@metrics.timed("fragment.nearby")
+def nearby_search():
+    index = get_poi_index(poi_ver, locations)
+    c_spot, c_km = st.columns([2, 1])
+    spot = c_spot.selectbox("📍 기준 장소", list(locations.keys()), key="nearby_spot")
+    radius = c_km.slider("반경 (km)", 1, 30, 5, key="nearby_km")
+    lat, lon = locations[spot]
+    results = index.nearby(lat, lon, radius, exclude=spot)
+    if results:
+        st.markdown("\n".join(f"- [{name}]({map_url(name)}) · {dist:.1f} km" for name, dist in results[:30]))
+    else:
+        st.caption("반경 안에 다른 장소가 없어요.")
+
+if tab_map.open:
+    with tab_map, metrics.section("tab.map"):
+        st.markdown("### 🗺️ Map & MapCode Search")
+        col_search, col_res = st.columns([1, 2])
+        with col_search:
+            mapcode_search()
+        with col_res:
+            nearby_search()
+        st.iframe(get_map_url_for(poi_ver, locations), height=420)
+
+# 물때: 일정 기간 전체의 분 단위 조위표를 한 번에 만들어 둠 (miyako_tide.py, 네트워크 없음)
+@metrics.cached("get_tide_table", st.cache_resource)
+def get_tide_table():
+    import miyako_tide
+    return miyako_tide.tide_table(trip_date(TRIP_DAYS[0]), len(TRIP_DAYS))
+
+# 날짜별 만조/간조 문구와 장소별 간조 구간 (날짜를 바꿀 때마다 다시 계산하지 않음)
+@metrics.cached("get_day_tide", st.cache_resource)
+def get_day_tide(day):
+    table = get_tide_table()
+    begin = stop_time(day, "00:00")
+    end = begin + timedelta(days=1)
+    extremes = " · ".join(f"{'간조' if kind == 'low' else '만조'} {t:%H:%M} ({h:.2f} m)" for t, h, kind in table.extremes() if begin <= t < end)
+    lines = []
+    for place, level in TIDE_LEVELS.items():
+        windows = [w for w in table.low_windows(level) if w.start < end and w.end >= begin]
+        spans = ", ".join(f"{max(w.start, begin):%H:%M}–{min(w.end, end - timedelta(minutes=1)):%H:%M}" for w in windows)
+        lines.append(f"- {place} (≤ {level} m): {spans or '없음'}")
+    return extremes, "\n".join(lines)
+
+# 날짜별 10분 간격 조위 그래프 데이터 (pandas는 그래프를 켤 때만 import)
+@metrics.cached("get_day_tide_chart", st.cache_resource)
+def get_day_tide_chart(day):
+    import pandas as pd
+    begin = stop_time(day, "00:00")
+    heights = get_tide_table().slice(begin, begin + timedelta(days=1))[::10]
+    return pd.Series(heights, index=pd.date_range(begin, periods=len(heights), freq="10min"), name="조위 (m)")
+
+# 물때 타는 장소가 간조 구간 밖에 잡혀 있으면 경고. 장소별 간조 구간은 접어 두고, 그래프는 켤 때만 그림
+# (접힌 expander 안도 매번 실행되므로 날짜를 바꿀 때마다 차트를 만들지 않게)
+def tide_section(day, day_df):
+    import miyako_tide
+    table = get_tide_table()
+    stops = [(place, stop_time(day, t)) for t, place in zip(day_df['시간'], day_df['장소'])]
+    for w in miyako_tide.tide_warnings(table, stops, TIDE_LEVELS):
+        st.warning(w.message(), icon="🌊")
+    with st.expander("🌊 물때 (히라라 조석 예보)"):
+        extremes, windows = get_day_tide(day)
+        st.caption(extremes)
+        if st.toggle("조위 그래프", key="tide_chart"):
+            st.line_chart(get_day_tide_chart(day), height=180)
+        st.markdown(windows)
+        st.caption("근사 조화 상수로 계산한 예보라 시각은 ±30분 정도로 보세요.")
+
+@st.fragment(key="itinerary")
+@metrics.timed("fragment.itinerary")
+def itinerary_section():
+    import miyako_route
+    df_itinerary = itinerary_frame()
+    days = TRIP_DAYS
+    # 선택된 pill을 다시 눌러 해제하면 None이 되므로 첫날로 되돌림
+    if st.session_state.get("selected_day") not in days:
+        st.session_state.selected_day = days[0]
     st.pills("Select Day", days, selection_mode="single", key="selected_day", label_visibility="collapsed")
 
     st.markdown(f"##### {st.session_state.selected_day} Schedule")
-    for _, r in df_itinerary[df_itinerary['날짜'] == st.session_state.selected_day].iterrows():
+    day_df = df_itinerary[df_itinerary['날짜'] == st.session_state.selected_day]
+    for _, r in day_df.iterrows():
         with st.expander(f"⏰ {r['시간']} | {r['장소']} ({r['구분']})"):
             st.markdown(f"**💡 {r['요약']}**")
             st.write(r['설명'])
             c_map, c_code = st.columns(2)
-            c_map.link_button(f"📍 구글 지도", get_map_url(r['장소']))
+            c_map.link_button(f"📍 구글 지도", map_url(r['장소']))
             c_code.code(r['MapCode'], language="text")
+
+    tide_section(st.session_state.selected_day, day_df)
+
+    # 동선 최적화: 공항/체크인 등 시간 고정 일정은 그대로 두고 나머지 순서만 제안 (miyako_route.py)
+    route_matrix = miyako_route.distance_matrix(locations)
+    plan = miyako_route.plan_day(list(zip(day_df['장소'], day_df['구분'])), route_matrix)
+    if plan.saved_km > 0.1:
+        st.info(f"🧭 **추천 동선**: {' → '.join(plan.order)}  \n약 {plan.saved_km:.1f} km 단축 ({plan.km_before:.1f} → {plan.km_after:.1f} km)")
+    with st.expander("🧭 일자별 동선 최적화 요약"):
+        rows = []
+        for day in days:
+            d_df = df_itinerary[df_itinerary['날짜'] == day]
+            p = miyako_route.plan_day(list(zip(d_df['장소'], d_df['구분'])), route_matrix)
+            rows.append({"날짜": day, "현재 (km)": round(p.km_before, 1), "추천 (km)": round(p.km_after, 1), "단축 (km)": round(p.saved_km, 1)})
+        st.dataframe(rows, hide_index=True, width="stretch")
     
-    idx = list(days).index(st.session_state.selected_day) + 1
-    if os.path.exists(f"0{idx}.png"): 
+    # 동선 이미지: 원본 대신 화면 폭에 맞는 변형을 정적 서빙으로 (파일이 그대로면 stat 한 번)
+    idx = days.index(st.session_state.selected_day) + 1
+    try:
+        route_image = get_images().from_file(f"0{idx}.png")
+    except (ValueError, OSError):
         st.markdown("---")
-        st.image(f"0{idx}.png", caption=f"Day {idx} Route", use_container_width=True)
+        st.caption(f"🖼️ Day {idx} Route 이미지를 불러오지 못했어요.")
+        route_image = None
+    if route_image:
+        st.markdown("---")
+        st.markdown(miyako_images.picture_html(route_image, f"Day {idx} Route", sizes="(max-width: 640px) 100vw, 80vw"), unsafe_allow_html=True)
+        st.caption(f"Day {idx} Route")
+
+if tab1.open:
+    with tab1, metrics.section("tab.itinerary"):
+        itinerary_section()
+
+# 탭 콘텐츠는 miyako_trip.py의 데이터에서 그림 (오프라인 내보내기와 같은 원본)
+def spot_card(sections):
+    parts = []
+    for title, spots in sections:
+        items = "".join(f'<li><a href="{map_url(name)}" target="_blank">{name}</a>: {note}</li>' for name, note in spots)
+        parts.append(f"<h4>{title}</h4><ul>{items}</ul>")
+    return f'<div class="card">{"<br>".join(parts)}</div>'
 
-with tab2: 
+def top10(entries):
+    return "\n".join(f"{i}. **[{label}]({map_url(query)})**: {f'({rating}) ' if rating else ''}{note}" for i, (label, query, rating, note) in enumerate(entries, 1))
+
+with tab2, metrics.section("tab.secret_spots"):
     st.markdown("### The Hidden Gems")
-    cl1, cl2 = st.columns(2)
-    # 기존 콘텐츠 유지
-    with cl1: st.markdown(f"""<div class="card"><h4>🏖️ Hidden Beaches</h4><ul><li><a href="{get_map_url('스나야마 비치')}" target="_blank">스나야마 비치</a>: 바위 아치 석양</li><li><a href="{get_map_url('나가마하마 비치')}" target="_blank">나가마하마 비치</a>: 프라이빗 비밀 해변</li><li><a href="{get_map_url('토구치노하마')}" target="_blank">토구치노하마</a>: 파우더 샌드</li></ul><br><h4>🛍️ Boutique Shopping</h4><ul><li><a href="{get_map_url('디자트')}" target="_blank">디자트</a>: 세련된 소품샵</li><li><a href="{get_map_url('나모시아')}" target="_blank">나모시아</a>: 핸드메이드 액세서리</li></ul></div>""", unsafe_allow_html=True)
-    with cl2: st.markdown(f"""<div class="card"><h4>🍱 Local's Choice</h4><ul><li><a href="{get_map_url('마루요시 소바')}" target="_blank">마루요시 소바</a>: 전설의 소바</li><li><a href="{get_map_url('모쟈노 빵집')}" target="_blank">모쟈노 빵집</a>: 오픈런 베이커리</li><li><a href="{get_map_url('보쿠노 키친')}" target="_blank">보쿠노 키친</a>: 이탈리안 퓨전</li></ul><br><h4>📸 Photo Op</h4><ul><li><a href="{get_map_url('이케마 대교 전망대')}" target="_blank">이케마 대교 전망대</a>: 숨겨진 뷰포인트</li></ul></div>""", unsafe_allow_html=True)
+    for col, sections in zip(st.columns(2), HIDDEN_GEMS):
+        col.markdown(spot_card(sections), unsafe_allow_html=True)
     
-    # [UPDATE] 추가된 추천 장소 (Expander로 정리)
     st.markdown("---")
     with st.expander("🍽️ Gourmet Top 10 (구글 4.0+ 맛집 추가 추천)", expanded=False):
-        st.markdown(f"""
-        1. **[다그즈 버거 (Doug's Burger)]({get_map_url('Doug\'s Burger')})**: (★4.2) 참치 스테이크 버거가 유명한 미야코지마 대표 수제버거.
-        2. **[리히터 (Richter)]({get_map_url('Richter Steak')})**: (★4.5) 미야코규 스테이크를 합리적인 가격에 즐길 수 있는 곳.
-        3. **[코샤마 (Koshama)]({get_map_url('Koshama')})**: (★4.3) 라이브 연주를 들으며 즐기는 분위기 깡패 이자카야.
-        4. **[더 고조 (The Gozso)]({get_map_url('The Gozso')})**: (★4.1) 오키나와 식재료를 활용한 창작 퓨전 요리 전문점.
-        5. **[그랑 블루 가맹 (Grand Bleu Gamin)]({get_map_url('Grand Bleu Gamin')})**: (★4.6) 특별한 날 가기 좋은 프라이빗 럭셔리 디너.
-        6. **[파이나가마 블루 부스]({get_map_url('Painagama Blue Booth')})**: (★4.4) 항구 뷰를 보며 먹는 핫도그와 카페 메뉴.
-        7. **[DOUG'S COFFEE]({get_map_url('Doug\'s Coffee')})**: (★4.3) 다그즈 버거 옆, 커피가 정말 맛있는 로스터리 카페.
-        8. **[스낵 R (Snack R)]({get_map_url('Snack R')})**: (★4.0) 현지인들과 어울려 술 한잔하기 좋은 로컬 스낵바.
-        9. **[소라니와 (Soraniwa)]({get_map_url('Soraniwa')})**: (★4.2) 이라부섬의 탁 트인 오션뷰를 자랑하는 카페 & 레스토랑.
-        10. **[17END Kitchen]({get_map_url('Shimojishima Airport 17END Kitchen')})**: (★4.1) 시모지시마 공항 내 위치, 활주로 뷰 맛집.
-        """)
+        st.markdown(top10(GOURMET_TOP10))
         
     with st.expander("🌟 Must-Visit Top 10 (현지인 추천 명소)", expanded=False):
-        st.markdown(f"""
-        1. **[임갸 마린 가든]({get_map_url('Imgya Marine Garden')})**: 천연 풀장으로 불리는 스노클링 초보자들의 성지.
-        2. **[나카노시마 비치]({get_map_url('Nakanoshima Beach')})**: 시모지시마의 스노클링 명소. 물고기 떼가 장관.
-        3. **[마키나 전망대]({get_map_url('Makina Observatory')})**: 이라부 대교 전체를 조망할 수 있는 숨겨진 뷰포인트.
-        4. **[토리이케 (용의 눈)]({get_map_url('Toriike')})**: 두 개의 연못이 지하로 바다와 연결된 신비로운 다이빙 포인트.
-        5. **[사와다 해변]({get_map_url('Sawada no Hama')})**: 거대한 바위들이 바다에 흩뿌려진 독특한 풍광 (석양 명소).
-        6. **[후나쿠사기]({get_map_url('Funakusagi')})**: 절벽 아래 숨겨진 비경, 아는 사람만 가는 시크릿 스팟.
-        7. **[야비지 (Yabiji)]({get_map_url('Yabiji')})**: 일본 최대의 산호초 군락. 배를 타고 나가야만 볼 수 있는 절경.
-        8. **[쿠리마 대교]({get_map_url('Kurima Bridge')})**: 미야코지마 바다 색깔이 가장 예쁘게 보인다는 다리.
-        9. **[미야코지마 시 열대식물원]({get_map_url('Miyakojima City Botanical Garden')})**: 1,600종 이상의 식물이 있는 힐링 산책 코스.
-        10. **[미야코지마 마모루군]({get_map_url('Miyakojima Mamoru-kun')})**: 섬 곳곳에 서 있는 경찰 인형. 전원과 인증샷 찍기 도전!
-        """)
-
-with tab3: 
+        st.markdown(top10(MUST_VISIT_TOP10))
+
+with tab3, metrics.section("tab.experiences"):
     st.markdown("### Island Experiences")
-    e1, e2, e3 = st.columns(3)
-    with e1: st.info(f"🚲 **[이라부 대교 자전거]({get_map_url('시모지시마 공항 자전거 대여')})**\n바다 위를 달리는 자유.")
-    with e2: st.success(f"🌌 **[무스누 해변 별밤]({get_map_url('무스누 해변')})**\n쏟아지는 은하수 명상.")
-    with e3: st.warning(f"🏺 **[시사 체험]({get_map_url('시사 체험')})**\n커플 시사 만들기.")
+    for col, (style, icon, name, query, note) in zip(st.columns(len(EXPERIENCES)), EXPERIENCES):
+        getattr(col, style)(f"{icon} **[{name}]({map_url(query)})**\n{note}")
 
-with tab4:
+with tab4, metrics.section("tab.travel_kit"):
     st.markdown("### 🎒 Smart Travel Kit")
     col_checklist, col_util = st.columns([1.2, 1])
     with col_checklist:
         st.markdown("#### ✅ Packing Checklist")
-        with st.expander("📄 필수 서류 & 현금", expanded=True):
-            for i in ["여권 (6개월 이상)", "국제운전면허증 (실물)", "한국 면허증", "엔화 현금", "트래블카드", "바우처"]: st.checkbox(i)
-        with st.expander("🔌 전자기기 (Camera & Tech)", expanded=True):
-            for i in ["DJI Flip (충전기)", "GoPro 액션캠 (배터리 여분)", "DJI 360", "DJI Pocket 3", "돼지코 (110V)", "보조배터리", "멀티탭", "메모리 카드"]: st.checkbox(i)
-        with st.expander("🏊‍♂️ 물놀이 & 의류"):
-            for i in ["수영복/래시가드", "아쿠아슈즈", "스노클링 장비", "방수팩", "선글라스/모자", "선크림"]: st.checkbox(i)
-        with st.expander("💊 비상약 & 기타"):
-            for i in ["멀미약", "소화제/진통제", "대일밴드", "물티슈/휴지"]: st.checkbox(i)
+        for group, expanded, items in PACKING_LIST:
+            with st.expander(group, expanded=expanded):
+                for i in items: st.checkbox(i)
     with col_util:
         st.markdown("#### 🗣️ Survival Japanese")
-        t1, t2, t3 = st.tabs(["🚗 운전", "🍱 식당", "🆘 응급"])
-        with t1: 
-            st.info("주유: 레귤러 만탄 오네가이")
-            st.info("주차: 코코니 토메테모 이이데스까?")
-        with t2:
-            st.success("주문: 고레 히토츠")
-            st.success("고수: 파쿠치 누키데")
-            st.success("계산: 오카이케 오네가이")
-        with t3:
-            st.error("도와줘요: 다스케테 구다사이!")
-            st.warning("화장실: 토이레와 도코 데스까?")
+        for t, (_, phrases) in zip(st.tabs([name for name, _ in PHRASES]), PHRASES):
+            for style, situation, phrase in phrases:
+                getattr(t, style)(f"{situation}: {phrase}")
         st.markdown("---")
-        st.markdown("""<div class="sos-card"><b>👮 경찰:</b> 110 / <b>🚑 구급:</b> 119<br><b>📞 영사관:</b> +81-92-771-0461</div>""", unsafe_allow_html=True)
+        contacts = "<br>".join(" / ".join(f"<b>{label}:</b> {number}" for label, number in line) for line in EMERGENCY_CONTACTS)
+        st.markdown(f'<div class="sos-card">{contacts}</div>', unsafe_allow_html=True)
 
-with tab5:
-    st.markdown("### 💰 Smart Wallet")
-    
-    new_budget = st.number_input("설정 예산 (Total Budget)", value=st.session_state.total_budget, step=10000)
-    if new_budget != st.session_state.total_budget:
-        st.session_state.total_budget = new_budget
-        save_data()
-        st.rerun()
+# 지갑: 예산/지출 변경은 save_wallet 콜백에서 처리하고 지갑만 다시 그림
+def set_budget(version):
+    save_wallet("set_budget", version, value=st.session_state.budget_input)
+
+def add_expense():
+    item, amount = st.session_state.expense_item, st.session_state.expense_amount
+    if item and amount is not None and amount > 0:
+        import miyako_ledger
+        expense = miyako_ledger.new_expense(item, amount, st.session_state.expense_category, st.session_state.expense_currency, st.session_state.expense_day)
+        save_wallet("add_expense", expense=expense)
+
+EXPENSE_FIELDS = {"내역": "item", "금액": "amount", "통화": "currency", "카테고리": "category", "날짜": "day"}
+
+def save_expense_edits(editor_key, ids, version):
+    update, delete = edited_batch(editor_key, ids, EXPENSE_FIELDS)
+    if update or delete:
+        save_wallet("edit_expenses", version, update=update, delete=delete)
+
+_today = datetime.now(pytz.timezone('Asia/Tokyo'))
+today_index = next((i for i, d in enumerate(TRIP_DAYS) if d.startswith(f"{_today.month}/{_today.day} ")), 0)
+
+@st.fragment(key="wallet")
+@metrics.timed("fragment.wallet")
+def wallet_section():
+    import pandas as pd
+    import miyako_ledger
+    ledger = get_ledger()
+    refresh_data()
+    notify_conflict()
+    if st.session_state.get("budget_input") != data["total_budget"]:
+        st.session_state.budget_input = data["total_budget"]
+    st.number_input("설정 예산 (Total Budget)", step=10000, key="budget_input", on_change=set_budget, args=(store.version,))
 
     col_budget, col_add = st.columns([1, 1.5])
     with col_budget:
         st.markdown("#### 📊 Status")
-        total_spent = sum([x['amount'] for x in st.session_state.expenses])
-        remaining = st.session_state.total_budget - total_spent
-        progress = min(1.0, total_spent / st.session_state.total_budget) if st.session_state.total_budget > 0 else 0
+        total_spent = ledger.total(current_rate)
+        remaining = data["total_budget"] - total_spent
+        progress = min(1.0, total_spent / data["total_budget"]) if data["total_budget"] > 0 else 0
         
-        st.metric("Total Budget", f"¥ {st.session_state.total_budget:,}")
-        st.metric("Spent", f"¥ {total_spent:,}", delta=f"- {total_spent:,}", delta_color="inverse")
-        st.metric("Remaining", f"¥ {remaining:,}", delta=f"{remaining:,}")
+        st.metric("Total Budget", f"¥ {data['total_budget']:,}")
+        st.metric("Spent", f"¥ {total_spent:,.0f}", delta=f"- {total_spent:,.0f}", delta_color="inverse")
+        st.metric("Remaining", f"¥ {remaining:,.0f}", delta=f"{remaining:,.0f}")
         st.progress(progress)
         
     with col_add:
         st.markdown("#### 📝 Add Expense")
         with st.form("expense_form", clear_on_submit=True):
-            item = st.text_input("내역")
-            amount = st.number_input("금액 (엔)", min_value=0, step=100, value=None, placeholder="금액 입력")
-            if st.form_submit_button("추가") and item and amount is not None and amount > 0:
-                st.session_state.expenses.append({"item": item, "amount": amount})
-                save_data()
-                st.rerun()
+            st.text_input("내역", key="expense_item")
+            st.number_input("금액", min_value=0, step=100, value=None, placeholder="금액 입력", key="expense_amount")
+            c_cat, c_cur, c_day = st.columns(3)
+            c_cat.selectbox("카테고리", miyako_ledger.CATEGORIES, key="expense_category")
+            c_cur.selectbox("통화", miyako_ledger.CURRENCIES, key="expense_currency")
+            c_day.selectbox("날짜", TRIP_DAYS, index=today_index, key="expense_day")
+            st.form_submit_button("추가", on_click=add_expense)
+    if len(ledger):
+        st.plotly_chart(plan_chart("day", ledger.by_day(current_rate), "일별 계획 vs 실제 (¥)"), width="stretch")
     st.markdown("---")
-    st.markdown("#### 🧾 History (Delete Enabled)")
-    if st.session_state.expenses:
-        for i, expense in enumerate(st.session_state.expenses):
-            c1, c2, c3 = st.columns([0.6, 0.3, 0.1])
-            c1.text(expense['item'])
-            c2.text(f"¥ {expense['amount']:,}")
-            if c3.button("🗑️", key=f"del_exp_{i}"):
-                st.session_state.expenses.pop(i)
-                save_data()
-                st.rerun()
+    st.markdown("#### 🧾 History (Edit & Delete)")
+    if data["expenses"]:
+        rows, page = page_of(data["expenses"], "exp_page")
+        rows = [miyako_ledger.normalize_expense(e) for e in rows]
+        ids = [e["id"] for e in rows]
+        df = pd.DataFrame({"삭제": False, **{col: [e[field] for e in rows] for col, field in EXPENSE_FIELDS.items()}})
+        editor_key = f"exp_editor_{store.version}_{page}"
+        with st.form("expense_edit_form", border=False):
+            st.data_editor(df, key=editor_key, hide_index=True, width="stretch", column_config={
+                "삭제": st.column_config.CheckboxColumn(width="small"),
+                "금액": st.column_config.NumberColumn(min_value=0, step=1),
+                "통화": st.column_config.SelectboxColumn(options=miyako_ledger.CURRENCIES, required=True),
+                "카테고리": st.column_config.SelectboxColumn(options=miyako_ledger.CATEGORIES, required=True),
+                "날짜": st.column_config.SelectboxColumn(options=TRIP_DAYS + [miyako_ledger.UNKNOWN_DAY], required=True)})
+            st.form_submit_button("변경 저장 (선택 삭제)", on_click=save_expense_edits, args=(editor_key, ids, store.version))
     else: st.info("지출 내역이 없습니다.")
 
+if tab5.open:
+    with tab5, metrics.section("tab.wallet"):
+        st.markdown("### 💰 Smart Wallet")
+        wallet_section()
+
 st.markdown("---")
-st.caption("Designed with 🐢 for Chris.")
\ No newline at end of file
+st.caption("Designed with 🐢 for Chris.")
+
+# 7. 성능 디버그 패널: 구간별 백분위와 캐시 적중률. 저장하면 DATA_DIR에 JSON/Prometheus 파일로
+def save_metrics():
+    st.session_state.metrics_files = metrics.dump()
+
+@st.fragment(key="debug_panel")
+def debug_panel():
+    snap = metrics.snapshot()
+    scope = "모든 세션 합산" if metrics.enabled else "?debug=1 세션의 rerun만"
+    st.caption(f"{snap['since']} 부터 · {scope} · 최근 {miyako_metrics.WINDOW}건 기준 백분위")
+    st.dataframe([{"구간": name, "횟수": s["count"], "p50": s["p50_ms"], "p90": s["p90_ms"], "p99": s["p99_ms"], "max": s["max_ms"]}
+                  for name, s in snap["sections"].items()], hide_index=True, width="stretch")
+    st.dataframe([{"캐시": name, "hit": c.get("hit", 0), "stale": c.get("stale", 0), "miss": c.get("miss", 0),
+                   "refresh": c.get("refresh", 0), "error": c.get("error", 0), "적중률": c["hit_ratio"]}
+                  for name, c in snap["caches"].items()], hide_index=True, width="stretch")
+    c_refresh, c_save, c_reset = st.columns(3)
+    c_refresh.button("새로고침", key="metrics_refresh")
+    c_save.button("파일 저장", key="metrics_save", on_click=save_metrics)
+    # 초기화는 모든 세션이 모은 지표를 지우므로 서버에서 MIYAKO_METRICS=1 로 켰을 때만 (?debug=1 세션에는 없음)
+    if metrics.enabled:
+        c_reset.button("초기화", key="metrics_reset", on_click=metrics.reset)
+    if st.session_state.get("metrics_files"):
+        st.caption(" · ".join(st.session_state.metrics_files))
+    st.download_button("Prometheus 텍스트", metrics.prometheus(snap), file_name=miyako_metrics.PROM_FILE, mime="text/plain")
+
+if metrics.enabled or st.session_state.metrics_debug:
+    metrics.observe("script", (time.perf_counter() - script_start) * 1000)
+    with st.sidebar.expander("🔧 Performance (debug)"):
+        debug_panel()
\ No newline at end of file